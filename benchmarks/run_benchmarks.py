@@ -0,0 +1,246 @@
+"""
+Runs the performance benchmarks of the optimization stack on synthetic data and optionally saves or compares against a baseline.
+
+Usage, from the repository root:
+
+    python benchmarks/run_benchmarks.py --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+
+Each benchmark is run --repeat times and the median wall time of each group of phases is recorded: build (instantiate_model and populate_model), solve (solver_io and solve), and process (process_results), along with the objective value. A comparison fails, with exit status 1, if any group is slower than the baseline by more than both the relative --tolerance and the absolute --min-delta, or if any objective value differs from the baseline. Baselines are only comparable when recorded on the same machine.
+"""
+from __future__ import division, print_function
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic
+from es_gui.tools.valuation.valuation_optimizer import ValuationOptimizer
+from es_gui.tools.btm.btm_optimizer import BtmOptimizer
+from es_gui.tools.dms import DataManagementSystem
+
+GROUPS = OrderedDict([('build', ('instantiate_model', 'populate_model')),
+                      ('solve', ('solver_io', 'solve')),
+                      ('process', ('process_results',)),
+                      ])
+
+DEVICE_PARAMS = {'Power_rating': 20, 'Energy_capacity': 80, 'Round_trip_efficiency': 0.85}
+
+OBJECTIVE_RTOL = 1e-6
+
+
+def _group_timings(report):
+    """Sums the wall times of an Optimizer timing report into the benchmark phase groups."""
+    return OrderedDict((group, sum(report[phase + '_wall'] for phase in phases)) for group, phases in GROUPS.items())
+
+
+def _valuation_run(market_type, model_engine, n_hours, solver):
+    op = ValuationOptimizer(market_type=market_type, solver=solver, model_engine=model_engine, **synthetic.valuation_inputs(n_hours))
+    op.set_model_parameters(**DEVICE_PARAMS)
+    op.run()
+
+    return _group_timings(op.get_timing_report()), op.gross_revenue
+
+
+def _valuation_sweep(market_type, model_engine, n_hours, solver):
+    """Solves the first point of the parameter sweep from scratch and re-solves the model for the rest."""
+    sweep = synthetic.sweep_params()
+
+    op = ValuationOptimizer(market_type=market_type, solver=solver, model_engine=model_engine, **synthetic.valuation_inputs(n_hours))
+    op.set_model_parameters(**dict(DEVICE_PARAMS, **sweep[0]))
+    op.run()
+
+    revenues = [op.gross_revenue]
+
+    for params in sweep[1:]:
+        with op.timed('populate_model'):
+            op.update_model_parameters(**params)
+
+        op.resolve()
+        revenues.append(op.gross_revenue)
+
+    return _group_timings(op.get_timing_report()), sum(revenues)
+
+
+def _btm_run(n_hours, solver):
+    op = BtmOptimizer(solver=solver, **synthetic.btm_inputs(n_hours))
+    op.set_model_parameters(Power_rating=100, Energy_capacity=400)
+    op.run()
+
+    return _group_timings(op.get_timing_report()), op.total_bill_with_es
+
+
+def _dms_run(n_hours, n_entries=60, n_reads=600):
+    """Adds months of data to a DataManagementSystem with room for a third of them, then reads random entries, timing the adds and the reads of entries that are present."""
+    inputs = synthetic.valuation_inputs(n_hours)
+    entry_size = sum(arr.nbytes for arr in inputs.values())
+    rng = np.random.RandomState(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        dms = DataManagementSystem(os.path.join(tmp_dir, 'benchmark_dms.p'), save_data=False, max_memory=entry_size*n_entries//3)
+
+        start = time.perf_counter()
+
+        for ix in range(n_entries):
+            dms.add_data({key: arr.copy() for key, arr in inputs.items()}, 'node_{0}'.format(ix))
+
+        add_time = time.perf_counter() - start
+        n_read = 0
+
+        start = time.perf_counter()
+
+        for ix in rng.randint(0, n_entries, n_reads):
+            try:
+                dms.get_data('node_{0}'.format(ix), 'price_electricity')
+            except KeyError:
+                continue
+            else:
+                n_read += 1
+
+        read_time = time.perf_counter() - start
+
+    return OrderedDict([('add', add_time), ('get', read_time)]), n_read
+
+
+def get_benchmarks(horizons, solver):
+    """Returns an OrderedDict of benchmark names and functions returning (OrderedDict of group timings, objective value)."""
+    benchmarks = OrderedDict()
+
+    for horizon in horizons:
+        n_hours = synthetic.HORIZONS[horizon]
+
+        for market_type in synthetic.VALUATION_MARKET_TYPES:
+            engines = ['pyomo', 'matrix', 'dp'] if market_type == 'arbitrage' else ['pyomo', 'matrix']
+
+            for engine in engines:
+                benchmarks['valuation/{0}/{1}/{2}'.format(market_type, engine, horizon)] = \
+                    lambda mt=market_type, me=engine, n=n_hours: _valuation_run(mt, me, n, solver)
+
+        for market_type in ['arbitrage', 'pjm_pfp']:
+            for engine in ['pyomo', 'matrix']:
+                benchmarks['valuation_sweep/{0}/{1}/{2}'.format(market_type, engine, horizon)] = \
+                    lambda mt=market_type, me=engine, n=n_hours: _valuation_sweep(mt, me, n, solver)
+
+        benchmarks['btm/{0}'.format(horizon)] = lambda n=n_hours: _btm_run(n, solver)
+        benchmarks['dms/{0}'.format(horizon)] = lambda n=n_hours: _dms_run(n)
+
+    return benchmarks
+
+
+def run_benchmarks(benchmarks, repeat):
+    """Runs each benchmark repeat times and returns an OrderedDict of the median group timings [s] and the objective value."""
+    results = OrderedDict()
+
+    for name, benchmark in benchmarks.items():
+        runs = [benchmark() for _ in range(repeat)]
+
+        timings = OrderedDict((group, statistics.median(run[0][group] for run in runs)) for group in runs[0][0])
+        results[name] = {'timings': timings, 'objective': float(runs[0][1])}
+
+        print('{0:<45} {1}  objective={2:.6g}'.format(name, '  '.join('{0}={1:.4f}s'.format(group, t) for group, t in timings.items()), results[name]['objective']))
+
+    return results
+
+
+def _metadata(args):
+    import pyomo.version
+    import scipy
+
+    return OrderedDict([('python', platform.python_version()),
+                        ('platform', platform.platform()),
+                        ('processor', platform.processor()),
+                        ('numpy', np.__version__),
+                        ('scipy', scipy.__version__),
+                        ('pyomo', pyomo.version.version),
+                        ('solver', args.solver),
+                        ('repeat', args.repeat),
+                        ('horizons', args.horizons),
+                        ])
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """Returns a list of descriptions of timing regressions and objective value mismatches relative to baseline."""
+    failures = []
+
+    for name, result in results.items():
+        if name not in baseline:
+            print('{0}: not in the baseline, skipping.'.format(name))
+            continue
+
+        base = baseline[name]
+
+        for group, t in result['timings'].items():
+            t_base = base['timings'].get(group)
+
+            if t_base is not None and t - t_base > max(tolerance*t_base, min_delta):
+                failures.append('{0} {1}: {2:.4f}s vs. baseline {3:.4f}s (+{4:.0%})'.format(name, group, t, t_base, (t - t_base)/t_base if t_base else np.inf))
+
+        if not np.isclose(result['objective'], base['objective'], rtol=OBJECTIVE_RTOL, atol=OBJECTIVE_RTOL):
+            failures.append('{0} objective: {1!r} vs. baseline {2!r}'.format(name, result['objective'], base['objective']))
+
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Runs the optimization stack performance benchmarks.')
+    parser.add_argument('--save', metavar='PATH', help='save the results as a baseline JSON file')
+    parser.add_argument('--compare', metavar='PATH', help='compare the results to a baseline JSON file and exit with status 1 on regressions')
+    parser.add_argument('--horizons', nargs='+', choices=list(synthetic.HORIZONS), default=['day', 'month'], help='time horizons to benchmark (default: day month)')
+    parser.add_argument('--only', metavar='SUBSTRING', help='only run benchmarks whose names contain SUBSTRING')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs of each benchmark (default: 3)')
+    parser.add_argument('--solver', default='highs', help='solver for the pyomo model engine and BtmOptimizer (default: highs)')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown (default: 0.25)')
+    parser.add_argument('--min-delta', type=float, default=0.02, help='slowdowns of at most this many seconds are ignored (default: 0.02)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger('pyomo').setLevel(logging.ERROR)
+
+    benchmarks = get_benchmarks(args.horizons, args.solver)
+
+    if args.only:
+        benchmarks = OrderedDict((name, b) for name, b in benchmarks.items() if args.only in name)
+
+    results = run_benchmarks(benchmarks, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'metadata': _metadata(args), 'benchmarks': results}, f, indent=2)
+
+        print('Saved results to {0}.'.format(args.save))
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+
+        failures = compare(results, baseline['benchmarks'], args.tolerance, args.min_delta)
+
+        if failures:
+            print('\n{0} regression(s) relative to {1}:'.format(len(failures), args.compare))
+
+            for failure in failures:
+                print('  ' + failure)
+
+            return 1
+
+        print('\nNo regressions relative to {0}.'.format(args.compare))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Synthetic, reproducible inputs for the performance benchmarks.
+
+Price series have a daily shape with morning and evening peaks, lower weekend prices, autocorrelated noise, occasional scarcity spikes, and occasional negative prices overnight. Load and PV profiles follow typical commercial load and clear-sky PV shapes. The same seed always produces the same data.
+"""
+from __future__ import division
+
+import numpy as np
+
+HORIZONS = {'day': 24, 'month': 720, 'year': 8760}
+
+VALUATION_MARKET_TYPES = ['arbitrage', 'pjm_pfp', 'miso_pfp', 'isone_pfp', 'nyiso_pfp', 'ercot_arbreg', 'spp_pfp', 'caiso_pfp']
+
+
+def _rng(seed):
+    return np.random.RandomState(seed)
+
+
+def _autocorrelated_noise(rng, n_hours, scale, rho=0.8):
+    noise = np.empty(n_hours)
+    shocks = rng.randn(n_hours)*scale*np.sqrt(1 - rho**2)
+    noise[0] = rng.randn()*scale
+
+    for t in range(1, n_hours):
+        noise[t] = rho*noise[t-1] + shocks[t]
+
+    return noise
+
+
+def price_series(n_hours, seed=0, mean=30.0, peak=15.0, noise=6.0, spike_prob=0.005, negative_prob=0.01):
+    """Returns an hourly energy price series [$/MWh]."""
+    rng = _rng(seed)
+    t = np.arange(n_hours)
+    hour = t % 24
+    weekend = (t//24) % 7 >= 5
+
+    shape = 0.6*np.exp(-0.5*((hour - 8)/2.0)**2) + np.exp(-0.5*((hour - 18)/2.5)**2) - 0.3*np.exp(-0.5*((hour - 3)/2.0)**2)
+    prices = mean + peak*shape
+    prices[weekend] *= 0.85
+    prices += _autocorrelated_noise(rng, n_hours, noise)
+
+    spikes = rng.rand(n_hours) < spike_prob
+    prices[spikes] *= rng.uniform(3, 8, spikes.sum())
+
+    negatives = (rng.rand(n_hours) < negative_prob) & (hour < 6)
+    prices[negatives] = -rng.uniform(1, 20, negatives.sum())
+
+    return prices
+
+
+def _positive_series(rng, n_hours, low, high):
+    return rng.uniform(low, high, n_hours)
+
+
+def valuation_inputs(n_hours, seed=0):
+    """Returns a dictionary of the time series keyword arguments of ValuationOptimizer, covering the inputs of every market type."""
+    rng = _rng(seed + 1)
+    price_electricity = price_series(n_hours, seed=seed)
+
+    # Regulation capacity prices loosely track energy prices.
+    price_regulation = np.maximum(5 + 0.3*price_electricity + _autocorrelated_noise(rng, n_hours, 3), 0)
+
+    return {'price_electricity': price_electricity,
+            'price_regulation': price_regulation,
+            'price_reg_service': _positive_series(rng, n_hours, 0.1, 1.5),
+            'price_reg_up': np.maximum(price_regulation*rng.uniform(0.6, 1.0, n_hours), 0),
+            'price_reg_down': np.maximum(price_regulation*rng.uniform(0.4, 0.9, n_hours), 0),
+            'price_reg_serv_up': _positive_series(rng, n_hours, 0.05, 0.5),
+            'price_reg_serv_down': _positive_series(rng, n_hours, 0.05, 0.5),
+            'mileage_mult': _positive_series(rng, n_hours, 1.5, 4.0),
+            'mileage_mult_ru': _positive_series(rng, n_hours, 1.5, 4.0),
+            'mileage_mult_rd': _positive_series(rng, n_hours, 1.5, 4.0),
+            'perf_score': _positive_series(rng, n_hours, 0.85, 1.0),
+            'perf_score_ru': _positive_series(rng, n_hours, 0.85, 1.0),
+            'perf_score_rd': _positive_series(rng, n_hours, 0.85, 1.0),
+            'fraction_reg_up': _positive_series(rng, n_hours, 0.1, 0.3),
+            'fraction_reg_down': _positive_series(rng, n_hours, 0.1, 0.3),
+            }
+
+
+def btm_inputs(n_hours, seed=0, n_demand_periods=3):
+    """Returns a dictionary of the keyword arguments of BtmOptimizer: a time-of-use tariff with net metering and load and PV profiles [kW]."""
+    rng = _rng(seed)
+    t = np.arange(n_hours)
+    hour = t % 24
+    weekend = (t//24) % 7 >= 5
+
+    # Commercial load: occupied hours on weekdays.
+    occupied = (hour >= 7) & (hour < 19) & ~weekend
+    load = 150 + 250*occupied + 40*np.sin(2*np.pi*(hour - 9)/24) + _autocorrelated_noise(rng, n_hours, 15)
+    load = np.maximum(load, 20)
+
+    # Clear-sky PV with random cloud cover per day.
+    daylight = np.maximum(np.sin(np.pi*(hour - 6)/12), 0)
+    clouds = np.repeat(rng.uniform(0.4, 1.0, n_hours//24 + 1), 24)[:n_hours]
+    pv = 200*daylight*clouds
+
+    # Demand periods: off-peak, partial-peak, and peak blocks over the day.
+    boundaries = np.linspace(0, 24, n_demand_periods + 1)[1:-1]
+    tou_demand_schedule = np.searchsorted(boundaries, hour, side='right')
+    tou_energy_schedule = ((hour >= 16) & (hour < 21)).astype(int)
+
+    return {'tou_energy_schedule': tou_energy_schedule,
+            'tou_energy_rate': [0.09, 0.24],
+            'tou_demand_schedule': tou_demand_schedule,
+            'tou_demand_rate': list(np.linspace(4.0, 18.0, n_demand_periods)),
+            'flat_demand_rate': 9.5,
+            'nem_type': 2,
+            'nem_rate': 0.05,
+            'load_profile': load,
+            'pv_profile': pv,
+            }
+
+
+def sweep_params(n_points=5):
+    """Returns a parameter sweep over device power rating at a fixed four hour duration."""
+    return [{'Power_rating': p, 'Energy_capacity': 4*p} for p in np.linspace(5, 25, n_points)]
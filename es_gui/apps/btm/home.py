@@ -9,6 +9,7 @@ from kivy.app import App
 # from es_gui.tools.valuation.valuation_dms import ValuationDMS
 from es_gui.resources.widgets.common import WarningPopup
 from es_gui.tools.btm.btm_dms import BtmDMS
+from es_gui.tools.result_cache import ResultCache
 from .op_handler import BtmOptimizerHandler
 
 
@@ -30,6 +31,10 @@ class BehindTheMeterHomeScreen(Screen):
         self.handler = BtmOptimizerHandler(App.get_running_app().config.get('optimization', 'solver'))
         self.handler.dms = self.dms
 
+        if App.get_running_app().config.getint('optimization', 'result_cache'):
+            self.handler.result_cache = ResultCache(cache_dir=os.path.join('results', 'cache'),
+                                                    max_size=App.get_running_app().config.getint('optimization', 'result_cache_size')*1000000)
+
     def on_enter(self):
         ab = self.manager.nav_bar
         ab.reset_nav_bar()
@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import logging
+from collections import OrderedDict
 from datetime import datetime
 import calendar
 import pyutilib
@@ -10,11 +11,16 @@ from kivy.clock import mainthread
 
 from es_gui.tools.btm.btm_optimizer import BtmOptimizer, BadParameterException, IncompatibleDataException
 import es_gui.tools.btm.readutdata as readutdata
+from es_gui.tools.result_cache import ResultCache
+from es_gui.tools import linear_program
+from es_gui.tools.optimizer import write_timing_reports
+from es_gui.tools.btm import btm_optimizer, constraints
 
 
 class BtmOptimizerHandler:
     """A handler for creating and solving BtmOptimizer instances as requested."""
     dms = None
+    result_cache = None
     solved_ops = []
 
     def __init__(self, solver_name):
@@ -68,15 +74,16 @@ class BtmOptimizerHandler:
 
                 # Get data.
                 # TODO: Move to a DMS. Should the omission of PV profile data be handled by the BtmOptimizer?
-                load_profile = self.dms.get_load_profile_data(load_profile_path['path'], ix)
+                with op.timed('load_data'):
+                    load_profile = self.dms.get_load_profile_data(load_profile_path['path'], ix)
 
-                try:
-                    pv_profile = self.dms.get_pv_profile_data(pv_profile_path['path'], ix)
-                except KeyError:
-                    pv_profile = np.zeros(len(load_profile))
+                    try:
+                        pv_profile = self.dms.get_pv_profile_data(pv_profile_path['path'], ix)
+                    except KeyError:
+                        pv_profile = np.zeros(len(load_profile))
 
-                # Build op inputs.
-                rate_df_month = rate_df.loc[rate_df['month'] == ix]
+                    # Build op inputs.
+                    rate_df_month = rate_df.loc[rate_df['month'] == ix]
 
                 # Populate op.
                 op.tou_energy_schedule = rate_df_month['tou_energy_schedule'].values
@@ -101,7 +108,7 @@ class BtmOptimizerHandler:
                     continue_param_loop = False
 
                 try:
-                    solved_op = self._solve_model(op)
+                    solved_op = self._solve_model(op, params)
                 except pyutilib.common._exceptions.ApplicationError as e:
                     logging.error('Op Handler: Something went wrong when solving: ({error})'.format(error=e))
                     handler_status = False
@@ -115,14 +122,54 @@ class BtmOptimizerHandler:
                     solved_requests.append(solved_op)
 
         logging.info('Op Handler: Finished processing requested jobs.')
+        logging.info('Op Handler: DMS statistics: {0}'.format(dms.get_statistics()))
         return solved_requests, handler_status
 
-    def _solve_model(self, op):
+    def _solve_model(self, op, params=None):
         op.solver = self.solver_name
-        op.run()
+        key = self._get_cache_key(op, params)
+
+        if not self._load_cached_results(op, key):
+            op.run()
+            self._cache_results(op, key)
 
         return op
 
+    def _get_cache_key(self, op, params):
+        """Returns the key of the results of solving op with params in the result cache, or None if there is no result cache."""
+        if self.result_cache is None:
+            return None
+
+        inputs = {name: getattr(op, name) for name in BtmOptimizer.INPUTS}
+
+        return ResultCache.make_key('btm', op.solver, inputs, params, _code_version())
+
+    def _load_cached_results(self, op, key):
+        """Sets the results, bill totals, and peak demands of op from the result cache; returns True if they were found."""
+        if key is None:
+            return False
+
+        with op.timed('cache_lookup'):
+            entry = self.result_cache.get(key)
+
+        if entry is None:
+            return False
+
+        op.results = entry['results']
+
+        for component in BtmOptimizer.BILL_COMPONENTS + BtmOptimizer.PEAK_DEMANDS:
+            setattr(op, component, entry[component])
+
+        return True
+
+    def _cache_results(self, op, key):
+        """Stores the results, bill totals, and peak demands of solved op in the result cache."""
+        if key is not None:
+            entry = {component: getattr(op, component) for component in BtmOptimizer.BILL_COMPONENTS + BtmOptimizer.PEAK_DEMANDS}
+            entry['results'] = op.results
+
+            self.result_cache.put(key, entry)
+
     @staticmethod
     def _save_to_solved_ops(op, month, param_set):
         # time_finished = datetime.now().strftime('%A, %B %d, %Y %H:%M:%S')
@@ -170,4 +217,32 @@ class BtmOptimizerHandler:
         return_list = reversed(self.solved_ops)
 
         return return_list
-    
\ No newline at end of file
+
+    def get_timing_reports(self):
+        """Returns the phase timings and model statistics of each solved Optimizer object, in chronological order."""
+        reports = []
+
+        for solved_op in self.solved_ops:
+            report = OrderedDict([('name', solved_op['name'])])
+            report.update(solved_op['optimizer'].get_timing_report())
+            reports.append(report)
+
+        return reports
+
+    def export_timings(self, path):
+        """Writes the timing reports of the solved Optimizer objects to path as CSV if it ends in '.csv' or JSON otherwise."""
+        write_timing_reports(self.get_timing_reports(), path)
+    
+
+
+_CODE_VERSION = None
+
+
+def _code_version():
+    """Returns the version of the BTM formulation and solution code for keying the result cache."""
+    global _CODE_VERSION
+
+    if _CODE_VERSION is None:
+        _CODE_VERSION = ResultCache.code_version(btm_optimizer, constraints, linear_program)
+
+    return _CODE_VERSION
@@ -7,6 +7,7 @@ import calendar
 import threading
 import logging
 import copy
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import pandas as pd
 from kivy.app import App
@@ -15,10 +16,14 @@ from kivy.event import EventDispatcher
 from kivy.properties import NumericProperty
 
 from es_gui.resources.widgets.common import LoadingModalView
+from es_gui.apps.data_manager.manifest import ScanManifest
 
 
 DATA_HOME = 'data'
 
+# The number of markets scanned at a time.
+N_SCAN_WORKERS = 4
+
 STATE_ABBR_TO_NAME = {
     'AL': 'Alabama',
     'AK': 'Alaska',
@@ -81,6 +86,16 @@ class DataManager(EventDispatcher):
     def __init__(self, data_bank_root='data', **kwargs):
         super(DataManager, self).__init__(**kwargs)
         self.data_bank_root = data_bank_root
+
+        self._manifests = {}
+        self._data_bank_lock = threading.Lock()
+
+        # Memoized static tables, nodes, and revenue streams; see get_nodes() and get_valuation_revstreams().
+        self._catalog_lock = threading.RLock()
+        self._static_tables = {}
+        self._rev_stream_defs = None
+        self._node_catalog = {}
+        self._revstream_catalog = {}
     
     def on_n_threads_scanning(self, instance, value):
         if value == 0:
@@ -97,6 +112,18 @@ class DataManager(EventDispatcher):
     def data_bank_root(self, value):
         self._data_bank_root = value
     
+    def _get_manifest(self, scan):
+        """Returns the ScanManifest of the given scan, 'valuation' or 'btm', of the current data bank, starting it."""
+        key = (self.data_bank_root, scan)
+
+        if key not in self._manifests:
+            self._manifests[key] = ScanManifest(os.path.join(self.data_bank_root, '.{0}_scan_manifest.json'.format(scan)))
+
+        manifest = self._manifests[key]
+        manifest.begin()
+
+        return manifest
+
     def scan_btm_data_bank(self):
         """Scans the behind-the-meter data bank to determine what data has been downloaded."""
         # Check if data bank exists.
@@ -118,10 +145,14 @@ class DataManager(EventDispatcher):
                 # Stop running this thread so the main Python process can exit.
                 return
 
+            self._btm_manifest = self._get_manifest('btm')
+
             self._scan_rate_structure_data_bank()
             self._scan_btm_load_profile_data_bank()
             self._scan_btm_pv_profile_data_bank()
 
+            self._btm_manifest.save()
+
             self.n_threads_scanning -= 1
         
         thread = threading.Thread(target=_scan_btm_data_bank)
@@ -133,11 +164,11 @@ class DataManager(EventDispatcher):
         rate_structure_data_bank = {}
 
         try:
-            os.listdir(rate_structure_root)
+            self._btm_manifest.listdir(rate_structure_root)
         except FileNotFoundError:
             return
 
-        for rate_structure_file in os.scandir(rate_structure_root):
+        for rate_structure_file in self._btm_manifest.scandir(rate_structure_root):
             if not rate_structure_file.name.startswith('.'):
                 with open(rate_structure_file.path) as f:
                     rate_structure = json.load(f)
@@ -152,21 +183,21 @@ class DataManager(EventDispatcher):
         load_profile_data_bank = {}
 
         try:
-            os.listdir(load_profile_root)
+            self._btm_manifest.listdir(load_profile_root)
         except FileNotFoundError:
             return
 
         # TODO: Create more readable names?
 
         # Commercial load profiles.
-        if 'commercial' in os.listdir(load_profile_root):
+        if 'commercial' in self._btm_manifest.listdir(load_profile_root):
             commercial_root = os.path.join(load_profile_root, 'commercial')
 
-            for location_dir in os.scandir(commercial_root):
+            for location_dir in self._btm_manifest.scandir(commercial_root):
                 if not location_dir.name.startswith('.'):
                     location_root = location_dir.path
 
-                    for load_profile in os.scandir(location_root):
+                    for load_profile in self._btm_manifest.scandir(location_root):
                         if not load_profile.name.startswith('.'):
                             profile_key = '/'.join(['commercial', load_profile.name])
                             profile_path = load_profile.path
@@ -174,14 +205,14 @@ class DataManager(EventDispatcher):
                             load_profile_data_bank[profile_key] = profile_path
         
         # Residential load profiles.
-        if 'residential' in os.listdir(load_profile_root):
+        if 'residential' in self._btm_manifest.listdir(load_profile_root):
             residential_root = os.path.join(load_profile_root, 'residential')
 
-            for load_level_dir in os.scandir(residential_root):
+            for load_level_dir in self._btm_manifest.scandir(residential_root):
                 if not load_level_dir.name.startswith('.'):
                     level_root = load_level_dir.path
 
-                    for load_profile in os.scandir(level_root):
+                    for load_profile in self._btm_manifest.scandir(level_root):
                         if not load_profile.name.startswith('.'):
                             profile_key = '/'.join(['residential', load_profile.name])
                             profile_path = load_profile.path
@@ -196,11 +227,11 @@ class DataManager(EventDispatcher):
         pv_profile_data_bank = {}
 
         try:
-            os.listdir(pv_profile_root)
+            self._btm_manifest.listdir(pv_profile_root)
         except FileNotFoundError:
             return
 
-        for pv_profile in os.scandir(pv_profile_root):
+        for pv_profile in self._btm_manifest.scandir(pv_profile_root):
             if not pv_profile.name.startswith('.'):
                 profile_key = pv_profile.name.split('.')[0]
 
@@ -262,6 +293,7 @@ class DataManager(EventDispatcher):
         self.loading_screen.open()
 
         self.data_bank['valuation'] = {}
+        self._invalidate_catalog()
         market_names = []
 
         # Determine the market areas that have downloaded data.
@@ -277,93 +309,82 @@ class DataManager(EventDispatcher):
                 # Stop running this thread so the main Python process can exit.
                 return
 
-            if 'ERCOT' in market_names:
-                self._scan_ercot_data_bank()
-            
-            # Quit?
-            if App.get_running_app().root.stop.is_set():
-                # Stop running this thread so the main Python process can exit.
-                return
-                
-            if 'PJM' in market_names:
-                self._scan_pjm_data_bank()
-            
-            # Quit?
-            if App.get_running_app().root.stop.is_set():
-                # Stop running this thread so the main Python process can exit.
-                return
-                
-            if 'MISO' in market_names:
-                self._scan_miso_data_bank()
-            
-            # Quit?
-            if App.get_running_app().root.stop.is_set():
-                # Stop running this thread so the main Python process can exit.
-                return
+            self._valuation_manifest = self._get_manifest('valuation')
 
-            if 'NYISO' in market_names:
-                self._scan_nyiso_data_bank()
-            
-            # Quit?
-            if App.get_running_app().root.stop.is_set():
-                # Stop running this thread so the main Python process can exit.
-                return
+            scanners = collections.OrderedDict([('ERCOT', self._scan_ercot_data_bank),
+                                                ('PJM', self._scan_pjm_data_bank),
+                                                ('MISO', self._scan_miso_data_bank),
+                                                ('NYISO', self._scan_nyiso_data_bank),
+                                                ('ISONE', self._scan_isone_data_bank),
+                                                ('SPP', self._scan_spp_data_bank),
+                                                ('CAISO', self._scan_caiso_data_bank),
+                                                ])
+            scanners = [(market, scan) for market, scan in scanners.items() if market in market_names]
 
-            if 'ISONE' in market_names:
-                self._scan_isone_data_bank()
-            
-            # Quit?
-            if App.get_running_app().root.stop.is_set():
-                # Stop running this thread so the main Python process can exit.
-                return
+            def _scan_market(market, scan):
+                # Quit?
+                if App.get_running_app().root.stop.is_set():
+                    return None
 
-            if 'SPP' in market_names:
-                self._scan_spp_data_bank()
-            
-            # Quit?
-            if App.get_running_app().root.stop.is_set():
-                # Stop running this thread so the main Python process can exit.
-                return
+                return scan()
+
+            # The markets are scanned concurrently; each result is added in one step when its scan finishes.
+            with ThreadPoolExecutor(max_workers=max(1, min(N_SCAN_WORKERS, len(scanners)))) as executor:
+                futures = {executor.submit(_scan_market, market, scan): market for market, scan in scanners}
+
+                for future in as_completed(futures):
+                    market = futures[future]
+
+                    try:
+                        market_data_bank = future.result()
+                    except Exception as e:
+                        logging.error('DataManager: Could not scan the {market} data bank. ({error})'.format(market=market, error=e))
+                        continue
+
+                    if market_data_bank is not None:
+                        with self._data_bank_lock:
+                            self.data_bank['valuation'][market] = market_data_bank
+
+                        self._invalidate_catalog(market)
 
-            if 'CAISO' in market_names:
-                self._scan_caiso_data_bank()
-            
             # Quit?
             if App.get_running_app().root.stop.is_set():
                 # Stop running this thread so the main Python process can exit.
                 return
 
+            self._valuation_manifest.save()
+
             self.n_threads_scanning -= 1
         
         thread = threading.Thread(target=_scan_valuation_data_bank)
         thread.start()            
     
     def _scan_pjm_data_bank(self):
-        """Scans the PJM data bank."""
+        """Scans the PJM data bank and returns the data available."""
         pjm_root = os.path.join(self.data_bank_root, 'PJM')
         pjm_data_bank = {}
 
         # Scan LMP files.
-        if 'LMP' in os.listdir(pjm_root):
+        if 'LMP' in self._valuation_manifest.listdir(pjm_root):
             pjm_data_bank['LMP'] = {}
             lmp_dir = os.path.join(pjm_root, 'LMP')
 
             # Identify pricing node ID dirs.
-            for node_dir_entry in os.scandir(lmp_dir):
+            for node_dir_entry in self._valuation_manifest.scandir(lmp_dir):
                 if not node_dir_entry.name.startswith('.'):
                     node_id = node_dir_entry.name
                     pjm_data_bank['LMP'][node_id] = {}
                     node_id_dir = node_dir_entry.path
 
                     # Identify year dirs.
-                    for year_dir_entry in os.scandir(node_id_dir):
+                    for year_dir_entry in self._valuation_manifest.scandir(node_id_dir):
                         if not year_dir_entry.name.startswith('.'):
                             year = year_dir_entry.name
                             pjm_data_bank['LMP'][node_id][year] = []
                             year_dir = year_dir_entry.path
 
                             # Identify month files.
-                            for lmp_dir_entry in os.scandir(year_dir):
+                            for lmp_dir_entry in self._valuation_manifest.scandir(year_dir):
                                 if not lmp_dir_entry.name.startswith('.'):
                                     lmp_file = lmp_dir_entry.name
                                     yyyymm, _ = lmp_file.split('_', maxsplit=1)
@@ -371,19 +392,19 @@ class DataManager(EventDispatcher):
                                     pjm_data_bank['LMP'][node_id][year].append(month)
         
         # Scan Reg files.
-        if 'REG' in os.listdir(pjm_root):
+        if 'REG' in self._valuation_manifest.listdir(pjm_root):
             pjm_data_bank['REG'] = {}
             reg_dir = os.path.join(pjm_root, 'REG')
 
             # Identify year dirs.
-            for year_dir_entry in os.scandir(reg_dir):
+            for year_dir_entry in self._valuation_manifest.scandir(reg_dir):
                 if not year_dir_entry.name.startswith('.'):
                     year = year_dir_entry.name
                     pjm_data_bank['REG'][year] = []
                     year_dir = year_dir_entry.path
 
                     # Identify month files.
-                    for reg_dir_entry in os.scandir(year_dir):
+                    for reg_dir_entry in self._valuation_manifest.scandir(year_dir):
                         if not reg_dir_entry.name.startswith('.'):
                             reg_file = reg_dir_entry.name
                             yyyymm, _ = reg_file.split('_', maxsplit=1)
@@ -391,55 +412,55 @@ class DataManager(EventDispatcher):
                             pjm_data_bank['REG'][year].append(month)
         
         # Scan Mileage files.
-        if 'MILEAGE' in os.listdir(pjm_root):
+        if 'MILEAGE' in self._valuation_manifest.listdir(pjm_root):
             pjm_data_bank['MILEAGE'] = {}
             mileage_dir = os.path.join(pjm_root, 'MILEAGE')
 
             # Identify year dirs.
-            for year_dir_entry in os.scandir(mileage_dir):
+            for year_dir_entry in self._valuation_manifest.scandir(mileage_dir):
                 if not year_dir_entry.name.startswith('.'):
                     year = year_dir_entry.name
                     pjm_data_bank['MILEAGE'][year] = []
                     year_dir = year_dir_entry.path
 
                     # Identify month files.
-                    for mileage_dir_entry in os.scandir(year_dir):
+                    for mileage_dir_entry in self._valuation_manifest.scandir(year_dir):
                         if not mileage_dir_entry.name.startswith('.'):
                             mileage_file = mileage_dir_entry.name
                             yyyymm, _ = mileage_file.split('_', maxsplit=1)
                             month = yyyymm[-2:]
                             pjm_data_bank['MILEAGE'][year].append(month)
         
-        self.data_bank['valuation']['PJM'] = pjm_data_bank
+        return pjm_data_bank
     
     def _scan_miso_data_bank(self):
-        """Scans the MISO data bank."""
+        """Scans the MISO data bank and returns the data available."""
         miso_root = os.path.join(self.data_bank_root, 'MISO')
         miso_data_bank = {}
         miso_nodes = self.get_nodes('MISO')
 
         # LMP scan.
-        if 'LMP' in os.listdir(miso_root):
+        if 'LMP' in self._valuation_manifest.listdir(miso_root):
             miso_data_bank['LMP'] = {}
             lmp_dir = os.path.join(miso_root, 'LMP')
 
             # Scan LMP directory structure once.
             miso_lmp_dir_struct = {}
 
-            for year_dir_entry in os.scandir(lmp_dir):
+            for year_dir_entry in self._valuation_manifest.scandir(lmp_dir):
                 if not year_dir_entry.name.startswith('.'):
                     year = year_dir_entry.name
                     year_dir = year_dir_entry.path
                     miso_lmp_dir_struct[year] = []
 
-                    for month_dir_entry in os.scandir(year_dir):
+                    for month_dir_entry in self._valuation_manifest.scandir(year_dir):
                         if not month_dir_entry.name.startswith('.'):
                             month = month_dir_entry.name
                             month_dir = month_dir_entry.path
                             
                             # Get the number of days in the month and compare it to number of files in dir.
                             _, n_days_month = calendar.monthrange(int(year), int(month))
-                            n_files = len([dir_entry for dir_entry in os.scandir(month_dir) if not dir_entry.name.startswith('.')])
+                            n_files = len([dir_entry for dir_entry in self._valuation_manifest.scandir(month_dir) if not dir_entry.name.startswith('.')])
 
                             # Only add the month if it has a full set of data.
                             if n_files == n_days_month:
@@ -450,46 +471,46 @@ class DataManager(EventDispatcher):
                 miso_data_bank['LMP'][node] = tmp_dir                
         
         # MCP scan.
-        if 'MCP' in os.listdir(miso_root):
+        if 'MCP' in self._valuation_manifest.listdir(miso_root):
             miso_data_bank['MCP'] = {}
             mcp_dir = os.path.join(miso_root, 'MCP')
 
-            for year_dir_entry in os.scandir(mcp_dir):
+            for year_dir_entry in self._valuation_manifest.scandir(mcp_dir):
                 if not year_dir_entry.name.startswith('.'):
                     year = year_dir_entry.name
                     year_dir = year_dir_entry.path
                     miso_data_bank['MCP'][year] = []
 
-                    for month_dir_entry in os.scandir(year_dir):
+                    for month_dir_entry in self._valuation_manifest.scandir(year_dir):
                         if not month_dir_entry.name.startswith('.'):
                             month = month_dir_entry.name
                             month_dir = month_dir_entry.path
                             
                             # Get the number of days in the month and matches it to number of files in dir.
                             _, n_days_month = calendar.monthrange(int(year), int(month))
-                            n_files = len([dir_entry for dir_entry in os.scandir(month_dir) if not dir_entry.name.startswith('.')])
+                            n_files = len([dir_entry for dir_entry in self._valuation_manifest.scandir(month_dir) if not dir_entry.name.startswith('.')])
 
                             # Only add the month if it has a full set of data.
                             if n_files == n_days_month:
                                 miso_data_bank['MCP'][year].append(month)
         
-        self.data_bank['valuation']['MISO'] = miso_data_bank
+        return miso_data_bank
     
     def _scan_ercot_data_bank(self):
-        """Scans the ERCOT data bank."""
+        """Scans the ERCOT data bank and returns the data available."""
         ercot_root = os.path.join(self.data_bank_root, 'ERCOT')
         ercot_data_bank = {}
         ercot_nodes = self.get_nodes('ERCOT')
 
         # SPP scan.
-        if 'SPP' in os.listdir(ercot_root):
+        if 'SPP' in self._valuation_manifest.listdir(ercot_root):
             ercot_data_bank['SPP'] = {}
             spp_dir = os.path.join(ercot_root, 'SPP')
 
             # Scan SPP directory structure once.
             ercot_spp_dir_struct = {}
 
-            for year_dir_entry in os.scandir(spp_dir):
+            for year_dir_entry in self._valuation_manifest.scandir(spp_dir):
                 if not year_dir_entry.name.startswith('.'):
                     year = year_dir_entry.name
                     year_dir = year_dir_entry.path
@@ -503,34 +524,33 @@ class DataManager(EventDispatcher):
                 ercot_data_bank['SPP'][node] = tmp_dir
         
         # CCP scan.
-        if 'CCP' in os.listdir(ercot_root):
+        if 'CCP' in self._valuation_manifest.listdir(ercot_root):
             ercot_data_bank['CCP'] = {}
             ccp_dir = os.path.join(ercot_root, 'CCP')
 
             # Determine the years of data downloaded.
-            for year_dir_entry in os.scandir(ccp_dir):
+            for year_dir_entry in self._valuation_manifest.scandir(ccp_dir):
                 if not year_dir_entry.name.startswith('.'):
                     year = year_dir_entry.name
                     year_dir = year_dir_entry.path
                     ercot_data_bank['CCP'][year] = []
 
                     # Verify a file exists in the directory.
-                    if os.listdir(year_dir):
+                    if self._valuation_manifest.listdir(year_dir):
                         ercot_data_bank['CCP'][year].extend([str(x+1).zfill(2) for x in range(0, 12)])
         
-        self.data_bank['valuation']['ERCOT'] = ercot_data_bank
+        return ercot_data_bank
     
     def _scan_nyiso_data_bank(self):
-        """Scans the NYISO data bank."""
+        """Scans the NYISO data bank and returns the data available."""
         nyiso_root = os.path.join(self.data_bank_root, 'NYISO')
         nyiso_data_bank = {}
 
         # LBMP scan.
-        if 'LBMP' in os.listdir(nyiso_root):
+        if 'LBMP' in self._valuation_manifest.listdir(nyiso_root):
             nyiso_data_bank['LBMP'] = {}
 
-            pathf_nodeszones = os.path.join('es_gui', 'apps', 'data_manager', '_static', 'nodes_nyiso.csv')
-            df_nodeszones = pd.read_csv(pathf_nodeszones, index_col=False)
+            df_nodeszones = self._read_static_table('nodes_nyiso.csv', index_col=False)
 
             # Get zone and gen nodes.
             df_zone_nodes = df_nodeszones.loc[df_nodeszones['Node ID'] == df_nodeszones['Zone ID'], :]
@@ -542,20 +562,20 @@ class DataManager(EventDispatcher):
             if os.path.exists(lbmp_dir):
                 nyiso_lbmp_gen_dir_struct = {}
 
-                for year_dir_entry in os.scandir(lbmp_dir):
+                for year_dir_entry in self._valuation_manifest.scandir(lbmp_dir):
                     if not year_dir_entry.name.startswith('.'):
                         year = year_dir_entry.name
                         year_dir = year_dir_entry.path
                         nyiso_lbmp_gen_dir_struct[year] = []
 
-                        for month_dir_entry in os.scandir(year_dir):
+                        for month_dir_entry in self._valuation_manifest.scandir(year_dir):
                             if not month_dir_entry.name.startswith('.'):
                                 month = month_dir_entry.name
                                 month_dir = month_dir_entry.path
 
                                 # Get the number of days in the month and compare it to number of files in dir.
                                 _, n_days_month = calendar.monthrange(int(year), int(month))
-                                n_files = len([dir_entry for dir_entry in os.scandir(month_dir) if not dir_entry.name.startswith('.')])
+                                n_files = len([dir_entry for dir_entry in self._valuation_manifest.scandir(month_dir) if not dir_entry.name.startswith('.')])
 
                                 # Only add the month if it has a full set of data.
                                 if n_files == n_days_month:
@@ -571,20 +591,20 @@ class DataManager(EventDispatcher):
             if os.path.exists(lbmp_dir):
                 nyiso_lbmp_zone_dir_struct = {}
 
-                for year_dir_entry in os.scandir(lbmp_dir):
+                for year_dir_entry in self._valuation_manifest.scandir(lbmp_dir):
                     if not year_dir_entry.name.startswith('.'):
                         year = year_dir_entry.name
                         year_dir = year_dir_entry.path
                         nyiso_lbmp_zone_dir_struct[year] = []
 
-                        for month_dir_entry in os.scandir(year_dir):
+                        for month_dir_entry in self._valuation_manifest.scandir(year_dir):
                             if not month_dir_entry.name.startswith('.'):
                                 month = month_dir_entry.name
                                 month_dir = month_dir_entry.path
 
                                 # Get the number of days in the month and compare it to number of files in dir.
                                 _, n_days_month = calendar.monthrange(int(year), int(month))
-                                n_files = len([dir_entry for dir_entry in os.scandir(month_dir) if not dir_entry.name.startswith('.')])
+                                n_files = len([dir_entry for dir_entry in self._valuation_manifest.scandir(month_dir) if not dir_entry.name.startswith('.')])
 
                                 # Only add the month if it has a full set of data.
                                 if n_files == n_days_month:
@@ -595,17 +615,17 @@ class DataManager(EventDispatcher):
                     nyiso_data_bank['LBMP'][node_id] = tmp_dir
 
         # ASP scan.
-        if 'ASP' in os.listdir(nyiso_root):
+        if 'ASP' in self._valuation_manifest.listdir(nyiso_root):
             nyiso_data_bank['ASP'] = {}
             asp_dir = os.path.join(nyiso_root, 'ASP', 'DAM')
 
-            for year_dir_entry in os.scandir(asp_dir):
+            for year_dir_entry in self._valuation_manifest.scandir(asp_dir):
                 if not year_dir_entry.name.startswith('.'):
                     year = year_dir_entry.name
                     year_dir = year_dir_entry.path
                     nyiso_data_bank['ASP'][year] = []
 
-                    for month_dir_entry in os.scandir(year_dir):
+                    for month_dir_entry in self._valuation_manifest.scandir(year_dir):
                         if not month_dir_entry.name.startswith('.'):
                             month = month_dir_entry.name
                             month_dir = month_dir_entry.path
@@ -613,41 +633,41 @@ class DataManager(EventDispatcher):
                             # Get the number of days in the month and matches it to number of files in dir.
                             _, n_days_month = calendar.monthrange(int(year), int(month))
                             n_files = len \
-                                ([dir_entry for dir_entry in os.scandir(month_dir) if
+                                ([dir_entry for dir_entry in self._valuation_manifest.scandir(month_dir) if
                                   not dir_entry.name.startswith('.')])
 
                             # Only add the month if it has a full set of data.
                             if n_files == n_days_month:
                                 nyiso_data_bank['ASP'][year].append(month)
 
-        self.data_bank['valuation']['NYISO'] = nyiso_data_bank
+        return nyiso_data_bank
 
     def _scan_isone_data_bank(self):
-        """Scans the ISONE data bank."""
+        """Scans the ISONE data bank and returns the data available."""
         isone_root = os.path.join(self.data_bank_root, 'ISONE')
         isone_data_bank = {}
 
         # Scan LMP files.
-        if 'LMP' in os.listdir(isone_root):
+        if 'LMP' in self._valuation_manifest.listdir(isone_root):
             isone_data_bank['LMP'] = {}
             lmp_dir = os.path.join(isone_root, 'LMP')
 
             # Identify pricing node ID dirs.
-            for node_dir_entry in os.scandir(lmp_dir):
+            for node_dir_entry in self._valuation_manifest.scandir(lmp_dir):
                 if not node_dir_entry.name.startswith('.'):
                     node_id = node_dir_entry.name
                     isone_data_bank['LMP'][node_id] = {}
                     node_id_dir = node_dir_entry.path
 
                     # Identify year dirs.
-                    for year_dir_entry in os.scandir(node_id_dir):
+                    for year_dir_entry in self._valuation_manifest.scandir(node_id_dir):
                         if not year_dir_entry.name.startswith('.'):
                             year = year_dir_entry.name
                             isone_data_bank['LMP'][node_id][year] = []
                             year_dir = year_dir_entry.path
 
                             # Identify month files.
-                            for lmp_dir_entry in os.scandir(year_dir):
+                            for lmp_dir_entry in self._valuation_manifest.scandir(year_dir):
                                 if not lmp_dir_entry.name.startswith('.'):
                                     lmp_file = lmp_dir_entry.name
                                     yyyymm, _ = lmp_file.split('_', maxsplit=1)
@@ -655,39 +675,38 @@ class DataManager(EventDispatcher):
                                     isone_data_bank['LMP'][node_id][year].append(month)
 
         # Scan ASP files.
-        if 'RCP' in os.listdir(isone_root):
+        if 'RCP' in self._valuation_manifest.listdir(isone_root):
             isone_data_bank['RCP'] = {}
             rcp_dir = os.path.join(isone_root, 'RCP')
 
             # Identify year dirs.
-            for year_dir_entry in os.scandir(rcp_dir):
+            for year_dir_entry in self._valuation_manifest.scandir(rcp_dir):
                 if not year_dir_entry.name.startswith('.'):
                     year = year_dir_entry.name
                     isone_data_bank['RCP'][year] = []
                     year_dir = year_dir_entry.path
 
                     # Identify month files.
-                    for rcp_dir_entry in os.scandir(year_dir):
+                    for rcp_dir_entry in self._valuation_manifest.scandir(year_dir):
                         if not rcp_dir_entry.name.startswith('.'):
                             rcp_file = rcp_dir_entry.name
                             yyyymm, _ = rcp_file.split('_', maxsplit=1)
                             month = yyyymm[-2:]
                             isone_data_bank['RCP'][year].append(month)
 
-        self.data_bank['valuation']['ISONE'] = isone_data_bank
+        return isone_data_bank
 
     def _scan_spp_data_bank(self):
-        """Scans the SPP data bank."""
+        """Scans the SPP data bank and returns the data available."""
         spp_root = os.path.join(self.data_bank_root, 'SPP')
         spp_data_bank = {}
         # spp_nodes = self.get_nodes('SPP')
 
         # LMP scan.
-        if 'LMP' in os.listdir(spp_root):
+        if 'LMP' in self._valuation_manifest.listdir(spp_root):
             spp_data_bank['LMP'] = {}
 
-            pathf_nodes = os.path.join('es_gui', 'apps', 'data_manager', '_static', 'nodes_spp.csv')
-            df_nodes = pd.read_csv(pathf_nodes, index_col=False)
+            df_nodes = self._read_static_table('nodes_spp.csv', index_col=False)
 
             # Get location and bus nodes.
             df_loc_nodes = df_nodes.loc[df_nodes['Node Type'] == 'Location', :]
@@ -699,20 +718,20 @@ class DataManager(EventDispatcher):
             if os.path.exists(lmp_dir):
                 spp_lmp_loc_dir_struct = {}
 
-                for year_dir_entry in os.scandir(lmp_dir):
+                for year_dir_entry in self._valuation_manifest.scandir(lmp_dir):
                     if not year_dir_entry.name.startswith('.'):
                         year = year_dir_entry.name
                         year_dir = year_dir_entry.path
                         spp_lmp_loc_dir_struct[year] = []
 
-                        for month_dir_entry in os.scandir(year_dir):
+                        for month_dir_entry in self._valuation_manifest.scandir(year_dir):
                             if not month_dir_entry.name.startswith('.'):
                                 month = month_dir_entry.name
                                 month_dir = month_dir_entry.path
 
                                 # Get the number of days in the month and compare it to number of files in dir.
                                 _, n_days_month = calendar.monthrange(int(year), int(month))
-                                n_files = len([dir_entry for dir_entry in os.scandir(month_dir) if
+                                n_files = len([dir_entry for dir_entry in self._valuation_manifest.scandir(month_dir) if
                                                not dir_entry.name.startswith('.')])
 
                                 # Only add the month if it has a full set of data.
@@ -729,20 +748,20 @@ class DataManager(EventDispatcher):
             if os.path.exists(lmp_dir):
                 spp_lmp_bus_dir_struct = {}
 
-                for year_dir_entry in os.scandir(lmp_dir):
+                for year_dir_entry in self._valuation_manifest.scandir(lmp_dir):
                     if not year_dir_entry.name.startswith('.'):
                         year = year_dir_entry.name
                         year_dir = year_dir_entry.path
                         spp_lmp_bus_dir_struct[year] = []
 
-                        for month_dir_entry in os.scandir(year_dir):
+                        for month_dir_entry in self._valuation_manifest.scandir(year_dir):
                             if not month_dir_entry.name.startswith('.'):
                                 month = month_dir_entry.name
                                 month_dir = month_dir_entry.path
 
                                 # Get the number of days in the month and compare it to number of files in dir.
                                 _, n_days_month = calendar.monthrange(int(year), int(month))
-                                n_files = len([dir_entry for dir_entry in os.scandir(month_dir) if
+                                n_files = len([dir_entry for dir_entry in self._valuation_manifest.scandir(month_dir) if
                                                not dir_entry.name.startswith('.')])
 
                                 # Only add the month if it has a full set of data.
@@ -755,58 +774,58 @@ class DataManager(EventDispatcher):
 
 
         # MCP scan.
-        if 'MCP' in os.listdir(spp_root):
+        if 'MCP' in self._valuation_manifest.listdir(spp_root):
             spp_data_bank['MCP'] = {}
             mcp_dir = os.path.join(spp_root, 'MCP', 'DAM')
 
-            for year_dir_entry in os.scandir(mcp_dir):
+            for year_dir_entry in self._valuation_manifest.scandir(mcp_dir):
                 if not year_dir_entry.name.startswith('.'):
                     year = year_dir_entry.name
                     year_dir = year_dir_entry.path
                     spp_data_bank['MCP'][year] = []
 
-                    for month_dir_entry in os.scandir(year_dir):
+                    for month_dir_entry in self._valuation_manifest.scandir(year_dir):
                         if not month_dir_entry.name.startswith('.'):
                             month = month_dir_entry.name
                             month_dir = month_dir_entry.path
 
                             # Get the number of days in the month and matches it to number of files in dir.
                             _, n_days_month = calendar.monthrange(int(year), int(month))
-                            n_files = len([dir_entry for dir_entry in os.scandir(month_dir) if
+                            n_files = len([dir_entry for dir_entry in self._valuation_manifest.scandir(month_dir) if
                                            not dir_entry.name.startswith('.')])
 
                             # Only add the month if it has a full set of data.
                             if n_files == n_days_month:
                                 spp_data_bank['MCP'][year].append(month)
 
-        self.data_bank['valuation']['SPP'] = spp_data_bank
+        return spp_data_bank
     
     def _scan_caiso_data_bank(self):
-        """Scans the CAISO data bank."""
+        """Scans the CAISO data bank and returns the data available."""
         caiso_root = os.path.join(self.data_bank_root, 'CAISO')
         caiso_data_bank = {}
 
         # Scan LMP files.
-        if 'LMP' in os.listdir(caiso_root):
+        if 'LMP' in self._valuation_manifest.listdir(caiso_root):
             caiso_data_bank['LMP'] = {}
             lmp_dir = os.path.join(caiso_root, 'LMP')
 
             # Identify pricing node ID dirs.
-            for node_dir_entry in os.scandir(lmp_dir):
+            for node_dir_entry in self._valuation_manifest.scandir(lmp_dir):
                 if not node_dir_entry.name.startswith('.'):
                     node_id = node_dir_entry.name
                     caiso_data_bank['LMP'][node_id] = {}
                     node_id_dir = node_dir_entry.path
 
                     # Identify year dirs.
-                    for year_dir_entry in os.scandir(node_id_dir):
+                    for year_dir_entry in self._valuation_manifest.scandir(node_id_dir):
                         if not year_dir_entry.name.startswith('.'):
                             year = year_dir_entry.name
                             caiso_data_bank['LMP'][node_id][year] = []
                             year_dir = year_dir_entry.path
 
                             # Identify month files.
-                            for lmp_dir_entry in os.scandir(year_dir):
+                            for lmp_dir_entry in self._valuation_manifest.scandir(year_dir):
                                 if not lmp_dir_entry.name.startswith('.'):
                                     lmp_file = lmp_dir_entry.name
                                     yyyymm, _ = lmp_file.split('_', maxsplit=1)
@@ -814,19 +833,19 @@ class DataManager(EventDispatcher):
                                     caiso_data_bank['LMP'][node_id][year].append(month)
 
         # Scan Reg files.
-        if 'ASP' in os.listdir(caiso_root):
+        if 'ASP' in self._valuation_manifest.listdir(caiso_root):
             caiso_data_bank['ASP'] = {}
             asp_dir = os.path.join(caiso_root, 'ASP')
 
             # Identify year dirs.
-            for year_dir_entry in os.scandir(asp_dir):
+            for year_dir_entry in self._valuation_manifest.scandir(asp_dir):
                 if not year_dir_entry.name.startswith('.'):
                     year = year_dir_entry.name
                     caiso_data_bank['ASP'][year] = []
                     year_dir = year_dir_entry.path
 
                     # Identify month files.
-                    for asp_dir_entry in os.scandir(year_dir):
+                    for asp_dir_entry in self._valuation_manifest.scandir(year_dir):
                         if not asp_dir_entry.name.startswith('.'):
                             asp_file = asp_dir_entry.name
                             yyyymm, _ = asp_file.split('_', maxsplit=1)
@@ -834,39 +853,74 @@ class DataManager(EventDispatcher):
                             caiso_data_bank['ASP'][year].append(month)
 
         # Scan Mileage files.
-        if 'MILEAGE' in os.listdir(caiso_root):
+        if 'MILEAGE' in self._valuation_manifest.listdir(caiso_root):
             caiso_data_bank['MILEAGE'] = {}
             mileage_dir = os.path.join(caiso_root, 'MILEAGE')
 
             # Identify year dirs.
-            for year_dir_entry in os.scandir(mileage_dir):
+            for year_dir_entry in self._valuation_manifest.scandir(mileage_dir):
                 if not year_dir_entry.name.startswith('.'):
                     year = year_dir_entry.name
                     caiso_data_bank['MILEAGE'][year] = []
                     year_dir = year_dir_entry.path
 
                     # Identify month files.
-                    for mileage_dir_entry in os.scandir(year_dir):
+                    for mileage_dir_entry in self._valuation_manifest.scandir(year_dir):
                         if not mileage_dir_entry.name.startswith('.'):
                             mileage_file = mileage_dir_entry.name
                             yyyymm, _ = mileage_file.split('_', maxsplit=1)
                             month = yyyymm[-2:]
                             caiso_data_bank['MILEAGE'][year].append(month)
 
-        self.data_bank['valuation']['CAISO'] = caiso_data_bank
+        return caiso_data_bank
     
+    def _read_static_table(self, fname, **kwargs):
+        """Reads the static table fname in the _static directory with pandas.read_csv() and keyword arguments kwargs, once per session."""
+        key = (fname, tuple(sorted(kwargs.items())))
+
+        with self._catalog_lock:
+            table = self._static_tables.get(key)
+
+        if table is None:
+            table = pd.read_csv(os.path.join('es_gui', 'apps', 'data_manager', '_static', fname), **kwargs)
+
+            with self._catalog_lock:
+                self._static_tables[key] = table
+
+        return table
+
+    def _invalidate_catalog(self, market_area=None):
+        """Clears the memoized nodes and revenue streams of market_area, or of every market area if None, after its data bank has been scanned."""
+        with self._catalog_lock:
+            if market_area is None:
+                self._node_catalog.clear()
+                self._revstream_catalog.clear()
+            else:
+                self._node_catalog.pop(market_area, None)
+                self._revstream_catalog = {key: value for key, value in self._revstream_catalog.items() if key[0] != market_area}
+
     def get_nodes(self, market_area):
-        """Retrieves all available pricing nodes for the given market_area."""
+        """Retrieves all available pricing nodes for the given market_area. The result is memoized until the data bank is scanned again and must not be modified."""
+        with self._catalog_lock:
+            nodes = self._node_catalog.get(market_area)
+
+        if nodes is None:
+            nodes = self._build_nodes(market_area)
+
+            with self._catalog_lock:
+                self._node_catalog[market_area] = nodes
+
+        return nodes
+
+    def _build_nodes(self, market_area):
+        """Builds the dictionary of available pricing nodes for the given market_area."""
         if market_area == 'ERCOT':
             # Reads static node ID list.
-            static_ercot_node_list = os.path.join('es_gui', 'apps', 'data_manager', '_static', 'nodes_ercot.csv')
-
-            node_df = pd.read_csv(static_ercot_node_list)
+            node_df = self._read_static_table('nodes_ercot.csv')
             node_dict = {row[0]: row[1] for row in zip(node_df['Node ID'], node_df['Node Name'])}
         elif market_area == 'PJM':
             # Reads static node ID list.
-            static_pjm_node_list = os.path.join('es_gui', 'apps', 'data_manager', '_static', 'nodes_pjm.csv')
-            node_df = pd.read_csv(static_pjm_node_list)
+            node_df = self._read_static_table('nodes_pjm.csv')
             node_mapping = {str(row[0]): '{nodename} ({nodeid})'.format(nodename=row[1], nodeid=row[0]) for row in zip(node_df['Node ID'], node_df['Node Name'])}
 
             # Reads keys of PJM LMP data bank.
@@ -874,14 +928,11 @@ class DataManager(EventDispatcher):
             node_dict = {node_id: node_mapping.get(node_id, node_id) for node_id in node_id_list}
         elif market_area == 'MISO':
             # Reads static node ID list.
-            static_miso_node_list = os.path.join('es_gui', 'apps', 'data_manager', '_static', 'nodes_miso.csv')
-
-            node_df = pd.read_csv(static_miso_node_list)
+            node_df = self._read_static_table('nodes_miso.csv')
             node_dict = {row[0]: row[1] for row in zip(node_df['Node ID'], node_df['Node Name'])}
         elif market_area == 'NYISO':
             # Reads static node ID list.
-            static_nyiso_node_list = os.path.join('es_gui', 'apps', 'data_manager', '_static', 'nodes_nyiso.csv')
-            node_df = pd.read_csv(static_nyiso_node_list)
+            node_df = self._read_static_table('nodes_nyiso.csv')
             node_mapping = {row[0]: row[1] for row in zip(node_df['Node ID'], node_df['Node Name'])}
 
             # Reads keys of NYISO LBMP data bank.
@@ -889,8 +940,7 @@ class DataManager(EventDispatcher):
             node_dict = {node_id: node_mapping.get(node_id, node_id) for node_id in node_id_list}
         elif market_area == 'ISONE':
             # Reads static node ID list.
-            static_isone_node_list = os.path.join('es_gui', 'apps', 'data_manager', '_static', 'nodes_isone.csv')
-            node_df = pd.read_csv(static_isone_node_list, encoding="cp1252")
+            node_df = self._read_static_table('nodes_isone.csv', encoding="cp1252")
 
             node_dict = {str(row[0]): '{nodename} ({nodeid})'.format(nodename=row[1], nodeid=row[0]) for row in zip(node_df['Node ID'], node_df['Node Name'])}
 
@@ -899,14 +949,11 @@ class DataManager(EventDispatcher):
             node_dict = {node_id: node_dict.get(node_id, node_id) for node_id in node_id_list}
         elif market_area == 'SPP':
             # Reads static node ID list.
-            static_spp_node_list = os.path.join('es_gui', 'apps', 'data_manager', '_static', 'nodes_spp.csv')
-
-            node_df = pd.read_csv(static_spp_node_list)
+            node_df = self._read_static_table('nodes_spp.csv')
             node_dict = {row[0]: row[1] for row in zip(node_df['Node ID'], node_df['Node Name'])}
         elif market_area == 'CAISO':
             # Reads static node ID list.
-            static_caiso_node_list = os.path.join('es_gui', 'apps', 'data_manager', '_static', 'nodes_caiso.csv')
-            node_df = pd.read_csv(static_caiso_node_list)
+            node_df = self._read_static_table('nodes_caiso.csv')
 
             node_id_list = self.data_bank['valuation']['CAISO']['LMP'].keys()
             node_dict = {node_x: node_x for node_x in node_id_list}
@@ -920,11 +967,30 @@ class DataManager(EventDispatcher):
         return return_dict
     
     def get_valuation_revstreams(self, market_area, node):
-        """Retrieves the available revenue streams for a given node in a given market_area based on downloaded data."""
+        """Retrieves the available revenue streams for a given node in a given market_area based on downloaded data. The result is memoized until the data bank is scanned again and must not be modified."""
+        key = (market_area, node)
+
+        with self._catalog_lock:
+            rev_stream_dict = self._revstream_catalog.get(key)
+
+        if rev_stream_dict is None:
+            rev_stream_dict = self._build_valuation_revstreams(market_area, node)
+
+            with self._catalog_lock:
+                self._revstream_catalog[key] = rev_stream_dict
+
+        return rev_stream_dict
+
+    def _build_valuation_revstreams(self, market_area, node):
+        """Builds the dictionary of available revenue streams for a given node in a given market_area."""
         rev_stream_dict = {}
 
-        with open(os.path.join('es_gui', 'apps', 'data_manager', '_static', 'valuation_rev_streams.json'), 'r') as fp:
-            rev_stream_defs = json.load(fp).get(market_area, {})
+        with self._catalog_lock:
+            if self._rev_stream_defs is None:
+                with open(os.path.join('es_gui', 'apps', 'data_manager', '_static', 'valuation_rev_streams.json'), 'r') as fp:
+                    self._rev_stream_defs = json.load(fp)
+
+            rev_stream_defs = self._rev_stream_defs.get(market_area, {})
 
         if market_area == 'ERCOT':
             ercot_data_bank = self.data_bank['valuation']['ERCOT']
@@ -0,0 +1,546 @@
+from __future__ import absolute_import
+
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+from urllib.parse import urlsplit
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import threading
+import time
+import zipfile
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# HTTP status codes worth retrying: rate limiting and transient server errors.
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+class DownloadCancelled(Exception):
+    """Raised when a download is stopped before it completes."""
+
+
+class DownloadJob():
+    """
+    A file to download with a DownloadEngine.
+
+    :param url: The URL to download.
+    :param label: A short description of the file for log messages, e.g., its date.
+    :param handle: A function called with the requests.Response once the file is downloaded, e.g., to save it; it may return the list of files it wrote.
+    :param params: Query parameters for the request.
+    :param headers: Headers for the request.
+    :param alternates: URLs to try in order, if the server responds to url with a client error, e.g., because the file has moved.
+    :param destination: The path of the file that the job produces, or the first of them, used to track its completion in a DownloadManifest.
+    :param alternates_group: A key shared by jobs whose URL and alternates are organized alike, e.g., the days of a month; once an alternate works for one of them, the others try it first.
+    """
+    def __init__(self, url, label, handle, params=None, headers=None, alternates=(), destination=None, alternates_group=None):
+        self.url = url
+        self.label = label
+        self.handle = handle
+        self.params = params
+        self.headers = headers
+        self.alternates = list(alternates)
+        self.destination = destination
+        self.alternates_group = alternates_group
+
+
+class DownloadEngine():
+    """
+    A shared HTTP download engine: one requests.Session with keep-alive connection pools, a bound on the number of concurrent requests to each host, and retries with exponential backoff for connection errors, timeouts, and rate-limiting and transient server errors.
+
+    run() downloads a list of DownloadJobs on a pool of worker threads, reporting the outcome of each job through callbacks; get() makes a single request through the same pools and limits for downloaders with their own control flow.
+
+    :param max_workers: The maximum number of jobs downloaded at a time by run().
+    :param max_per_host: The maximum number of concurrent requests to each host.
+    :param max_attempts: The maximum number of attempts of each request.
+    :param backoff: The delay before the first retry [s], doubled for each later retry and randomized by up to half of it.
+    :param max_backoff: The maximum delay between retries [s].
+    :param timeout: The connect and read timeout of each request [s].
+    """
+    def __init__(self, max_workers=8, max_per_host=4, max_attempts=7, backoff=0.5, max_backoff=30.0, timeout=10):
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(max_workers, max_per_host))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._host_limits = {}
+        self._rate_limits = {}
+        self._preferred_urls = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+
+            return self._host_limits[host]
+
+    def set_rate_limit(self, host, requests_per_minute):
+        """Limits the requests to host, e.g., 'api.pjm.com', to the given number per minute, spaced evenly; None or a number that is not positive removes the limit."""
+        with self._lock:
+            if requests_per_minute is not None and requests_per_minute > 0:
+                self._rate_limits[host] = TokenBucket(requests_per_minute/60.0)
+            else:
+                self._rate_limits.pop(host, None)
+
+    def _delay(self, attempt, response=None):
+        """Returns the delay before retrying after the given attempt, honoring a Retry-After header given in seconds."""
+        if response is not None:
+            try:
+                return min(float(response.headers['Retry-After']), self.max_backoff)
+            except (KeyError, ValueError):
+                pass
+
+        delay = min(self.backoff*2**(attempt - 1), self.max_backoff)
+
+        return delay*(1 + 0.5*random.random())
+
+    def get(self, url, params=None, headers=None, auth=None, ssl_verify=True, proxy_settings=None, stop=None, max_attempts=None, timeout=None):
+        """
+        Requests url, retrying connection errors, timeouts, and status codes in RETRY_STATUS_CODES with exponential backoff, and returns the successful requests.Response.
+
+        Raises requests.HTTPError for other error status codes or when out of attempts, the last requests.RequestException when out of attempts, and DownloadCancelled if stop() returns True between attempts.
+
+        :param stop: A function returning True if the download should be stopped.
+        :param max_attempts: The maximum number of attempts, if other than the engine's.
+        """
+        max_attempts = max_attempts or self.max_attempts
+        host_limit = self._host_limit(url)
+        rate_limit = self._rate_limits.get(urlsplit(url).netloc)
+
+        for attempt in range(1, max_attempts + 1):
+            if stop is not None and stop():
+                raise(DownloadCancelled(url))
+
+            response = None
+
+            if rate_limit is not None:
+                rate_limit.acquire(stop)
+
+            try:
+                with host_limit:
+                    response = self.session.get(url, params=params, headers=headers, auth=auth, proxies=proxy_settings, verify=ssl_verify, timeout=timeout or self.timeout)
+
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return response
+
+                if attempt == max_attempts:
+                    response.raise_for_status()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == max_attempts or isinstance(e, requests.exceptions.ProxyError):
+                    raise
+
+            delay = self._delay(attempt, response)
+
+            if rate_limit is not None and response is not None and response.status_code == 429:
+                # Hold back every request to the host, not just this one.
+                rate_limit.pause(delay)
+
+            logging.info('Download engine: Retrying {url} in {delay:.1f} s (attempt {attempt} of {max_attempts}).'.format(url=url, delay=delay, attempt=attempt, max_attempts=max_attempts))
+
+            # Wait for the delay, checking whether to stop a few times a second.
+            resume = time.monotonic() + delay
+
+            while time.monotonic() < resume:
+                if stop is not None and stop():
+                    raise(DownloadCancelled(url))
+
+                time.sleep(min(0.2, resume - time.monotonic()))
+
+    @staticmethod
+    def plan(jobs, manifest):
+        """Splits the jobs into those still to download and those whose files are complete according to the DownloadManifest, returning the two lists."""
+        pending = []
+        complete = []
+
+        for job in jobs:
+            if job.destination is not None and manifest.is_complete(job.destination):
+                complete.append(job)
+            else:
+                pending.append(job)
+
+        return pending, complete
+
+    def run(self, jobs, ssl_verify=True, proxy_settings=None, stop=None, on_progress=None, on_log=None, log_name='Download engine', manifest=None):
+        """
+        Downloads the jobs concurrently and returns the list of jobs that failed. Jobs not started when stop() returns True are not attempted and not reported.
+
+        :param jobs: A list of DownloadJobs.
+        :param stop: A function returning True if the downloads should be stopped.
+        :param on_progress: A function called with each job and whether it succeeded once it is finished.
+        :param on_log: A function called with a message for the user when a job fails.
+        :param log_name: The name to prefix log messages with, e.g., 'MISOdownloader'.
+        :param manifest: A DownloadManifest to record the completed jobs in; it is saved when the run ends, including when it is stopped.
+        """
+        failed = []
+        failed_lock = threading.Lock()
+
+        def _run_job(job):
+            if stop is not None and stop():
+                return
+
+            ok = False
+
+            try:
+                response = self._get_job(job, ssl_verify, proxy_settings, stop)
+                fnames = job.handle(response)
+
+                if manifest is not None and job.destination is not None:
+                    manifest.record(job.destination, fnames or [job.destination], job.url)
+            except DownloadCancelled:
+                return
+            except Exception as e:
+                message = describe_error(e)
+                logging.error('{name}: {label}: {message} ({error})'.format(name=log_name, label=job.label, message=message, error=repr(e)))
+
+                if on_log is not None:
+                    on_log('{label}: {message}'.format(label=job.label, message=message))
+
+                with failed_lock:
+                    failed.append(job)
+            else:
+                ok = True
+
+            if on_progress is not None:
+                on_progress(job, ok)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(_run_job, jobs))
+        finally:
+            if manifest is not None:
+                manifest.save()
+
+        return failed
+
+    def _get_job(self, job, ssl_verify, proxy_settings, stop):
+        """Downloads the job, trying its alternate URLs in order if the server responds with a client error. The URL that worked last for the job's alternates_group is tried first."""
+        urls = [job.url] + job.alternates
+
+        with self._lock:
+            preferred = self._preferred_urls.get(job.alternates_group, 0) if job.alternates_group is not None else 0
+
+        order = sorted(range(len(urls)), key=lambda ix: ix != preferred)
+
+        for n, ix in enumerate(order):
+            try:
+                response = self.get(urls[ix], params=job.params, headers=job.headers, ssl_verify=ssl_verify, proxy_settings=proxy_settings, stop=stop)
+            except requests.HTTPError as e:
+                status_code = e.response.status_code if e.response is not None else None
+
+                if n == len(order) - 1 or status_code is None or not 400 <= status_code < 500:
+                    raise
+            else:
+                if job.alternates_group is not None and ix != preferred:
+                    with self._lock:
+                        self._preferred_urls[job.alternates_group] = ix
+
+                return response
+
+
+class TokenBucket():
+    """
+    A token bucket rate limiter shared by threads: acquire() takes a token, waiting until one is available. Tokens are added at a constant rate up to the capacity of the bucket; a capacity of 1 spaces requests evenly, which keeps them within a quota over any window.
+
+    :param rate: The number of tokens added per second.
+    :param capacity: The maximum number of tokens, i.e., the largest burst of requests allowed.
+    """
+    def __init__(self, rate, capacity=1):
+        if not rate > 0:
+            raise(ValueError('The rate of a TokenBucket must be positive (got {0}).'.format(rate)))
+
+        self.rate = rate
+        self.capacity = capacity
+
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, stop=None):
+        """Takes a token, waiting until one is available. Raises DownloadCancelled if stop() returns True while waiting."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated)*self.rate)
+                self._updated = now
+
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    wait = (1 - self._tokens)/self.rate
+
+            if stop is not None and stop():
+                raise(DownloadCancelled())
+
+            time.sleep(min(wait, 0.2))
+
+    def pause(self, delay):
+        """Empties the bucket and holds back all tokens for delay seconds, e.g., when the server reports that the quota was exceeded."""
+        with self._lock:
+            self._tokens = 0
+            self._updated = time.monotonic()
+            self._paused_until = max(self._paused_until, self._updated + delay)
+
+
+class RequestScheduler():
+    """
+    Runs tasks on a pool of worker threads in order of priority, lowest first; tasks of equal priority run in the order they were submitted. Tasks may submit further tasks, e.g., to split a request that failed into smaller ones, and run() returns once there are none left.
+
+    :param n_workers: The number of tasks to run at a time.
+    """
+    def __init__(self, n_workers=4):
+        self.n_workers = n_workers
+
+        self._queue = []
+        self._seq = 0
+        self._n_running = 0
+        self._cond = threading.Condition()
+
+    def submit(self, priority, task, *args):
+        """Schedules calling task(*args) with the given priority."""
+        with self._cond:
+            heapq.heappush(self._queue, (priority, self._seq, task, args))
+            self._seq += 1
+            self._cond.notify()
+
+    def run(self, stop=None):
+        """Runs the scheduled tasks until none are left, or until stop() returns True, in which case the tasks not yet started are dropped."""
+        def _work():
+            while True:
+                with self._cond:
+                    while not self._queue and self._n_running:
+                        self._cond.wait(0.2)
+
+                    if not self._queue or (stop is not None and stop()):
+                        self._cond.notify_all()
+                        return
+
+                    _, _, task, args = heapq.heappop(self._queue)
+                    self._n_running += 1
+
+                try:
+                    task(*args)
+                except DownloadCancelled:
+                    pass
+                except Exception as e:
+                    logging.error('Download engine: A scheduled task failed. ({0})'.format(repr(e)))
+                finally:
+                    with self._cond:
+                        self._n_running -= 1
+                        self._cond.notify_all()
+
+        workers = [threading.Thread(target=_work) for _ in range(self.n_workers)]
+
+        for worker in workers:
+            worker.start()
+
+        for worker in workers:
+            worker.join()
+
+        with self._cond:
+            self._queue = []
+
+
+def save_to(fname):
+    """Returns a DownloadJob handler that saves the response body to fname, creating its directory. The file is written to a hidden .part file next to it and then renamed so that an interrupted download never leaves a partial file under the final name, nor a file that directory scans count as downloaded; the .part file is removed if writing fails."""
+    def _save(response):
+        _write_atomic(fname, response.content)
+
+        return [fname]
+
+    return _save
+
+
+def extract_to(dirname):
+    """Returns a DownloadJob handler that extracts the zip archive in the response body into dirname, creating it. Each file is written atomically as in save_to, in reverse order of name so that the first, which downloaders check for, is written last."""
+    def _extract(response):
+        fnames = []
+
+        with zipfile.ZipFile(io.BytesIO(response.content)) as z:
+            for name in sorted(z.namelist(), reverse=True):
+                if name.endswith('/'):
+                    continue
+
+                fname = os.path.join(dirname, os.path.basename(name))
+                _write_atomic(fname, z.read(name))
+                fnames.append(fname)
+
+        return fnames
+
+    return _extract
+
+
+def _write_atomic(fname, content):
+    dirname, basename = os.path.split(fname)
+    os.makedirs(dirname or '.', exist_ok=True)
+    tmp_fname = os.path.join(dirname, '.{0}.part'.format(basename))
+
+    try:
+        with open(tmp_fname, 'wb') as f:
+            f.write(content)
+
+        os.replace(tmp_fname, fname)
+    except BaseException:
+        try:
+            os.remove(tmp_fname)
+        except OSError:
+            pass
+
+        raise
+
+
+class DownloadManifest():
+    """
+    A persisted record of the completed download jobs in a data directory, used to resume bulk downloads: on a rerun, DownloadEngine.plan() skips the jobs whose files are verified complete and only the rest are downloaded.
+
+    Each job is recorded under its destination with the size, modification time, and SHA-256 checksum of every file it wrote. A file is verified with a single os.stat() call while its size and modification time are unchanged; if only the modification time has changed, its checksum is compared instead. Files that exist but were never recorded, e.g., downloaded before the manifest was introduced, are taken to be complete and recorded.
+
+    The manifest is written at most every autosave_interval seconds as jobs complete and when a DownloadEngine run ends, so at most a few seconds of records are lost in a crash; the files of those jobs are complete, as they are renamed into place, and are recorded again on the next run.
+
+    :param fname: The path of the manifest file; recorded paths are relative to its directory.
+    :param autosave_interval: The minimum number of seconds between writes of the manifest while recording jobs.
+    """
+    def __init__(self, fname, autosave_interval=5.0):
+        self.fname = fname
+        self.root = os.path.dirname(os.path.abspath(fname))
+        self.autosave_interval = autosave_interval
+
+        self._records = None
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._lock = threading.RLock()
+
+    def _load(self):
+        try:
+            with open(self.fname, 'r') as f:
+                self._records = json.load(f)
+        except FileNotFoundError:
+            self._records = {}
+        except (ValueError, OSError) as e:
+            logging.warning('Download engine: Could not read the download manifest {fname}, verifying files again. ({error})'.format(fname=self.fname, error=e))
+            self._records = {}
+
+    def _key(self, fname):
+        return os.path.relpath(os.path.abspath(fname), self.root).replace(os.sep, '/')
+
+    def _describe(self, fname, checksum=None):
+        """Returns the [size, modification time, checksum] record of the file at fname."""
+        stat = os.stat(fname)
+
+        return [stat.st_size, stat.st_mtime_ns, checksum or _sha256(fname)]
+
+    def is_complete(self, destination):
+        """Returns True if the job with the given destination has been recorded and all of its files are unchanged, or if its destination exists but was never recorded."""
+        with self._lock:
+            if self._records is None:
+                self._load()
+
+            key = self._key(destination)
+            record = self._records.get(key)
+
+            if record is None:
+                if os.path.isfile(destination) and os.path.getsize(destination) > 0:
+                    self._records[key] = {'url': None, 'files': {key: self._describe(destination)}}
+                    self._dirty = True
+
+                    return True
+
+                return False
+
+            for file_key, (size, mtime_ns, checksum) in record['files'].items():
+                fname = os.path.join(self.root, file_key)
+
+                try:
+                    stat = os.stat(fname)
+                except OSError:
+                    return False
+
+                if stat.st_size != size:
+                    return False
+                elif stat.st_mtime_ns != mtime_ns:
+                    if _sha256(fname) != checksum:
+                        return False
+
+                    record['files'][file_key] = [size, stat.st_mtime_ns, checksum]
+                    self._dirty = True
+
+            return True
+
+    def record(self, destination, fnames, url=None):
+        """Records the job with the given destination as complete, along with the files it wrote."""
+        files = {self._key(fname): self._describe(fname) for fname in fnames}
+
+        with self._lock:
+            if self._records is None:
+                self._load()
+
+            self._records[self._key(destination)] = {'url': url, 'files': files}
+            self._dirty = True
+
+            if time.monotonic() - self._last_save > self.autosave_interval:
+                self.save()
+
+    def save(self):
+        """Writes the manifest file if any job was recorded since it was last written."""
+        with self._lock:
+            if not self._dirty:
+                return
+
+            tmp_fname = '{0}.{1}.tmp'.format(self.fname, os.getpid())
+
+            try:
+                os.makedirs(self.root, exist_ok=True)
+
+                with open(tmp_fname, 'w') as f:
+                    json.dump(self._records, f)
+
+                os.replace(tmp_fname, self.fname)
+            except OSError as e:
+                logging.warning('Download engine: Could not write the download manifest {fname}. ({error})'.format(fname=self.fname, error=e))
+            else:
+                self._dirty = False
+
+            self._last_save = time.monotonic()
+
+
+def _sha256(fname):
+    h = hashlib.sha256()
+
+    with open(fname, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+
+    return h.hexdigest()
+
+
+def describe_error(e):
+    """Returns a short description of a download error for the user."""
+    if isinstance(e, requests.HTTPError):
+        return 'HTTPError: {0}'.format(e.response.status_code if e.response is not None else e)
+    elif isinstance(e, requests.exceptions.ProxyError):
+        return 'Could not connect to proxy.'
+    elif isinstance(e, requests.ConnectionError):
+        return 'Failed to establish a connection to the host server.'
+    elif isinstance(e, requests.Timeout):
+        return 'The connection timed out.'
+    else:
+        return 'An unexpected error has occurred. ({0})'.format(repr(e))
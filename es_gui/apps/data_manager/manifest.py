@@ -0,0 +1,105 @@
+from __future__ import absolute_import
+
+from collections import namedtuple
+import json
+import logging
+import os
+import threading
+import time
+
+
+ManifestEntry = namedtuple('ManifestEntry', ['name', 'path'])
+
+
+class ScanManifest():
+    """
+    A persisted record of the directory listings of a data bank scan, used in place of os.scandir() and os.listdir() so that rescanning only lists the directories that have changed.
+
+    A directory's listing is reused while its modification time is unchanged, which is the case until an entry is added to, removed from, or renamed in it; each directory is therefore checked with a single os.stat() call instead of being listed. Listings taken within a couple of seconds of the directory's last modification are not reused, as file systems with coarse timestamps could miss a later change in the same tick.
+
+    Call begin() before a scan and save() after it; save() writes only the directories listed or checked during the scan, which drops the ones that no longer exist.
+
+    :param fname: The path of the manifest file.
+    """
+    # Listings taken within this many seconds of the directory's modification time are not reused.
+    racy_window = 2.0
+
+    def __init__(self, fname):
+        self.fname = fname
+
+        self._listings = None
+        self._visited = set()
+        self._lock = threading.Lock()
+
+        self.n_listed = 0
+        self.n_reused = 0
+
+    def _load(self):
+        try:
+            with open(self.fname, 'r') as f:
+                self._listings = json.load(f)
+        except FileNotFoundError:
+            self._listings = {}
+        except (ValueError, OSError) as e:
+            logging.warning('DataManager: Could not read the scan manifest {fname}, scanning everything. ({error})'.format(fname=self.fname, error=e))
+            self._listings = {}
+
+    def begin(self):
+        """Starts a scan."""
+        with self._lock:
+            if self._listings is None:
+                self._load()
+
+            self._visited = set()
+            self.n_listed = 0
+            self.n_reused = 0
+
+    def listdir(self, path):
+        """Returns the names of the entries in the directory at path, as os.listdir() does. Raises FileNotFoundError if it does not exist."""
+        mtime_ns = os.stat(path).st_mtime_ns
+
+        with self._lock:
+            if self._listings is None:
+                self._load()
+
+            self._visited.add(path)
+            listing = self._listings.get(path)
+
+            if listing is not None and listing[0] == mtime_ns:
+                self.n_reused += 1
+                return list(listing[2])
+
+        names = os.listdir(path)
+        scanned_ns = time.time_ns()
+
+        with self._lock:
+            if scanned_ns - mtime_ns > self.racy_window*1e9:
+                self._listings[path] = [mtime_ns, scanned_ns, names]
+            else:
+                self._listings.pop(path, None)
+
+            self.n_listed += 1
+
+        return list(names)
+
+    def scandir(self, path):
+        """Returns the entries in the directory at path as a list of (name, path) named tuples, standing in for os.scandir() where only those attributes are used."""
+        return [ManifestEntry(name, os.path.join(path, name)) for name in self.listdir(path)]
+
+    def save(self):
+        """Writes the listings of the directories visited since begin() to the manifest file."""
+        with self._lock:
+            self._listings = {path: listing for path, listing in self._listings.items() if path in self._visited}
+            listings = dict(self._listings)
+
+        tmp_fname = '{0}.{1}.tmp'.format(self.fname, os.getpid())
+
+        try:
+            with open(tmp_fname, 'w') as f:
+                json.dump(listings, f)
+
+            os.replace(tmp_fname, self.fname)
+        except OSError as e:
+            logging.warning('DataManager: Could not write the scan manifest {fname}. ({error})'.format(fname=self.fname, error=e))
+
+        logging.info('DataManager: Listed {n_listed} directories and reused {n_reused} unchanged listings.'.format(n_listed=self.n_listed, n_reused=self.n_reused))
@@ -45,11 +45,20 @@ from es_gui.apps.data_manager.data_manager import DataManagerException
 from es_gui.tools.charts import RateScheduleChart
 from es_gui.apps.data_manager.rate_structure import RateStructureDataScreen
 from es_gui.apps.data_manager.utils import check_connection_settings
+from es_gui.apps.data_manager.download_engine import DownloadEngine, DownloadJob, DownloadManifest, DownloadCancelled, RequestScheduler, save_to, extract_to
 
 
 MAX_THREADS = 4
 MAX_WHILE_ATTEMPTS = 7
 
+# Shared by the ISO panels so that their requests reuse keep-alive connections and respect one limit per host.
+DOWNLOAD_ENGINE = DownloadEngine(max_workers=2*MAX_THREADS, max_per_host=MAX_THREADS, max_attempts=MAX_WHILE_ATTEMPTS)
+DOWNLOAD_MANIFEST_NAME = '.download_manifest.json'
+
+PJM_API_HOST = 'api.pjm.com'
+# One month of hourly LMPs is about 745 rows per node, so this many nodes fit in one 50000 row page.
+PJM_NODES_PER_REQUEST = 50
+
 URL_OPENEI_IOU = "https://openei.org/doe-opendata/dataset/53490bd4-671d-416d-aae2-de844d2d2738/resource/500990ae-ada2-4791-9206-01dc68e36f12/download/iouzipcodes2017.csv"
 URL_OPENEI_NONIOU = "https://openei.org/doe-opendata/dataset/53490bd4-671d-416d-aae2-de844d2d2738/resource/672523aa-0d8a-4e6c-8a10-67e311bb1691/download/noniouzipcodes2017.csv"
 APIROOT_OPENEI = "https://api.openei.org/utility_rates?"
@@ -223,8 +232,8 @@ class DataManagerPanelERCOT(BoxLayout):
         for ixlp, urlERCOT_list_x in enumerate(urlERCOT_list):
             try:
                 # Retrieve the webpage and parse for .zip files.
-                page = requests.get(urlERCOT_list_x, timeout=10, proxies=proxy_settings, verify=ssl_verify)
-                soup_ERCOT_page = BeautifulSoup(pssage.content, 'html.parser')
+                page = DOWNLOAD_ENGINE.get(urlERCOT_list_x, proxy_settings=proxy_settings, ssl_verify=ssl_verify)
+                soup_ERCOT_page = BeautifulSoup(page.content, 'html.parser')
 
                 zipfileslinks_ERCOT_page = []
                 for link in soup_ERCOT_page.find_all('a'):
@@ -273,7 +282,7 @@ class DataManagerPanelERCOT(BoxLayout):
                     if not os.path.exists(des_dir):
                         os.makedirs(des_dir)
 
-                    r = requests.get(urldown, timeout=10, proxies=proxy_settings, verify=ssl_verify)
+                    r = DOWNLOAD_ENGINE.get(urldown, proxy_settings=proxy_settings, ssl_verify=ssl_verify)
                     z = zipfile.ZipFile(io.BytesIO(r.content))
                     z.extractall(des_dir)
             except IndexError as e:
@@ -590,14 +599,10 @@ class DataManagerPanelISONE(BoxLayout):
                                     break
 
                                 try:
-                                    with requests.Session() as req:
-                                        http_request = req.get(datadownload_url, auth=(username, password),
-                                                               proxies=proxy_settings, timeout=6, verify=ssl_verify,
-                                                               stream=True)
-                                        if http_request.status_code == requests.codes.ok:
-                                            trydownloaddate = False
-                                        else:
-                                            http_request.raise_for_status()
+                                    http_request = DOWNLOAD_ENGINE.get(datadownload_url, auth=(username, password),
+                                                                       proxy_settings=proxy_settings, ssl_verify=ssl_verify,
+                                                                       max_attempts=1, timeout=6)
+                                    trydownloaddate = False
 
                                 except requests.HTTPError as e:
                                     logging.error('ISONEdownloader: {0}: {1}'.format(date_str, repr(e)))
@@ -1040,27 +1045,21 @@ class DataManagerPanelMISO(BoxLayout):
             for date in monthrange:
                 total_days += calendar.monthrange(date.year, date.month)[1]
 
-            self.n_active_threads = len(monthrange)
-
             # (Re)set the progress bar and output log.
             self.progress_bar.value = 0
             self.progress_bar.max = 2*total_days
             self.output_log.text = ''
 
-            # Split up the download requests to accomodate the maximum amount of allowable threads.
-            job_batches = batch_splitter(monthrange)
-
-            self.n_active_threads = len(job_batches)
-
             # Check connection settings.
             ssl_verify, proxy_settings = check_connection_settings()
 
-            # Spawn a new thread for each download_MISO_data call.
-            for batch in job_batches:
-                thread_downloader = threading.Thread(target=self._download_MISO_data, 
-                args=(batch[0], batch[-1]),
-                kwargs={'ssl_verify': ssl_verify, 'proxy_settings': proxy_settings})
-                thread_downloader.start()
+            # The shared download engine handles the concurrency of the requests.
+            self.n_active_threads = 1
+
+            thread_downloader = threading.Thread(target=self._download_MISO_data, 
+            args=(datetime_start, datetime_end),
+            kwargs={'ssl_verify': ssl_verify, 'proxy_settings': proxy_settings})
+            thread_downloader.start()
     
     def _download_MISO_data(self, datetime_start, datetime_end=None, path='data', ssl_verify=True, proxy_settings=None):
         """Downloads a range of monthly MISO day ahead LMP and MCP data.
@@ -1084,6 +1083,8 @@ class DataManagerPanelMISO(BoxLayout):
         monthrange = pd.date_range(datetime_start, datetime_end, freq='1MS')
         monthrange.union([monthrange[-1] + 1])
 
+        jobs = []
+
         for date in monthrange:
             year = date.year
             month = date.month
@@ -1092,110 +1093,18 @@ class DataManagerPanelMISO(BoxLayout):
             _, n_days_month = calendar.monthrange(year, month)
 
             for day in [x+1 for x in range(n_days_month)]:
-                # Quit?
-                if App.get_running_app().root.stop.is_set() or self.request_cancel.is_set():
-                    # Stop running this thread so the main Python process can exit.
-                    self.n_active_threads -= 1
-                    return
-
                 date = dt.date(year, month, day)
                 date_str = date.strftime('%Y%m%d')
 
-                # LMP call.
-                lmp_url = ''.join(['https://docs.misoenergy.org/marketreports/', date_str, '_da_exante_lmp.csv'])
-                destination_dir = os.path.join(path, 'MISO', 'LMP', date.strftime('%Y'), date.strftime('%m'))
-                destination_file = os.path.join(destination_dir, '_'.join([date_str, 'da_exante_lmp.csv']))
+                for product, url_suffix, fname_suffix in [('LMP', '_da_exante_lmp.csv', 'da_exante_lmp.csv'), ('MCP', '_asm_exante_damcp.csv', 'asm_exante_damcp.csv')]:
+                    url = ''.join(['https://docs.misoenergy.org/marketreports/', date_str, url_suffix])
+                    destination_dir = os.path.join(path, 'MISO', product, date.strftime('%Y'), date.strftime('%m'))
+                    destination_file = os.path.join(destination_dir, '_'.join([date_str, fname_suffix]))
 
-                if os.path.exists(destination_file):
-                    # Skip downloading the daily file if it already exists where expected.
-                    logging.info('MISOdownloader: {0}: LMP file already exists, skipping...'.format(date_str))
-                else:
-                    try:
-                        with requests.Session() as s:
-                            http_request = s.get(lmp_url, stream=True, proxies=proxy_settings, verify=ssl_verify)
-                        
-                        # Check the HTTP status code.
-                        if http_request.status_code == requests.codes.ok:
-                            data = http_request.content.decode('utf-8')
-                        else:
-                            http_request.raise_for_status()
-                    except requests.HTTPError as e:
-                        logging.error('MISOdownloader: {0}: {1}'.format(date_str, repr(e)))
-                        Clock.schedule_once(partial(self.update_output_log, '{0}: HTTPError: {1}'.format(date_str, e.response.status_code)), 0)
-                        self.thread_failed = True
-                    except requests.ConnectionError as e:
-                        logging.error('MISOdownloader: {0}: Failed to establish a connection to the host server.'.format(date_str))
-                        Clock.schedule_once(partial(self.update_output_log, '{0}: Failed to establish a connection to the host server.'.format(date_str)), 0)
-                        self.thread_failed = True
-                    except requests.Timeout as e:
-                        logging.error('MISOdownloader: {0}: The connection timed out.'.format(date_str))
-                        Clock.schedule_once(partial(self.update_output_log, '{0}: The connection timed out.'.format(date_str)), 0)
-                        self.thread_failed = True
-                    except requests.RequestException as e:
-                        logging.error('MISOdownloader: {0}: {1}'.format(date_str, repr(e)))
-                        self.thread_failed = True
-                    except Exception as e:
-                        # Something else went wrong.
-                        logging.error('MISOdownloader: {0}: An unexpected error has occurred. ({1})'.format(date_str, repr(e)))
-                        Clock.schedule_once(partial(self.update_output_log, '{0}: An unexpected error has occurred. ({1})'.format(date_str, repr(e))), 0)
-                        self.thread_failed = True
-                    else:
-                        os.makedirs(destination_dir, exist_ok=True)
-                        output_file = open(destination_file, 'w')
-                        output_file.write(data)
-                        output_file.close()
+                    jobs.append(DownloadJob(url, date_str, save_to(destination_file), destination=destination_file))
 
-                Clock.schedule_once(self.increment_progress_bar, 0)
-                
-                # MCP call.
-                mcp_url = ''.join(['https://docs.misoenergy.org/marketreports/', date_str, '_asm_exante_damcp.csv'])
-                destination_dir = os.path.join(path, 'MISO', 'MCP', date.strftime('%Y'), date.strftime('%m'))
-                destination_file = os.path.join(destination_dir, '_'.join([date_str, 'asm_exante_damcp.csv']))
-
-                if os.path.exists(destination_file):
-                    # Skip downloading the daily file if it already exists where expected.
-                    logging.info('MISOdownloader: {0}: MCP file already exists, skipping...'.format(date_str))
-                else:
-                    try:
-                        with requests.Session() as s:
-                            http_request = s.get(mcp_url, stream=True, proxies=proxy_settings, verify=ssl_verify)
-                        
-                        # Check the HTTP status code.
-                        if http_request.status_code == requests.codes.ok:
-                            data = http_request.content.decode('utf-8')
-                        else:
-                            http_request.raise_for_status()
-                    except requests.HTTPError as e:
-                        logging.error('MISOdownloader: {0}: {1}'.format(date_str, repr(e)))
-                        Clock.schedule_once(partial(self.update_output_log, '{0}: HTTPError: {1}'.format(date_str, e.response.status_code), 0))
-                        self.thread_failed = True
-                    except requests.exceptions.ProxyError:
-                        logging.error('MISOdownloader: {0}: Could not connect to proxy.'.format(date_str))
-                        Clock.schedule_once(partial(self.update_output_log, '{0}: Could not connect to proxy.'.format(date_str)), 0)
-                        self.thread_failed = True
-                    except requests.ConnectionError as e:
-                        logging.error('MISOdownloader: {0}: Failed to establish a connection to the host server.'.format(date_str))
-                        Clock.schedule_once(partial(self.update_output_log, '{0}: Failed to establish a connection to the host server.'.format(date_str)), 0)
-                        self.thread_failed = True
-                    except requests.Timeout as e:
-                        logging.error('MISOdownloader: {0}: The connection timed out.'.format(date_str))
-                        Clock.schedule_once(partial(self.update_output_log, '{0}: The connection timed out.'.format(date_str)), 0)
-                        self.thread_failed = True
-                    except requests.RequestException as e:
-                        logging.error('MISOdownloader: {0}: {1}'.format(date_str, repr(e)))
-                        self.thread_failed = True
-                    except Exception as e:
-                        # Something else went wrong.
-                        logging.error('MISOdownloader: {0}: An unexpected error has occurred. ({1})'.format(date_str, repr(e)))
-                        Clock.schedule_once(partial(self.update_output_log, '{0}: An unexpected error has occurred. ({1})'.format(date_str, repr(e))), 0)
-                        self.thread_failed = True
-                    else:
-                        os.makedirs(destination_dir, exist_ok=True)
-                        output_file = open(destination_file, 'w')
-                        output_file.write(data)
-                        output_file.close()
-                
-                Clock.schedule_once(self.increment_progress_bar, 0)
+        manifest = DownloadManifest(os.path.join(path, 'MISO', DOWNLOAD_MANIFEST_NAME))
+        run_download_jobs(self, jobs, 'MISOdownloader', manifest=manifest, ssl_verify=ssl_verify, proxy_settings=proxy_settings)
 
         self.n_active_threads -= 1
 
@@ -1326,11 +1235,6 @@ class DataManagerPanelNYISO(BoxLayout):
             monthrange = pd.date_range(datetime_start, datetime_end, freq='1MS')
             monthrange.union([monthrange[-1] + 1])
 
-            # Distribute the requests for multiple threads.
-            job_batches = batch_splitter(monthrange)
-
-            self.n_active_threads = len(job_batches)
-
             # (Re)set the progress bar and output log.
             self.progress_bar.value = 0
             if nodes_selected == 'both':
@@ -1342,16 +1246,17 @@ class DataManagerPanelNYISO(BoxLayout):
             # Check connection settings.
             ssl_verify, proxy_settings = check_connection_settings()
 
-            # Spawn a new thread for each download_NYISO_data call.
-            for batch in job_batches:
-                thread_downloader = threading.Thread(target=self._download_NYISO_data,
-                                                     args=(batch[0], batch[-1]),
-                                                     kwargs={'ssl_verify': ssl_verify,
-                                                             'proxy_settings': proxy_settings, 
-                                                             'zone_gen': nodes_selected,
-                                                             'RT_DAM': 'DAM'})
+            # The shared download engine handles the concurrency of the requests.
+            self.n_active_threads = 1
 
-                thread_downloader.start()
+            thread_downloader = threading.Thread(target=self._download_NYISO_data,
+                                                 args=(datetime_start, datetime_end),
+                                                 kwargs={'ssl_verify': ssl_verify,
+                                                         'proxy_settings': proxy_settings, 
+                                                         'zone_gen': nodes_selected,
+                                                         'RT_DAM': 'DAM'})
+
+            thread_downloader.start()
 
     def _download_NYISO_data(self, datetime_start, datetime_end=None, typedat="both", RT_DAM="both", zone_gen="both",
                             path='data', ssl_verify=True, proxy_settings=None):
@@ -1479,13 +1384,14 @@ class DataManagerPanelNYISO(BoxLayout):
             dam_or_rt_nam = dam_or_rt_ASP_nam + dam_or_rt_LBMP_nam
             lbmp_or_asp_folder = ["ASP"] * len(dam_or_rt_ASP_nam) + ["LBMP"] * len(dam_or_rt_LBMP_nam)
 
+        jobs = []
+
         for date in monthrange:
             date_str = date.strftime('%Y%m')
 
             for sx, dam_or_rt_nam_x in enumerate(dam_or_rt_nam):
 
                 # Data download call.
-                # datadownload_url = url_NYISO + dam_or_rt_nam_x + "/" + date_str + "01" + dam_or_rt_nam_x + zone_or_gen_nam[sx] + "_csv.zip"
                 datadownload_url = ''.join(
                     ['http://mis.nyiso.com/public/csv/', dam_or_rt_nam_x, '/', date_str, '01', dam_or_rt_nam_x,
                      zone_or_gen_nam[sx], "_csv.zip"])
@@ -1493,95 +1399,11 @@ class DataManagerPanelNYISO(BoxLayout):
                                                zone_or_gen_folder[sx], date.strftime('%Y'), date.strftime('%m'))
                 first_name_file = os.path.join(destination_dir,
                                                ''.join([date_str, '01', dam_or_rt_nam_x, zone_or_gen_nam[sx], '.csv']))
-                # print(datadownload_url)
-
-                if not os.path.exists(first_name_file):
-                    trydownloaddate = True
-                    wx = 0
-                    while trydownloaddate:
-                        # Quit?
-                        if App.get_running_app().root.stop.is_set() or self.request_cancel.is_set():
-                            # Stop running this thread so the main Python process can exit.
-                            self.n_active_threads -= 1
-                            return
-
-                        wx = wx + 1
-                        if wx >= MAX_WHILE_ATTEMPTS:
-                            logging.warning('NYISOdownloader: {0} {1}: Hit download retry limit.'.format(date_str, lbmp_or_asp_folder[sx]))
-                            Clock.schedule_once(partial(self.update_output_log, '{0} {1}: Hit download retry limit.'.format(date_str, lbmp_or_asp_folder[sx])), 0)
-                            trydownloaddate = False
-                            break
-                        
-                        try:
-                            with requests.Session() as req:
-                                http_request = req.get(datadownload_url, proxies=proxy_settings, timeout=6,
-                                                       verify=ssl_verify, stream=True)
 
-                            if http_request.status_code == requests.codes.ok:
-                                trydownloaddate = False
-                            else:
-                                http_request.raise_for_status()
-                        except requests.HTTPError as e:
-                            logging.error('NYISOdownloader: {0}: {1}'.format(date_str, repr(e)))
-                            Clock.schedule_once(partial(self.update_output_log,
-                                                        '{0}: HTTPError: {1}'.format(date_str, e.response.status_code)), 0)
-                            if wx >= (MAX_WHILE_ATTEMPTS - 1):
-                                self.thread_failed = True
-                        except requests.exceptions.ProxyError:
-                            logging.error('NYISOdownloader: {0}: Could not connect to proxy.'.format(date_str))
-                            # Clock.schedule_once(
-                            #     partial(self.update_output_log, '{0}: Could not connect to proxy.'.format(date_str)), 0)
-                            if wx >= (MAX_WHILE_ATTEMPTS - 1):
-                                self.thread_failed = True
-                        except requests.ConnectionError as e:
-                            logging.error(
-                                'NYISOdownloader: {0}: Failed to establish a connection to the host server.'.format(
-                                    date_str))
-                            # Clock.schedule_once(partial(self.update_output_log,
-                            #                             '{0}: Failed to establish a connection to the host server.'.format(
-                            #                                 date_str)), 0)
-                            if wx >= (MAX_WHILE_ATTEMPTS - 1):
-                                self.thread_failed = True
-                        except requests.Timeout as e:
-                            trydownloaddate = True
-                            logging.error('NYISOdownloader: {0}: The connection timed out.'.format(date_str))
-                            Clock.schedule_once(
-                                partial(self.update_output_log, '{0}: The connection timed out.'.format(date_str)), 0)
-                            if wx >= (MAX_WHILE_ATTEMPTS - 1):
-                                self.thread_failed = True
-                        except requests.RequestException as e:
-                            logging.error('NYISOdownloader: {0}: {1}'.format(date_str, repr(e)))
-                            if wx >= (MAX_WHILE_ATTEMPTS - 1):
-                                self.thread_failed = True
-                        except Exception as e:
-                            # Something else went wrong.
-                            logging.error(
-                                'NYISOdownloader: {0}: An unexpected error has occurred. ({1})'.format(date_str,
-                                                                                                       repr(e)))
-                            Clock.schedule_once(partial(self.update_output_log,
-                                                        '{0}: An unexpected error has occurred. ({1})'.format(date_str,
-                                                                                                              repr(e))), 0)
-                            if wx >= (MAX_WHILE_ATTEMPTS - 1):
-                                self.thread_failed = True
-                        else:
-                            os.makedirs(destination_dir, exist_ok=True)
-                            z = zipfile.ZipFile(io.BytesIO(http_request.content))
-                            z.extractall(destination_dir)
-                else:
-                    # Skip downloading the daily file if it already exists where expected.
-                    logging.info('NYISOdownloader: {0}: {1} file already exists, skipping...'.format(date_str,
-                                                                                                     lbmp_or_asp_folder[
-                                                                                                         sx]))
-                    self.update_output_log('{0}: {1} file already exists, skipping...'.format(date_str, lbmp_or_asp_folder[sx]))
+                jobs.append(DownloadJob(datadownload_url, '{0} {1}'.format(date_str, lbmp_or_asp_folder[sx]), extract_to(destination_dir), destination=first_name_file))
 
-                # Increment progress bar.
-                Clock.schedule_once(self.increment_progress_bar, 0)
-
-                # Quit?
-                if App.get_running_app().root.stop.is_set() or self.request_cancel.is_set():
-                    # Stop running this thread so the main Python process can exit.
-                    self.n_active_threads -= 1
-                    return
+        manifest = DownloadManifest(os.path.join(path, 'NYISO', DOWNLOAD_MANIFEST_NAME))
+        run_download_jobs(self, jobs, 'NYISOdownloader', manifest=manifest, ssl_verify=ssl_verify, proxy_settings=proxy_settings)
 
         self.n_active_threads -= 1
 
@@ -1717,11 +1539,6 @@ class DataManagerPanelSPP(BoxLayout):
             for date in monthrange:
                 total_days += calendar.monthrange(date.year, date.month)[1]
 
-            # Distribute the requests for multiple threads.
-            job_batches = batch_splitter(monthrange)
-
-            self.n_active_threads = len(job_batches)
-
             # (Re)set the progress bar and output log.
             self.progress_bar.value = 0
             if nodes_selected == 'both':
@@ -1733,14 +1550,15 @@ class DataManagerPanelSPP(BoxLayout):
             # Check connection settings.
             ssl_verify, proxy_settings = check_connection_settings()
 
-            # Spawn a new thread for each download_SPP_data call.
-            for batch in job_batches:
-                thread_downloader = threading.Thread(target=self._download_SPP_data, args=(batch[0], batch[-1]),
-                                                     kwargs={'ssl_verify': ssl_verify,
-                                                             'proxy_settings': proxy_settings,
-                                                             'bus_loc': nodes_selected})
+            # The shared download engine handles the concurrency of the requests.
+            self.n_active_threads = 1
 
-                thread_downloader.start()
+            thread_downloader = threading.Thread(target=self._download_SPP_data, args=(datetime_start, datetime_end),
+                                                 kwargs={'ssl_verify': ssl_verify,
+                                                         'proxy_settings': proxy_settings,
+                                                         'bus_loc': nodes_selected})
+
+            thread_downloader.start()
 
     def _download_SPP_data(self, datetime_start, datetime_end=None, typedat="all", bus_loc="both", path='data/',
                           ssl_verify=True, proxy_settings=None):
@@ -1814,6 +1632,8 @@ class DataManagerPanelSPP(BoxLayout):
             lmp_or_mpc_folder = ["MCP"] * len(case_MCP_URL) + ["LMP"] * len(case_LMP_URL)
             case_URL = case_MCP_URL + case_LMP_URL
 
+        jobs = []
+
         for sx, case_URL_x in enumerate(case_URL):
             for date in monthrange:
                 _, n_days_month = calendar.monthrange(date.year, date.month)
@@ -1822,12 +1642,21 @@ class DataManagerPanelSPP(BoxLayout):
                     date_str = date.strftime('%Y%m') + str(day).zfill(2)
                     destination_dir = os.path.join(path, 'SPP', lmp_or_mpc_folder[sx], 'DAM', bus_or_loc_folder[sx],
                                                    date.strftime('%Y'), date.strftime('%m'))
+                    alternate_urls = []
+                    alternates_group = None
 
                     if lmp_or_mpc_folder[sx] == "LMP":
                         name_file = "DA-LMP-{0:s}-{1:d}{2:02d}{3:02d}0100.csv".format(bus_or_loc_nam[sx], date.year,
                                                                                       date.month, day)
                         URL_compl = "?path=%2F{0:d}%2F{1:02d}%2F{2:s}".format(date.year, date.month, foldercompl_da[0])
 
+                        # Some months are not organized by day; the server responds with a 406 for those paths.
+                        URL_compl_alt = "?path=%2F{0:d}%2F{1:02d}%2F{2:s}".format(date.year, date.month, foldercompl_da[1])
+                        alternate_urls.append(''.join([case_URL_x, bus_or_loc_folder[sx], URL_compl_alt, name_file]))
+
+                        # Once a day of the month is found in one of the two paths, try that path first for the other days.
+                        alternates_group = ('SPP', bus_or_loc_folder[sx], date.year, date.month)
+
                     elif lmp_or_mpc_folder[sx] == "MCP":
                         name_file = "DA-MCP-{0:d}{1:02d}{2:02d}0100.csv".format(date.year, date.month, day)
                         URL_compl = "?path=%2F{0:d}%2F{1:02d}%2F".format(date.year, date.month)
@@ -1835,127 +1664,10 @@ class DataManagerPanelSPP(BoxLayout):
                     destination_file = os.path.join(destination_dir, name_file)
                     datadownload_url = ''.join([case_URL_x, bus_or_loc_folder[sx], URL_compl, name_file])
 
-                    if not os.path.exists(destination_file):
-
-                        # print(datadownload_url)
-
-                        trydownloaddate = True
-                        wx = 0
-                        while trydownloaddate:
-                            # Quit?
-                            if App.get_running_app().root.stop.is_set() or self.request_cancel.is_set():
-                                # Stop running this thread so the main Python process can exit.
-                                self.n_active_threads -= 1
-                                return
-
-                            wx = wx + 1
-                            if wx >= MAX_WHILE_ATTEMPTS:
-                                logging.warning('SPPdownloader: {0} {1}: Hit download retry limit.'.format(date_str, lmp_or_mpc_folder[sx]))
-                                Clock.schedule_once(partial(self.update_output_log,
-                                                            '{0} {1}: Hit download retry limit'.format(date_str, lmp_or_mpc_folder[sx])), 0)
-
-                                print("Hit wx limit")
-                                trydownloaddate = False
-                                break
-
-                            try:
-                                with requests.Session() as req:
-                                    http_request = req.get(datadownload_url, proxies=proxy_settings, timeout=6,
-                                                           verify=ssl_verify, stream=True)
-
-                                http_request_f = http_request
-                                if http_request.status_code == requests.codes.ok:
-                                    trydownloaddate = False
-                                    # self.thread_failed = False
-                                elif http_request.status_code == 406:
-                                    # Try again!
-                                    if lmp_or_mpc_folder[sx] == "LMP":
-                                        name_file = "DA-LMP-{0:s}-{1:d}{2:02d}{3:02d}0100.csv".format(bus_or_loc_nam[sx], date.year, date.month, day)
-                                        URL_compl = "?path=%2F{0:d}%2F{1:02d}%2F{2:s}".format(date.year, date.month, foldercompl_da[1])
-                                    datadownload_url = ''.join(
-                                        [case_URL_x, bus_or_loc_folder[sx], URL_compl, name_file])
-                                    # print(datadownload_url)
-                                    # print('Try LMP again!!!')
-                                    with requests.Session() as req:
-                                        http_request2 = req.get(datadownload_url, proxies=proxy_settings, timeout=6,
-                                                                verify=ssl_verify, stream=True)
-                                    if http_request2.status_code == requests.codes.ok:
-                                        trydownloaddate = False
-                                        foldercompl_aux = foldercompl_da[1]
-                                        foldercompl_da[1] = foldercompl_da[0]
-                                        foldercompl_da[0] = foldercompl_aux
-                                        http_request_f = http_request2
-                                    elif http_request.status_code == 406:
-                                        trydownloaddate = False
-                                        http_request.raise_for_status()
-                                        http_request2.raise_for_status()
-                                    else:
-                                        http_request.raise_for_status()
-                                        http_request2.raise_for_status()
-                                else:
-                                    http_request.raise_for_status()
-
-                            except requests.HTTPError as e:
-                                logging.error('SPPdownloader: {0}: {1}'.format(date_str, repr(e)))
-                                Clock.schedule_once(partial(self.update_output_log,
-                                                            '{0}: HTTPError: {1}'.format(date_str, e.response.status_code)), 0)
-                                if wx >= (MAX_WHILE_ATTEMPTS-1):
-                                    self.thread_failed = True
-                            except requests.exceptions.ProxyError:
-                                logging.error('SPPdownloader: {0}: Could not connect to proxy.'.format(date_str))
-                                Clock.schedule_once(
-                                    partial(self.update_output_log, '{0}: Could not connect to proxy.'.format(date_str)), 0)
-                                if wx >= (MAX_WHILE_ATTEMPTS-1):
-                                    self.thread_failed = True
-                            except requests.ConnectionError as e:
-                                logging.error(
-                                    'SPPdownloader: {0}: Failed to establish a connection to the host server.'.format(
-                                        date_str))
-                                Clock.schedule_once(partial(self.update_output_log,
-                                                            '{0}: Failed to establish a connection to the host server.'.format(date_str)), 0)
-                                if wx >= (MAX_WHILE_ATTEMPTS-1):
-                                    self.thread_failed = True
-                            except requests.Timeout as e:
-                                trydownloaddate = True
-                                logging.error('SPPdownloader: {0}: The connection timed out.'.format(date_str))
-                                Clock.schedule_once(
-                                    partial(self.update_output_log, '{0}: The connection timed out.'.format(date_str)), 0)
-                                if wx >= (MAX_WHILE_ATTEMPTS-1):
-                                    self.thread_failed = True
-                            except requests.RequestException as e:
-                                logging.error('SPPdownloader: {0}: {1}'.format(date_str, repr(e)))
-                                if wx >= (MAX_WHILE_ATTEMPTS-1):
-                                    self.thread_failed = True
-                            except Exception as e:
-                                # Something else went wrong.
-                                logging.error(
-                                    'SPPdownloader: {0}: An unexpected error has occurred. ({1})'.format(date_str,
-                                                                                                         repr(e)))
-                                Clock.schedule_once(partial(self.update_output_log,
-                                                            '{0}: An unexpected error has occurred. ({1})'.format(date_str, repr(e))), 0)
-                                if wx >= (MAX_WHILE_ATTEMPTS-1):
-                                    self.thread_failed = True
-                            else:
-                                os.makedirs(destination_dir, exist_ok=True)
-                                urldata_str = http_request_f.content.decode('utf-8')  #
-                                output_file = open(destination_file, 'w')
-                                output_file.write(urldata_str)
-                                output_file.close()
-                                # print("Successful SPP data download")
-
-
-                    else:
-                        # Skip downloading the daily file if it already exists where expected.
-                        logging.info('SPPdownloader: {0}: {1} file already exists, skipping...'.format(date_str, lmp_or_mpc_folder[sx]))
-                        # print('SPPdownloader: {0}: {1} file already exists, skipping...'.format(date_str, lmp_or_mpc_folder[sx]))
-
-                    Clock.schedule_once(self.increment_progress_bar, 0)
+                    jobs.append(DownloadJob(datadownload_url, '{0} {1}'.format(date_str, lmp_or_mpc_folder[sx]), save_to(destination_file), alternates=alternate_urls, destination=destination_file, alternates_group=alternates_group))
 
-                    # Quit?
-                    if App.get_running_app().root.stop.is_set():
-                        # Stop running this thread so the main Python process can exit.
-                        self.n_active_threads -= 1
-                        return
+        manifest = DownloadManifest(os.path.join(path, 'SPP', DOWNLOAD_MANIFEST_NAME))
+        run_download_jobs(self, jobs, 'SPPdownloader', manifest=manifest, ssl_verify=ssl_verify, proxy_settings=proxy_settings)
 
         self.n_active_threads -= 1
 
@@ -2410,23 +2122,9 @@ class DataManagerPanelCAISO(BoxLayout):
                 break
 
             try:
-                # print("go in try")
-                with requests.Session() as req:
-                    # print("go in with")
-                    http_request = req.get(url_CAISO, params=params_dict, proxies=proxy_settings, timeout=7,
-                                           verify=ssl_verify)
-                    # Check the HTTP status code.
-
-                    # print(http_request.status_code, http_request.reason)
-                    if http_request.status_code == requests.codes.ok:
-                        trydownloaddate = False
-                        # self.thread_failed = False
-                    elif http_request.status_code == 429:
-                        # time.sleep(5.5)  # delays for 5.5 seconds
-                        http_request.raise_for_status()
-                    else:
-                        # time.sleep(5.1)  # delays for 5.1 seconds
-                        http_request.raise_for_status()
+                # The retry loop here paces the requests for OASIS, so the engine only makes one attempt.
+                http_request = DOWNLOAD_ENGINE.get(url_CAISO, params=params_dict, proxy_settings=proxy_settings,
+                                                   ssl_verify=ssl_verify, max_attempts=1, timeout=7)
 
             except requests.HTTPError as e:
                 logging.error('CAISOdownloader: {0}: {1}'.format(log_identifier, repr(e)))
@@ -2600,12 +2298,25 @@ class DataManagerPanelPJM(BoxLayout):
         Clock.schedule_once(partial(self.update_output_log, 'Canceling download requests...'), 0)
         self.cancel_download_button.disabled = True
 
+    def _get_requests_per_minute(self):
+        """Gets the number of API requests per minute allowed from the settings; 0 means no limit."""
+        try:
+            requests_per_minute = App.get_running_app().config.getfloat('data_manager_pjm', 'pjm_requests_per_minute')
+        except ValueError:
+            raise (InputError('Please enter a number for the PJM requests per minute in the settings.'))
+
+        if requests_per_minute < 0:
+            raise (InputError('Please enter a PJM requests per minute setting that is not negative (got {0:g}).'.format(requests_per_minute)))
+
+        return requests_per_minute
+
     def execute_download(self):
         """Executes the data downloader for PJM data based on options selected in GUI.
         
         """
         try:
             sub_key, datetime_start, datetime_end, node_type_selected = self.get_inputs()
+            requests_per_minute = self._get_requests_per_minute()
         except ValueError as e:
             popup = WarningPopup()
             popup.popup_text.text = str(e)
@@ -2618,15 +2329,6 @@ class DataManagerPanelPJM(BoxLayout):
             self.execute_download_button.disabled = True
             self.cancel_download_button.disabled = False
 
-            # Compute the range of months to iterate over.
-            monthrange = pd.date_range(datetime_start, datetime_end, freq='1MS')
-            monthrange.union([monthrange[-1] + 1])
-
-            # Split up the download requests to accomodate the maximum amount of allowable threads.
-            job_batches = batch_splitter(monthrange)
-
-            self.n_active_threads = len(job_batches)
-
             # (Re)set the progress bar and output log.
             self.progress_bar.value = 0
             self.progress_bar.max = 0
@@ -2635,15 +2337,16 @@ class DataManagerPanelPJM(BoxLayout):
             # Check connection settings.
             ssl_verify, proxy_settings = check_connection_settings()
 
-            # Spawn a new thread for each download_PJM_data call.
-            for batch in job_batches:
-                thread_downloader = threading.Thread(target=self._download_PJM_data, 
-                args=(sub_key, batch[0], batch[-1]),
-                kwargs={'ssl_verify': ssl_verify, 'proxy_options': proxy_settings, 'nodes': node_type_selected})
-                thread_downloader.start()
+            # Pace the API requests to the subscription key's quota.
+            DOWNLOAD_ENGINE.set_rate_limit(PJM_API_HOST, requests_per_minute)
 
-            # thread_downloader = threading.Thread(target=self._download_PJM_data, args=(sub_key, datetime_start, datetime_end), kwargs={'nodes': node_type_selected, 'ssl_verify': False})
-            # thread_downloader.start()
+            # The request scheduler handles the concurrency of the requests.
+            self.n_active_threads = 1
+
+            thread_downloader = threading.Thread(target=self._download_PJM_data, 
+            args=(sub_key, datetime_start, datetime_end),
+            kwargs={'ssl_verify': ssl_verify, 'proxy_options': proxy_settings, 'nodes': node_type_selected})
+            thread_downloader.start()
     
     def _download_PJM_data(self, subs_key, datetime_start, datetime_end=None, typedat="all", nodes=[], foldersave='data', proxy_options={}, ssl_verify=True):
         
@@ -2708,192 +2411,233 @@ class DataManagerPanelPJM(BoxLayout):
             folderprice.append("/PJM/MILEAGE/")
             lmp_or_reg = ["mileage"]
 
+        # Market-wide regulation data is requested first, as every PJM valuation needs it, then LMPs month by month.
+        scheduler = RequestScheduler(n_workers=MAX_THREADS)
+        connection = {'headers': headers, 'proxy_settings': proxy_options, 'ssl_verify': ssl_verify,
+                      'stop': lambda: App.get_running_app().root.stop.is_set() or self.request_cancel.is_set()}
+
         for ixlp, urlPJM_list_x in enumerate(urlPJM_list):
             for dx in date_download:
-                yearx = dx[0:4]
-                monthx = dx[4:]
+                priority = (1 if lmp_or_reg[ixlp] == "lmp" else 0, dx)
+
+                # Looking up the nodes is an API request itself, so planning the month is scheduled too.
+                scheduler.submit(priority, self._plan_PJM_month, scheduler, priority, subs_key, urlPJM_list_x,
+                                 lmp_or_reg[ixlp], folderprice[ixlp], dx, nodes, foldersave, connection)
+
+        scheduler.run(stop=connection['stop'])
+
+        self.n_active_threads -= 1
 
-                ndaysmonthx = calendar.monthrange(int(yearx), int(monthx))
-                ndaysmonthx = int(ndaysmonthx[1])
+    def _plan_PJM_month(self, scheduler, priority, subs_key, urlPJM, dtype, folder, dx, nodes, foldersave, connection):
+        """Determines the files to download for a month of PJM data and schedules the requests for them, coalescing up to PJM_NODES_PER_REQUEST nodes per LMP request."""
+        yearx = dx[0:4]
+        monthx = dx[4:]
 
-                nodetypesPJM = ['ZONE', 'LOAD', 'GEN', 'AGGREGATE', 'HUB', 'EHV', 'INTERFACE', 'EXT', 'RESIDUAL_METERED_EDC']
+        ndaysmonthx = calendar.monthrange(int(yearx), int(monthx))
+        ndaysmonthx = int(ndaysmonthx[1])
 
-                pnode_look_list = []
-                if lmp_or_reg[ixlp] == "lmp":
-                    if not nodes:
-                        nodelist = getPJMnodes(subs_key, dx, nodetype=[], proxydict=proxy_options, ssl_verify=ssl_verify)
+        nodetypesPJM = ['ZONE', 'LOAD', 'GEN', 'AGGREGATE', 'HUB', 'EHV', 'INTERFACE', 'EXT', 'RESIDUAL_METERED_EDC']
+
+        proxy_options = connection['proxy_settings']
+        ssl_verify = connection['ssl_verify']
+
+        pnode_look_list = []
+        if dtype == "lmp":
+            if not nodes:
+                nodelist = getPJMnodes(subs_key, dx, nodetype=[], proxydict=proxy_options, ssl_verify=ssl_verify, stop=connection['stop'])
+            else:
+                nodelist = []
+                for node_x in nodes:
+
+                    isnodetype = [True for nodetypePJM_x in nodetypesPJM if node_x == nodetypePJM_x]
+
+                    if isnodetype:
+                        nodelist_x = getPJMnodes(subs_key, dx, nodetype=node_x, proxydict=proxy_options, ssl_verify=ssl_verify, stop=connection['stop'])
+                        nodelist = nodelist + nodelist_x
                     else:
-                        nodelist = []
-                        for node_x in nodes:
+                        nodelist.append(node_x)
+
+            logging.info('PJMdownloader: Number of nodes in this call: {0}.'.format(str(len(nodelist))))
+            pnode_look_list = nodelist
+        elif dtype == "reg":
+            pnode_look_list = ["n/a"]
+        elif dtype == "mileage":
+            pnode_look_list = ["n/a"]
+        
+        self.progress_bar.max += len(pnode_look_list)
+
+        targets = []
+
+        for pnode_look in pnode_look_list:
+            log_identifier = '{date}, {pnode}, {dtype}'.format(date=dx, dtype=dtype, pnode=pnode_look)
+
+            nfilesave = "error.csv"
+            if dtype == "lmp":
+                des_dir = foldersave + folder + pnode_look + "/" + yearx + "/"
+                nfilesave = dx + "_dalmp_" + pnode_look + ".csv"
+            elif dtype == "reg":
+                des_dir = foldersave + folder + yearx + "/"
+                nfilesave = dx + "_regp" + ".csv"
+            elif dtype == "mileage":
+                des_dir = foldersave + folder + yearx + "/"
+                nfilesave = dx + "_regm" + ".csv"
+
+            if not os.path.exists(des_dir + nfilesave):
+                targets.append((pnode_look, des_dir + nfilesave))
+            else:
+                logging.info('PJMdownloader: {0}: File already exits, skipping...'.format(log_identifier))
+                Clock.schedule_once(self.increment_progress_bar, 0)
 
-                            isnodetype = [True for nodetypePJM_x in nodetypesPJM if node_x == nodetypePJM_x]
+        datesquery = "{0:d}-01-{1:d} 00:00 to {0:d}-{2:02d}-{1:d} 23:59".format(int(monthx), int(yearx), ndaysmonthx)
 
-                            if isnodetype:
-                                nodelist_x = getPJMnodes(subs_key, dx, nodetype=node_x, proxydict=proxy_options, ssl_verify=ssl_verify)
-                                nodelist = nodelist + nodelist_x
-                            else:
-                                nodelist.append(node_x)
+        params_dict = {
+            # Request parameters
+            'download': 'true',  ### if true it returns some sort of gzip
+            'rowCount': '50000',
+            'sort': 'datetime_beginning_ept',
+            'order': 'asc',
+            'startRow': '1',  ### required if any other parameter is specified
+            'datetime_beginning_ept': datesquery,  #
+        }
 
-                    logging.info('PJMdownloader: Number of nodes in this call: {0}.'.format(str(len(nodelist))))
-                    pnode_look_list = nodelist
-                elif lmp_or_reg[ixlp] == "reg":
-                    pnode_look_list = ["n/a"]
-                elif lmp_or_reg[ixlp] == "mileage":
-                    pnode_look_list = ["n/a"]
-                
-                self.progress_bar.max += len(pnode_look_list)
+        for ix in range(0, len(targets), PJM_NODES_PER_REQUEST if dtype == "lmp" else 1):
+            batch = targets[ix:ix + PJM_NODES_PER_REQUEST] if dtype == "lmp" else targets[ix:ix + 1]
+            scheduler.submit(priority, self._download_PJM_request, scheduler, priority, urlPJM, dtype, dx, params_dict, batch, connection)
 
-                for pnode_x in pnode_look_list:
-                    pnode_look = pnode_x
+    def _download_PJM_request(self, scheduler, priority, urlPJM, dtype, dx, params_dict, targets, connection):
+        """Downloads PJM data for a month and saves it to the files of the targets, a list of (node, file name) tuples. A request for several nodes that is rejected or returns no data is split into one request per node."""
+        params_dict = dict(params_dict)
 
-                    log_identifier = '{date}, {pnode}, {dtype}'.format(date=dx, dtype=lmp_or_reg[ixlp], pnode=pnode_look)
+        if dtype == "lmp":
+            pnode_look = targets[0][0] if len(targets) == 1 else '{0} nodes'.format(len(targets))
+            params_dict['pnode_id'] = ';'.join(pnode for pnode, _ in targets)
+        else:
+            pnode_look = "n/a"
 
-                    nfilesave = "error.csv"
-                    if lmp_or_reg[ixlp] == "lmp":
-                        des_dir = foldersave + folderprice[ixlp] + pnode_look + "/" + yearx + "/"
-                        nfilesave = dx + "_dalmp_" + pnode_look + ".csv"
-                    elif lmp_or_reg[ixlp] == "reg":
-                        # des_dir = foldersave + folderprice[ixlp] + yearx + "/" + monthx + "/"
-                        des_dir = foldersave + folderprice[ixlp] + yearx + "/"
-                        nfilesave = dx + "_regp" + ".csv"
-                    elif lmp_or_reg[ixlp] == "mileage":
-                        des_dir = foldersave + folderprice[ixlp] + yearx + "/"
-                        nfilesave = dx + "_regm" + ".csv"
-
-                    if not os.path.exists(des_dir + nfilesave):
-                        datesquery = "{0:d}-01-{1:d} 00:00 to {0:d}-{2:02d}-{1:d} 23:59".format(int(monthx), int(yearx), ndaysmonthx)
-                        date_str = datetime.date(int(yearx), int(monthx), ndaysmonthx).strftime('%Y%m')
-
-                        if lmp_or_reg[ixlp] == "lmp":
-                            params_dict = {
-                                # Request parameters
-                                'download': 'true',  ### if true it returns some sort of gzip
-                                'rowCount': '50000',
-                                'sort': 'datetime_beginning_ept',
-                                'order': 'asc',
-                                'startRow': '1',  ### required if any other parameter is specified
-                                'datetime_beginning_ept': datesquery,  #
-                                'pnode_id': pnode_look,
-                            }
-                        elif lmp_or_reg[ixlp] == "reg":
-                            params_dict = {
-                                # Request parameters
-                                'download': 'true',
-                                'rowCount': '50000',
-                                'sort': 'datetime_beginning_ept',
-                                'order': 'asc',
-                                'startRow': '1',
-                                'datetime_beginning_ept': datesquery,  #
-                            }
-                        elif lmp_or_reg[ixlp] == "mileage":
-                            params_dict = {
-                                # Request parameters
-                                'download': 'true',
-                                'rowCount': '50000',
-                                'sort': 'datetime_beginning_ept',
-                                'order': 'asc',
-                                'startRow': '1',
-                                'datetime_beginning_ept': datesquery,  #
-                            }
-
-                        try:
-                            dodownload = True
-                            ix = 0
-                            while dodownload:
-                                # Quit?
-                                if App.get_running_app().root.stop.is_set() or self.request_cancel.is_set():
-                                    # Stop running this thread so the main Python process can exit.
-                                    self.n_active_threads -= 1
-                                    return
+        log_identifier = '{date}, {pnode}, {dtype}'.format(date=dx, dtype=dtype, pnode=pnode_look)
 
-                                with requests.Session() as response:
-                                    response = requests.get(urlPJM_list_x, params=params_dict,headers=headers, proxies=proxy_options,timeout=10, verify=ssl_verify)
-                                    # Check the HTTP status code.
+        def _split():
+            logging.info('PJMdownloader: {0}: Requesting the nodes one at a time.'.format(log_identifier))
 
-                                #print(response.status_code, response.reason)
-                                if response.status_code == requests.codes.ok:
-                                    dataheaders = response.headers
-                                    data_text = response.json()
-                                    df_data = pd.DataFrame.from_dict(data_text)
-                                    total_nrows = float(dataheaders['X-TotalRows'])
+            for target in targets:
+                scheduler.submit(priority, self._download_PJM_request, scheduler, priority, urlPJM, dtype, dx, params_dict, [target], connection)
 
-                                    #print(total_nrows)
+        try:
+            df_data_all = self._request_PJM_pages(urlPJM, params_dict, connection)
 
-                                    if ix == 0:
-                                        df_data_all = df_data
-                                    else:
-                                        df_data_all = pd.concat([df_data_all, df_data], ignore_index=True)
-                                    #print(50000 * (ix + 1) + 1)
-                                    params_dict['startRow'] = str(50000 * (ix + 1) + 1)
-
-                                    nloops = math.ceil(total_nrows / 50000) - 1
-
-                                    if ix >= nloops:
-                                        dodownload = False
-
-                                    ix += 1
-                                if total_nrows != 0:
-                                    df_data_all.set_index('datetime_beginning_ept', inplace=True)
-
-                                    columns_del = []
-                                    if lmp_or_reg[ixlp] == "lmp":
-                                        columns_del = ['equipment',
-                                                    'pnode_name','row_is_current','system_energy_price_da',
-                                                    'version_nbr','voltage','zone',
-                                                        'type','pnode_id','congestion_price_da',
-                                                    'marginal_loss_price_da']
-                                    elif lmp_or_reg[ixlp] == "reg":
-                                        columns_del = ['datetime_ending_ept', 'datetime_ending_utc', 'total_pjm_assigned_reg',
-                                                    'total_pjm_loc_credit', 'total_pjm_reg_purchases', 'total_pjm_rmccp_cr',
-                                                    'total_pjm_rmpcp_cr', 'total_pjm_rt_load_mwh', 'total_pjm_self_sched_reg'
-                                                    ]
-                                    elif lmp_or_reg[ixlp] == "mileage":
-                                        columns_del = ['deficiency', 'is_approved', 'modified_datetime_utc', 'rega_mileage', 
-                                        'rega_procure', 'rega_ssmw', 'regd_mileage', 'regd_procure', 'regd_ssmw', 
-                                        'requirement', 'rto_perfscore', 'total_mw']
-                                    df_data_all.drop(columns_del, inplace=True, axis=1)
-                                    os.makedirs(des_dir, exist_ok=True)
-
-                                    df_data_all.to_csv(des_dir + nfilesave, sep=',')
-                                    logging.info('PJMdownloader: {0}: Successfully downloaded.'.format(log_identifier))
-                                else:
-                                    logging.warning('PJMdownloader: {0}: No data retrieved in this API call.'.format(log_identifier))
-                        except requests.HTTPError as e:
-                            logging.error('PJMdownloader: {0}: {1}'.format(log_identifier, repr(e)))
-                            Clock.schedule_once(partial(self.update_output_log, '{0}: HTTPError: {1}'.format(log_identifier, e.response.status_code), 0))
-                            self.thread_failed = True
-                        except requests.exceptions.ProxyError:
-                            logging.error('PJMdownloader: {0}: Could not connect to proxy.'.format(log_identifier))
-                            Clock.schedule_once(partial(self.update_output_log, '{0}: Could not connect to proxy.'.format(log_identifier)), 0)
-                            self.thread_failed = True
-                        except requests.ConnectionError as e:
-                            logging.error('PJMdownloader: {0}: Failed to establish a connection to the host server.'.format(log_identifier))
-                            Clock.schedule_once(partial(self.update_output_log, '{0}: Failed to establish a connection to the host server.'.format(log_identifier)), 0)
-                            self.thread_failed = True
-                        except (socket.timeout, requests.Timeout) as e:
-                            logging.error('PJMdownloader: {0}: The connection timed out.'.format(log_identifier))
-                            Clock.schedule_once(partial(self.update_output_log, '{0}: The connection timed out.'.format(log_identifier)), 0)
-                            self.thread_failed = True
-                        except requests.RequestException as e:
-                            logging.error('PJMdownloader: {0}: {1}'.format(log_identifier, repr(e)))
-                            self.thread_failed = True
-                        except Exception as e:
-                            # Something else went wrong.
-                            logging.error('PJMdownloader: {0}: An unexpected error has occurred. ({1})'.format(log_identifier, repr(e)))
-                            Clock.schedule_once(partial(self.update_output_log, '{0}: An unexpected error has occurred. ({1})'.format(log_identifier, repr(e))), 0)
-                            self.thread_failed = True
-                    else:
-                        logging.info('PJMdownloader: {0}: File already exits, skipping...'.format(log_identifier))
-                    
-                    Clock.schedule_once(self.increment_progress_bar, 0)
+            if df_data_all is None and len(targets) > 1:
+                _split()
+                return
+        except DownloadCancelled:
+            return
+        except requests.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else None
 
-                    # Quit?
-                    if App.get_running_app().root.stop.is_set() or self.request_cancel.is_set():
-                        # Stop running this thread so the main Python process can exit.
-                        self.n_active_threads -= 1
-                        return
-        
-        self.n_active_threads -= 1
+            if len(targets) > 1 and status_code is not None and 400 <= status_code < 500 and status_code != 429:
+                _split()
+                return
+
+            logging.error('PJMdownloader: {0}: {1}'.format(log_identifier, repr(e)))
+            Clock.schedule_once(partial(self.update_output_log, '{0}: HTTPError: {1}'.format(log_identifier, status_code)), 0)
+            self.thread_failed = True
+        except requests.exceptions.ProxyError:
+            logging.error('PJMdownloader: {0}: Could not connect to proxy.'.format(log_identifier))
+            Clock.schedule_once(partial(self.update_output_log, '{0}: Could not connect to proxy.'.format(log_identifier)), 0)
+            self.thread_failed = True
+        except requests.ConnectionError as e:
+            logging.error('PJMdownloader: {0}: Failed to establish a connection to the host server.'.format(log_identifier))
+            Clock.schedule_once(partial(self.update_output_log, '{0}: Failed to establish a connection to the host server.'.format(log_identifier)), 0)
+            self.thread_failed = True
+        except (socket.timeout, requests.Timeout) as e:
+            logging.error('PJMdownloader: {0}: The connection timed out.'.format(log_identifier))
+            Clock.schedule_once(partial(self.update_output_log, '{0}: The connection timed out.'.format(log_identifier)), 0)
+            self.thread_failed = True
+        except requests.RequestException as e:
+            logging.error('PJMdownloader: {0}: {1}'.format(log_identifier, repr(e)))
+            self.thread_failed = True
+        except Exception as e:
+            # Something else went wrong.
+            logging.error('PJMdownloader: {0}: An unexpected error has occurred. ({1})'.format(log_identifier, repr(e)))
+            Clock.schedule_once(partial(self.update_output_log, '{0}: An unexpected error has occurred. ({1})'.format(log_identifier, repr(e))), 0)
+            self.thread_failed = True
+        else:
+            if df_data_all is None:
+                logging.warning('PJMdownloader: {0}: No data retrieved in this API call.'.format(log_identifier))
+            else:
+                try:
+                    self._save_PJM_data(df_data_all, dtype, dx, targets)
+                except Exception as e:
+                    logging.error('PJMdownloader: {0}: An unexpected error has occurred. ({1})'.format(log_identifier, repr(e)))
+                    Clock.schedule_once(partial(self.update_output_log, '{0}: An unexpected error has occurred. ({1})'.format(log_identifier, repr(e))), 0)
+                    self.thread_failed = True
+
+        for _ in targets:
+            Clock.schedule_once(self.increment_progress_bar, 0)
+
+    @staticmethod
+    def _request_PJM_pages(urlPJM, params_dict, connection):
+        """Requests all pages of a PJM Data Miner 2 query and returns them as one DataFrame, or None if the query returned no rows."""
+        params_dict = dict(params_dict)
+        df_pages = []
+        ix = 0
+
+        while True:
+            response = DOWNLOAD_ENGINE.get(urlPJM, params=params_dict, headers=connection['headers'], proxy_settings=connection['proxy_settings'], ssl_verify=connection['ssl_verify'], stop=connection['stop'])
+
+            total_nrows = float(response.headers['X-TotalRows'])
+            df_pages.append(pd.DataFrame.from_dict(response.json()))
+
+            params_dict['startRow'] = str(50000 * (ix + 1) + 1)
+            nloops = math.ceil(total_nrows / 50000) - 1
+
+            if ix >= nloops:
+                break
+
+            ix += 1
+
+        if total_nrows == 0:
+            return None
+
+        return pd.concat(df_pages, ignore_index=True)
+
+    @staticmethod
+    def _save_PJM_data(df_data_all, dtype, dx, targets):
+        """Saves the PJM data for each target, a (node, file name) tuple, splitting LMPs by node."""
+        columns_del = []
+        if dtype == "lmp":
+            columns_del = ['equipment',
+                        'pnode_name','row_is_current','system_energy_price_da',
+                        'version_nbr','voltage','zone',
+                            'type','pnode_id','congestion_price_da',
+                        'marginal_loss_price_da']
+            df_nodes = dict(list(df_data_all.groupby(df_data_all['pnode_id'].astype(str), sort=False)))
+        elif dtype == "reg":
+            columns_del = ['datetime_ending_ept', 'datetime_ending_utc', 'total_pjm_assigned_reg',
+                        'total_pjm_loc_credit', 'total_pjm_reg_purchases', 'total_pjm_rmccp_cr',
+                        'total_pjm_rmpcp_cr', 'total_pjm_rt_load_mwh', 'total_pjm_self_sched_reg'
+                        ]
+        elif dtype == "mileage":
+            columns_del = ['deficiency', 'is_approved', 'modified_datetime_utc', 'rega_mileage', 
+            'rega_procure', 'rega_ssmw', 'regd_mileage', 'regd_procure', 'regd_ssmw', 
+            'requirement', 'rto_perfscore', 'total_mw']
+
+        for pnode_look, fname in targets:
+            log_identifier = '{date}, {pnode}, {dtype}'.format(date=dx, dtype=dtype, pnode=pnode_look)
+
+            if dtype == "lmp":
+                df_data = df_nodes.get(str(pnode_look))
+
+                if df_data is None:
+                    logging.warning('PJMdownloader: {0}: No data retrieved in this API call.'.format(log_identifier))
+                    continue
+            else:
+                df_data = df_data_all
+
+            df_data = df_data.set_index('datetime_beginning_ept').drop(columns_del, axis=1)
+            os.makedirs(os.path.dirname(fname), exist_ok=True)
+
+            df_data.to_csv(fname, sep=',')
+            logging.info('PJMdownloader: {0}: Successfully downloaded.'.format(log_identifier))
         
 
 class DataManagerCheckbox(CheckBox):
@@ -2908,7 +2652,7 @@ class DataManagerISONEAccHelp(ModalView):
     pass
 
 
-def getPJMnodes(subs_key, startdate, nodetype=[], proxydict={}, ssl_verify=True):
+def getPJMnodes(subs_key, startdate, nodetype=[], proxydict={}, ssl_verify=True, stop=None):
     """
     """
 
@@ -2940,7 +2684,7 @@ def getPJMnodes(subs_key, startdate, nodetype=[], proxydict={}, ssl_verify=True)
         ix = 0
 
         while dodownload:
-            response = requests.get("https://api.pjm.com/api/v1/da_hrl_lmps?", params=params_dict, headers=headers, proxies=proxydict, timeout=10, verify=ssl_verify)
+            response = DOWNLOAD_ENGINE.get("https://api.pjm.com/api/v1/da_hrl_lmps?", params=params_dict, headers=headers, proxy_settings=proxydict, ssl_verify=ssl_verify, stop=stop)
             #print(response.status_code, response.reason)
 
             dataheaders = response.headers
@@ -2973,6 +2717,8 @@ def getPJMnodes(subs_key, startdate, nodetype=[], proxydict={}, ssl_verify=True)
         #print(type(nodelist))
 
         return nodelist
+    except DownloadCancelled:
+        raise
     except Exception as e:
         print(repr(e))
         return []
@@ -3005,4 +2751,40 @@ def batch_splitter(date_range, frequency='month'):
 
         job_batches.append(batch)
     
-    return job_batches
\ No newline at end of file
+    return job_batches
+
+def run_download_jobs(panel, jobs, log_name, manifest=None, ssl_verify=True, proxy_settings=None):
+    """Downloads a list of DownloadJobs with the shared download engine, reporting to the progress bar and output log of the given panel.
+
+    :param panel: The data manager panel requesting the downloads.
+    :param jobs: The files to download.
+    :type jobs: list of DownloadJob
+    :param log_name: The name to prefix log messages with, e.g., 'MISOdownloader'
+    :type log_name: str
+    :param manifest: The record of completed downloads; jobs it verifies as complete are skipped, defaults to None
+    :type manifest: DownloadManifest, optional
+    """
+    def _stop():
+        return App.get_running_app().root.stop.is_set() or panel.request_cancel.is_set()
+
+    def _on_progress(job, ok):
+        Clock.schedule_once(panel.increment_progress_bar, 0)
+
+    def _on_log(text):
+        Clock.schedule_once(partial(panel.update_output_log, text), 0)
+
+    if manifest is not None:
+        jobs, complete = DOWNLOAD_ENGINE.plan(jobs, manifest)
+
+        if complete:
+            # Skip downloading the files that are already complete.
+            logging.info('{0}: {1} of {2} files already downloaded, skipping...'.format(log_name, len(complete), len(complete) + len(jobs)))
+            _on_log('{0} of {1} files already downloaded, skipping...'.format(len(complete), len(complete) + len(jobs)))
+
+            for job in complete:
+                _on_progress(job, True)
+
+    failed = DOWNLOAD_ENGINE.run(jobs, ssl_verify=ssl_verify, proxy_settings=proxy_settings, stop=_stop, on_progress=_on_progress, on_log=_on_log, log_name=log_name, manifest=manifest)
+
+    if failed:
+        panel.thread_failed = True
@@ -7,6 +7,7 @@ from kivy.uix.screenmanager import Screen
 from kivy.app import App
 
 from es_gui.tools.valuation.valuation_dms import ValuationDMS
+from es_gui.tools.result_cache import ResultCache
 from es_gui.resources.widgets.common import WarningPopup
 from .op_handler import ValuationOptimizerHandler
 
@@ -23,9 +24,16 @@ class ValuationHomeScreen(Screen):
                                 save_data=bool(App.get_running_app().config.getint('valuation', 'valuation_dms_save')),
                                 save_name='valuation_dms.p',
                                 home_path='data')
-        self.handler = ValuationOptimizerHandler(App.get_running_app().config.get('optimization', 'solver'))
+        self.handler = ValuationOptimizerHandler(App.get_running_app().config.get('optimization', 'solver'),
+                                                 model_engine=App.get_running_app().config.get('valuation', 'valuation_model_engine'),
+                                                 n_workers=App.get_running_app().config.getint('valuation', 'valuation_n_workers'),
+                                                 prefetch_months=App.get_running_app().config.getint('valuation', 'valuation_prefetch_months'))
         self.handler.dms = self.dms
 
+        if App.get_running_app().config.getint('optimization', 'result_cache'):
+            self.handler.result_cache = ResultCache(cache_dir=os.path.join('results', 'cache'),
+                                                    max_size=App.get_running_app().config.getint('optimization', 'result_cache_size')*1000000)
+
     def on_enter(self):
         ab = self.manager.nav_bar
         ab.reset_nav_bar()
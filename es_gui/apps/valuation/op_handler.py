@@ -1,22 +1,34 @@
 from __future__ import absolute_import
 
 import logging
+from collections import OrderedDict
 from datetime import datetime
 import calendar
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from types import SimpleNamespace
 import pyutilib
 
-from kivy.clock import mainthread
-
 from es_gui.tools.valuation.valuation_optimizer import ValuationOptimizer, BadParameterException, IncompatibleDataException
+from es_gui.tools.valuation.valuation_dms import ValuationDMS
+from es_gui.tools.result_cache import ResultCache
+from es_gui.tools.prefetch import Prefetcher
+from es_gui.tools import linear_program
+from es_gui.tools.optimizer import write_timing_reports
+from es_gui.tools.valuation import valuation_optimizer, constraints, matrix_constraints, dynamic_program
 
 
 class ValuationOptimizerHandler:
     """A handler for creating and solving ValuationOptimizer instances as requested."""
     dms = None
+    result_cache = None
     solved_ops = []
 
-    def __init__(self, solver_name):
+    def __init__(self, solver_name, model_engine='pyomo', n_workers=1, prefetch_months=0):
         self._solver_name = solver_name
+        self._model_engine = model_engine
+        self._n_workers = n_workers
+        self._prefetch_months = prefetch_months
 
     @property
     def solver_name(self):
@@ -27,10 +39,35 @@ class ValuationOptimizerHandler:
     def solver_name(self, value):
         self._solver_name = value
 
+    @property
+    def model_engine(self):
+        """The engine for ValuationOptimizer to construct its models with: 'pyomo', 'matrix', or 'dp'."""
+        return self._model_engine
+
+    @model_engine.setter
+    def model_engine(self, value):
+        self._model_engine = value
+
+    @property
+    def n_workers(self):
+        """The number of worker processes to solve requests with; requests are processed serially if 1."""
+        return self._n_workers
+
+    @n_workers.setter
+    def n_workers(self, value):
+        self._n_workers = max(1, int(value))
+
+    @property
+    def prefetch_months(self):
+        """The number of upcoming months to load data for in the background while a month is being solved; 0 to load each month when it is solved."""
+        return self._prefetch_months
+
+    @prefetch_months.setter
+    def prefetch_months(self, value):
+        self._prefetch_months = max(0, int(value))
+
     def process_requests(self, requests, *args):
         """Generates and solves ValuationOptimizer models based on the given requests."""
-        dms = self.dms
-
         iso = requests['iso']
         market_type = requests['market type']
         node_id = str(requests['node id'])
@@ -41,104 +78,251 @@ class ValuationOptimizerHandler:
 
         handler_status = True  # Set to False if any exceptions raised when building or solving ValuationOptimizer model(s).
 
-        for month, year in requests['months']:
-            param_set_iterator = iter(param_set)
-            continue_param_loop = True
-
-            while continue_param_loop:
-                try:
-                    params = next(param_set_iterator)
-                except StopIteration:
-                    break
-
-                op = ValuationOptimizer(market_type=market_type)
-
-                if iso == 'PJM':
-                    #lmp_da, RUP, RDW, MR, RA, RD, RegCCP, RegPCP = dms.get_pjm_data(year, month, node_name)
-                    lmp_da, MR, RA, RD, RegCCP, RegPCP = dms.get_pjm_data(year, month, node_id)
-
-                    op.price_electricity = lmp_da
-                    op.mileage_mult = MR
-                    # op.mileage_slow = RA
-                    # op.mileage_fast = RD
-                    op.price_regulation = RegCCP
-                    op.price_reg_service = RegPCP
-                    #op.fraction_reg_up = RUP
-                    #op.fraction_reg_down = RDW
-                elif iso == 'ERCOT':
-                    lmp_da, rd, ru = dms.get_ercot_data(year, month, node_name)
-
-                    op.price_electricity = lmp_da
-                    op.price_reg_up = ru
-                    op.price_reg_down = rd
-                elif iso == 'MISO':
-                    lmp_da, regMCP = dms.get_miso_data(year, month, node_name)
-
-                    op.price_electricity = lmp_da
-                    # op.price_reg_service = regMCP
-                    op.price_regulation = regMCP
-                elif iso == 'ISONE':
-                    daLMP, RegCCP, RegPCP = dms.get_isone_data(year, month, node_id)
-
-                    op.price_electricity = daLMP
-                    op.price_regulation = RegCCP
-                    op.price_reg_service = RegPCP
-                ########################################################################################################
-                elif iso == 'NYISO':
-                    lbmp_da, rcap_da = dms.get_nyiso_data(year, month, node_id)
-
-                    op.price_electricity = lbmp_da
-                    op.price_regulation = rcap_da
-                elif iso == 'SPP':
-                    lmp_da, mcpru_da, mcprd_da = dms.get_spp_data(year, month, node_name)
-
-                    op.price_electricity = lmp_da
-                    op.price_reg_up = mcpru_da
-                    op.price_reg_down = mcprd_da
-                elif iso == 'CAISO':
-                    lmp_da, aspru_da, asprd_da, asprmu_da, asprmd_da, rmu_mm, rmd_mm, rmu_pacc, rmd_pacc = dms.get_caiso_data(year, month, node_name)
-
-                    op.price_electricity = lmp_da
-                    op.price_reg_up = aspru_da
-                    op.price_reg_down = asprd_da
-                    op.price_reg_serv_up = asprmu_da
-                    op.price_reg_serv_down = asprmd_da
-                    op.mileage_mult_ru = rmu_mm
-                    op.mileage_mult_rd = rmd_mm
-                    op.perf_score_ru = rmu_pacc # TODO: give the option to the user to override this
-                    op.perf_score_rd = rmd_pacc
-                    ########################################################################################################
-                else:
-                    logging.error('ValOp Handler: Invalid ISO provided.')
-                    raise ValueError('Invalid ISO provided to ValuationOptimizer handler.')
+        if self.n_workers > 1:
+            month_results = self._solve_months_parallel(iso, market_type, node_id, node_name, requests['months'], param_set)
+        else:
+            month_results = self._solve_months_serial(iso, market_type, node_id, node_name, requests['months'], param_set)
 
-                if params:
-                    op.set_model_parameters(**params)
-                else:
-                    continue_param_loop = False
-
-                try:
-                    solved_op = self._solve_model(op)
-                except pyutilib.common._exceptions.ApplicationError as e:
-                    logging.error('ValOp Handler: Something went wrong when solving: ({error})'.format(error=e))
-                    handler_status = False
-                except IncompatibleDataException as e:
-                    logging.error(e)
-                    handler_status = False
-                else:
-                    solved_op = self._save_to_solved_ops(solved_op, iso, market_type, node_name,
-                                                        year, month, params)
-                    solved_requests.append(solved_op)
+        for (month, year), (solved, month_status) in zip(requests['months'], month_results):
+            handler_status = handler_status and month_status
+
+            for params, op in solved:
+                solved_op = self._save_to_solved_ops(op, iso, market_type, node_name, year, month, params)
+                solved_requests.append(solved_op)
 
         logging.info('ValOp Handler: Finished processing requested jobs.')
+        logging.info('ValOp Handler: DMS statistics: {0}'.format(self.dms.get_statistics()))
         return solved_requests, handler_status
 
-    def _solve_model(self, op):
+    def _solve_months_serial(self, iso, market_type, node_id, node_name, months, param_set):
+        """Solves the requested months in order, yielding a (solved, status) tuple for each. The data for the next prefetch_months months is loaded into the DMS in the background while each month is solved."""
+        def _prefetch(month_year):
+            month, year = month_year
+            self._load_data(SimpleNamespace(), iso, year, month, node_id, node_name)
+
+        with Prefetcher(_prefetch, months, lookahead=self.prefetch_months) as prefetcher:
+            for ix, (month, year) in enumerate(months):
+                prefetcher.advance(ix)
+
+                yield self._solve_month(iso, market_type, node_id, node_name, year, month, param_set)
+
+    def _solve_month(self, iso, market_type, node_id, node_name, year, month, param_set):
+        """Solves the model for the given month for each entry in param_set. Returns a list of (params, solved op) tuples and False if any model could not be built or solved."""
+        solved = []
+        status = True
+
+        param_set_iterator = iter(param_set)
+        continue_param_loop = True
+
+        # The model built for this month and the parameters it was last solved with.
+        op = None
+        op_params = None
+
+        while continue_param_loop:
+            try:
+                params = next(param_set_iterator)
+            except StopIteration:
+                break
+
+            if not params:
+                continue_param_loop = False
+
+            try:
+                if op is not None and params and set(params) == set(op_params):
+                    changed_params = {key: val for key, val in params.items() if val != op_params[key]}
+                else:
+                    changed_params = None
+
+                if changed_params is not None and op.can_update_model_parameters(*changed_params):
+                    # Only device parameters changed; re-solve the model built for this month instead of rebuilding it.
+                    op.reset_timings()
+
+                    with op.timed('populate_model'):
+                        op.update_model_parameters(**changed_params)
+
+                    solved_op = self._resolve_model(op, params)
+                else:
+                    op = ValuationOptimizer(market_type=market_type, model_engine=self.model_engine)
+
+                    with op.timed('load_data'):
+                        self._load_data(op, iso, year, month, node_id, node_name)
+
+                    if params:
+                        op.set_model_parameters(**params)
+
+                    solved_op = self._solve_model(op, params)
+            except pyutilib.common._exceptions.ApplicationError as e:
+                logging.error('ValOp Handler: Something went wrong when solving: ({error})'.format(error=e))
+                status = False
+                op = None
+            except IncompatibleDataException as e:
+                logging.error(e)
+                status = False
+                op = None
+            else:
+                op_params = params
+
+                # Keep a copy without the model, which is re-solved for the next parameter set; reporting reads only the results.
+                solved.append((params, solved_op.detached_copy()))
+
+        return solved, status
+
+    def _solve_months_parallel(self, iso, market_type, node_id, node_name, months, param_set):
+        """Solves the requested months on a pool of worker processes. Returns a (solved, status) tuple for each month in the order given.
+
+        Each month's param_set is split into contiguous chunks, only as many as needed to occupy the workers. Each chunk is one job, so a worker loads the month's data once and re-solves one model for the chunk. A job that raises is logged and omitted from the results."""
+        n_chunks = min(len(param_set), max(1, -(-self.n_workers // len(months))))
+        chunk_size = -(-len(param_set) // n_chunks)
+        param_chunks = [param_set[ix:ix + chunk_size] for ix in range(0, len(param_set), chunk_size)]
+
+        dms_kwargs = {'home_path': self.dms.home_path, 'save_name': self.dms.save_name,
+                      'max_memory': self.dms.max_memory, 'save_data': False}
+
+        if self.result_cache is not None:
+            cache_kwargs = {'cache_dir': self.result_cache.cache_dir, 'max_size': self.result_cache.max_size}
+        else:
+            cache_kwargs = None
+
+        # Workers are spawned on every platform rather than forked from the GUI process and its threads; main.py only imports the GUI when run as a script, so they do not import it.
+        with ProcessPoolExecutor(max_workers=self.n_workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker,
+                                 initargs=(self.solver_name, self.model_engine, dms_kwargs, cache_kwargs)) as executor:
+            futures = [[executor.submit(_solve_month_worker, iso, market_type, node_id, node_name, year, month, chunk)
+                        for chunk in param_chunks]
+                       for month, year in months]
+
+            month_results = []
+
+            for (month, year), month_futures in zip(months, futures):
+                solved = []
+                status = True
+
+                for future in month_futures:
+                    try:
+                        chunk_solved, chunk_status = future.result()
+                    except Exception as e:
+                        logging.error('ValOp Handler: A job for {year}-{month} failed in a worker process: ({error})'.format(year=year, month=month, error=e))
+                        status = False
+                    else:
+                        solved.extend(chunk_solved)
+                        status = status and chunk_status
+
+                month_results.append((solved, status))
+
+        return month_results
+
+    def _load_data(self, op, iso, year, month, node_id, node_name):
+        """Retrieves the market data for the given ISO, node, and month from the DMS and assigns it to op."""
+        dms = self.dms
+
+        if iso == 'PJM':
+            #lmp_da, RUP, RDW, MR, RA, RD, RegCCP, RegPCP = dms.get_pjm_data(year, month, node_name)
+            lmp_da, MR, RA, RD, RegCCP, RegPCP = dms.get_pjm_data(year, month, node_id)
+
+            op.price_electricity = lmp_da
+            op.mileage_mult = MR
+            # op.mileage_slow = RA
+            # op.mileage_fast = RD
+            op.price_regulation = RegCCP
+            op.price_reg_service = RegPCP
+            #op.fraction_reg_up = RUP
+            #op.fraction_reg_down = RDW
+        elif iso == 'ERCOT':
+            lmp_da, rd, ru = dms.get_ercot_data(year, month, node_name)
+
+            op.price_electricity = lmp_da
+            op.price_reg_up = ru
+            op.price_reg_down = rd
+        elif iso == 'MISO':
+            lmp_da, regMCP = dms.get_miso_data(year, month, node_name)
+
+            op.price_electricity = lmp_da
+            # op.price_reg_service = regMCP
+            op.price_regulation = regMCP
+        elif iso == 'ISONE':
+            daLMP, RegCCP, RegPCP = dms.get_isone_data(year, month, node_id)
+
+            op.price_electricity = daLMP
+            op.price_regulation = RegCCP
+            op.price_reg_service = RegPCP
+        ########################################################################################################
+        elif iso == 'NYISO':
+            lbmp_da, rcap_da = dms.get_nyiso_data(year, month, node_id)
+
+            op.price_electricity = lbmp_da
+            op.price_regulation = rcap_da
+        elif iso == 'SPP':
+            lmp_da, mcpru_da, mcprd_da = dms.get_spp_data(year, month, node_name)
+
+            op.price_electricity = lmp_da
+            op.price_reg_up = mcpru_da
+            op.price_reg_down = mcprd_da
+        elif iso == 'CAISO':
+            lmp_da, aspru_da, asprd_da, asprmu_da, asprmd_da, rmu_mm, rmd_mm, rmu_pacc, rmd_pacc = dms.get_caiso_data(year, month, node_name)
+
+            op.price_electricity = lmp_da
+            op.price_reg_up = aspru_da
+            op.price_reg_down = asprd_da
+            op.price_reg_serv_up = asprmu_da
+            op.price_reg_serv_down = asprmd_da
+            op.mileage_mult_ru = rmu_mm
+            op.mileage_mult_rd = rmd_mm
+            op.perf_score_ru = rmu_pacc # TODO: give the option to the user to override this
+            op.perf_score_rd = rmd_pacc
+            ########################################################################################################
+        else:
+            logging.error('ValOp Handler: Invalid ISO provided.')
+            raise ValueError('Invalid ISO provided to ValuationOptimizer handler.')
+
+    def _solve_model(self, op, params=None):
+        op.solver = self.solver_name
+        key = self._get_cache_key(op, params)
+
+        if not self._load_cached_results(op, key):
+            op.run()
+            self._cache_results(op, key)
+
+        return op
+
+    def _resolve_model(self, op, params=None):
         op.solver = self.solver_name
-        op.run()
+        key = self._get_cache_key(op, params)
+
+        if not self._load_cached_results(op, key):
+            op.resolve()
+            self._cache_results(op, key)
 
         return op
 
+    def _get_cache_key(self, op, params):
+        """Returns the key of the results of solving op with params in the result cache, or None if there is no result cache."""
+        if self.result_cache is None:
+            return None
+
+        inputs = {name: getattr(op, name) for name in ValuationOptimizer.TIME_SERIES_INPUTS}
+
+        return ResultCache.make_key('valuation', op.market_type, op.model_engine, op.solver, inputs, params, _code_version())
+
+    def _load_cached_results(self, op, key):
+        """Sets the results of op from the result cache; returns True if they were found."""
+        if key is None:
+            return False
+
+        with op.timed('cache_lookup'):
+            entry = self.result_cache.get(key)
+
+        if entry is None:
+            return False
+
+        op.results = entry['results']
+        op.gross_revenue = entry['gross_revenue']
+
+        return True
+
+    def _cache_results(self, op, key):
+        """Stores the results of solved op in the result cache."""
+        if key is not None:
+            self.result_cache.put(key, {'results': op.results, 'gross_revenue': op.gross_revenue})
+
     @staticmethod
     def _save_to_solved_ops(op, iso, market_type, node_name, year, month, param_set):
         # time_finished = datetime.now().strftime('%A, %B %d, %Y %H:%M:%S')
@@ -169,6 +353,54 @@ class ValuationOptimizerHandler:
 
         return return_list
 
+    def get_timing_reports(self):
+        """Returns the phase timings and model statistics of each solved Optimizer object, in chronological order."""
+        reports = []
+
+        for solved_op in self.solved_ops:
+            report = OrderedDict([('name', solved_op['name'])])
+            report.update(solved_op['optimizer'].get_timing_report())
+            reports.append(report)
+
+        return reports
+
+    def export_timings(self, path):
+        """Writes the timing reports of the solved Optimizer objects to path as CSV if it ends in '.csv' or JSON otherwise."""
+        write_timing_reports(self.get_timing_reports(), path)
+
+
+_CODE_VERSION = None
+
+
+def _code_version():
+    """Returns the version of the valuation formulation and solution code for keying the result cache."""
+    global _CODE_VERSION
+
+    if _CODE_VERSION is None:
+        _CODE_VERSION = ResultCache.code_version(valuation_optimizer, constraints, matrix_constraints, dynamic_program, linear_program)
+
+    return _CODE_VERSION
+
+
+# Handler of a worker process in the pool used by ValuationOptimizerHandler._solve_months_parallel().
+_worker_handler = None
+
+
+def _init_worker(solver_name, model_engine, dms_kwargs, cache_kwargs=None):
+    """Initializes a worker process with its own handler and DMS so that data is cached across the jobs it runs."""
+    global _worker_handler
+
+    _worker_handler = ValuationOptimizerHandler(solver_name, model_engine=model_engine)
+    _worker_handler.dms = ValuationDMS(**dms_kwargs)
+
+    if cache_kwargs is not None:
+        _worker_handler.result_cache = ResultCache(**cache_kwargs)
+
+
+def _solve_month_worker(*args):
+    """Solves a chunk of a month's parameter sets in a worker process."""
+    return _worker_handler._solve_month(*args)
+
 if __name__ == '__main__':
     with open('valuation_optimizer.log', 'w'):
         pass
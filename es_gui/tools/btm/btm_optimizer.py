@@ -13,6 +13,17 @@ from es_gui.tools.btm.constraints import ExpressionsBlock
 class BtmOptimizer(optimizer.Optimizer):
     """A framework wrapper class for creating Pyomo ConcreteModels for behind the meter valuation."""
 
+    # Rate structure and profile data the model is built from.
+    INPUTS = ('tou_energy_schedule', 'tou_energy_rate', 'tou_demand_schedule', 'tou_demand_rate', 'flat_demand_rate',
+              'nem_type', 'nem_rate', 'load_profile', 'pv_profile')
+
+    # Bill totals computed from the solution.
+    BILL_COMPONENTS = ('total_bill_with_es', 'total_bill_without_es', 'energy_charge_with_es', 'energy_charge_without_es',
+                       'demand_charge_with_es', 'demand_charge_without_es', 'nem_charge_with_es', 'nem_charge_without_es')
+
+    # Peak net demands computed from the solution.
+    PEAK_DEMANDS = ('peak_demand_with_es', 'peak_demand_without_es')
+
     def __init__(self, tou_energy_schedule = None, tou_energy_rate=None, 
                  tou_demand_schedule=None, tou_demand_rate=None, flat_demand_rate=None,
                  nem_type=1, nem_rate=None, load_profile=None, pv_profile=None, 
@@ -24,6 +35,8 @@ class BtmOptimizer(optimizer.Optimizer):
         self._solver = solver
 
         self._expressions_block = None
+        self._linear_program = None
+        self.reset_timings()
         
         self._tou_energy_schedule = tou_energy_schedule # type: list, size: number of hours in a month, value: tou_energy_rate index 
         self._tou_energy_rate = tou_energy_rate # type = list, size = number of tou periods for energy, value: tou energy rate [$/kWh] 
@@ -54,6 +67,8 @@ class BtmOptimizer(optimizer.Optimizer):
         self._demand_charge_without_es = 0
         self._nem_charge_with_es = 0
         self._nem_charge_without_es = 0
+        self._peak_demand_with_es = 0
+        self._peak_demand_without_es = 0
         
  #---------------------------------------------------   
     @property
@@ -288,6 +303,24 @@ class BtmOptimizer(optimizer.Optimizer):
     def nem_charge_without_es(self, value):
         self._nem_charge_without_es = value
 
+    @property
+    def peak_demand_with_es(self):
+        """The peak net demand for the month with energy storage [kW]."""
+        return self._peak_demand_with_es
+
+    @peak_demand_with_es.setter
+    def peak_demand_with_es(self, value):
+        self._peak_demand_with_es = value
+
+    @property
+    def peak_demand_without_es(self):
+        """The peak net demand for the month without energy storage [kW]."""
+        return self._peak_demand_without_es
+
+    @peak_demand_without_es.setter
+    def peak_demand_without_es(self, value):
+        self._peak_demand_without_es = value
+
     def _set_model_param(self):
         """Sets the model params for the Pyomo ConcreteModel."""
         m = self.model
@@ -424,12 +457,13 @@ class BtmOptimizer(optimizer.Optimizer):
         
         m.tou_dr = self.tou_demand_rate
         
-        mask_ds = []
-        for i in range(m.dml):
-            listi=[int(self.tou_demand_schedule[t]==i) for t in range(m.nhr)]
-            mask_ds.append(listi)
-       
-        m.mask_ds = mask_ds
+        # Hours belonging to each time-of-use demand period.
+        period_hours = [[] for i in range(m.dml)]
+        for t in range(m.nhr):
+            period_hours[self.tou_demand_schedule[t]].append(t)
+
+        m.period_hours = period_hours
+        m.period_time = Set(dimen=2, initialize=[(p, t) for p in range(m.dml) for t in period_hours[p]])
         
         m.flt_dr = self.flat_demand_rate
         
@@ -474,7 +508,8 @@ class BtmOptimizer(optimizer.Optimizer):
         ptot = [m.pnet[n] + m.pcha[n].value - m.pdis[n].value for n in m.time]
         soc  = [m.s[n].value for n in m.time]
         pfpk_without_es = max(m.pnet)
-        ptpk_without_es = [max(m.pnet[n]*m.mask_ds[p][n] for n in m.time) for p in m.period]
+        # Hours outside of a time-of-use period count as zero demand towards its peak.
+        ptpk_without_es = [max([m.pnet[n] for n in hours] + ([0] if len(hours) < m.nhr else [])) for hours in m.period_hours]
         
         demand_charge_with_es=m.pfpk.value*m.flt_dr+sum(m.ptpk[p].value*m.tou_dr[p] for p in m.period)
         demand_charge_without_es=pfpk_without_es*m.flt_dr+sum(ptpk_without_es[p]*m.tou_dr[p] for p in m.period)
@@ -507,6 +542,9 @@ class BtmOptimizer(optimizer.Optimizer):
         self.nem_charge_with_es = nem_charge_with_es
         self.nem_charge_without_es = nem_charge_without_es
 
+        self.peak_demand_with_es = m.pfpk.value
+        self.peak_demand_without_es = pfpk_without_es
+
         # self.results.to_csv('resultssss.csv')
         
     def get_results(self):
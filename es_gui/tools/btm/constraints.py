@@ -62,9 +62,8 @@ def eq_stateofcharge_final(m):
     """Requires the final state of charge of the energy storage device to equal its initial value."""
     mp = m.parent_block()
     T  = mp.nhr-1
-    def _eq_stateofcharge_final(_m, t):
-        return mp.s[T] == mp.State_of_charge_init*mp.Energy_capacity
-    m.stateofcharge_final = Constraint(mp.time, rule=_eq_stateofcharge_final)
+    if T >= 0:
+        m.stateofcharge_final = Constraint(expr=mp.s[T] == mp.State_of_charge_init*mp.Energy_capacity)
 
 
 def ineq_peak_demand(m):
@@ -75,11 +74,11 @@ def ineq_peak_demand(m):
     m.peak_demand = Constraint(mp.time, rule=_ineq_peak_demand)
 
 def ineq_tou_demand(m):
-    """Requires all net power at time t period p less the peak demand of period p"""
+    """Requires all net power at time t in period p less the peak demand of period p; only the hours belonging to each period are indexed"""
     mp = m.parent_block()
     def _ineq_tou_demand(_m, p, t):
-        return mp.mask_ds[p][t]*(mp.pnet[t]+mp.pcha[t]-mp.pdis[t])<=mp.ptpk[p]
-    m.tou_demand = Constraint(mp.period, mp.time, rule=_ineq_tou_demand)
+        return mp.pnet[t]+mp.pcha[t]-mp.pdis[t]<=mp.ptpk[p]
+    m.tou_demand = Constraint(mp.period_time, rule=_ineq_tou_demand)
     
 def ineq_nem_xnet(m):
     """Requires all net power at time t less the peak demand"""
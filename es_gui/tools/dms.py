@@ -1,94 +1,156 @@
 from __future__ import print_function, absolute_import
 
 from collections import OrderedDict
+import glob
+import hashlib
 import pickle
 import logging
 import os
+import threading
 
 import numpy as np
 
+from es_gui.tools.dms_store import EntryStore
+
 
 class DataManagementSystem():
     """
     A class used to store processed DataFrames as NumPy ndarrays and manage memory consumed. Data is stored in nested dictionaries up to a depth of 2: {key_0: {key_0_0: data}}. When the calculated memory exceeds max_memory, the dictionary at depth 1 at the front of the queue is popped out of the dictionary until the memory consumption is less than the maximum. The queue is determined by time of accessing. Accessing or adding to the structure at any depth will push the depth 1 dictionary to the back of the queue.
 
-    :param save_name: The path/filename to pickle the DMS's data.
+    The data is persisted with an EntryStore in a directory named after save_name: each array is written to its own file in the background as it is added. On startup only the index of the store is read; each entry is loaded from disk, memory-mapped by default, the first time it is retrieved.
+
+    :param save_name: The path/filename the DMS's data is saved under; the store directory is save_name without its extension. Data pickled at save_name by earlier versions is migrated to the store.
+    :param save_data: True if added data should be persisted to the store.
     :param max_memory: The maximum amount of memory, in bytes, that the contained ndarrays may collectively occupy.
+    :param mmap_mode: The mode for memory-mapping arrays loaded from the store, as in numpy.load(); None copies them into memory.
     """
-    def __init__(self, save_name, save_data=False, max_memory=500000):
+    def __init__(self, save_name, save_data=False, max_memory=500000, mmap_mode='c'):
         self.memory_used = 0
         self.max_memory = max_memory
         self.save_data = save_data
         self.save_name = save_name
 
+        # Running byte count of each depth 1 entry, kept in sync with self.data.
+        self._entry_memory = {}
+
+        # Metadata describing depth 1 entries, e.g., fingerprints of the files they were read from.
+        self.metadata = {}
+
+        # Serializes access to self.data, e.g., by a thread prefetching data.
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._store = EntryStore(os.path.splitext(self.save_name)[0], mmap_mode=mmap_mode)
+        self.data = OrderedDict()
+
+        if os.path.isfile(self.save_name):
+            self._migrate_pickle()
+        else:
+            for key, (nbytes, metadata) in self._store.read_index().items():
+                self.data[key] = _StoredEntry(nbytes)
+
+                if metadata is not None:
+                    self.metadata[key] = metadata
+
+            if self.data:
+                logging.info('DMS: Found {n} entries in {dir}.'.format(n=len(self.data), dir=self._store.store_dir))
+
+        self.compute_memory()
+
+    def _migrate_pickle(self):
+        """Loads data pickled at self.save_name by earlier versions and moves it to the store."""
         try:
             with open(self.save_name, 'rb') as pfile:
                 self.data = pickle.load(pfile)
                 logging.info('DMS: Successfully loaded {fname}.'.format(fname=self.save_name))
-        except FileNotFoundError:
-            self.data = OrderedDict()
-        except pickle.PickleError:
+        except (pickle.PickleError, EOFError):
             logging.error('DMS: Could not unpickle data; purging and restarting DMS.')
-            self.delete_pickle()
             self.data = OrderedDict()
-    
+
+        if self.save_data:
+            self._store.read_index()
+
+            for key, value in self.data.items():
+                self._store.put(key, value)
+
+            self._store.flush()
+            os.remove(self.save_name)
+
     def delete_pickle(self):
-        """Deletes the pickle file used for self.data object persistence."""
-        os.remove(self.save_data)
+        """Deletes the persisted data: the store and any pickle file from earlier versions."""
+        self._store.clear()
+
+        if os.path.isfile(self.save_name):
+            os.remove(self.save_name)
 
     def save_state(self):
-        """Pickles self.data at self.save_name."""
+        """Waits until all of the data added has been written to the store."""
         if self.save_data:
-            logging.info('DMS: Saving {0}.'.format(self.save_name))
-            with open(self.save_name, 'wb') as pfile:
-                pickle.dump(self.data, pfile, protocol=3)
+            logging.info('DMS: Saving {0}.'.format(self._store.store_dir))
+            self._store.flush()
 
     def pop(self):
         """Shortcut for popping the queue of the OrderedDict."""
         k, v = self.data.popitem(last=False)
+        self.memory_used -= self._entry_memory.pop(k, 0)
+        self.metadata.pop(k, None)
+        self.evictions += 1
+
+        if self.save_data:
+            self._store.delete(k)
+
         print('Popped: ', (k))
 
     def requeue(self, key):
         """Moves self.data[key] to the back of the queue for being purged."""
 
         if key in self.data:
-            to_requeue = self.data.pop(key)
-            self.data[key] = to_requeue
+            self.data.move_to_end(key)
 
     def manage_memory(self):
         """Pops entries from the queue until occupied memory is less than the maximum allocated."""
-        dms_sz = self.compute_memory()
-
-        while dms_sz > self.max_memory:
+        if self.memory_used > self.max_memory:
             print('Memory limit exceeded. Purging old data...')
-            print('Currently using: ', dms_sz, 'bytes')
+            print('Currently using: ', self.memory_used, 'bytes')
             print('Maximum allowed: ', self.max_memory, 'bytes')
-            self.pop()
-            dms_sz = self.compute_memory()
-            print('Now using: ', dms_sz, 'bytes')
 
-        self.save_state()
+            while self.memory_used > self.max_memory and self.data:
+                self.pop()
 
-    def compute_memory(self):
-        """Computes the memory footprint of the entire data structure."""
-        def _compute_memory(coll):
-            dms_sz = 0
+            print('Now using: ', self.memory_used, 'bytes')
 
-            for value in coll.values():
-                if isinstance(value, np.ndarray):
-                    array_sz = value.nbytes
-                else:
-                    array_sz = _compute_memory(value)
-
-                dms_sz += array_sz
-            return dms_sz
+    def compute_memory(self):
+        """Computes the memory footprint of the entire data structure from scratch and resets the running byte count of each entry accordingly."""
+        self._entry_memory = {key: _compute_memory(value) for key, value in self.data.items()}
 
-        dms_sz = _compute_memory(self.data)
+        dms_sz = sum(self._entry_memory.values())
         self.memory_used = dms_sz
         return dms_sz
 
-    def add_data(self, value, *args):
-        """Adds value to self.data[arg[0]][...][arg[N-1]]. Requeues self.data[arg[0]] after updating."""
+    def get_statistics(self):
+        """Returns a dictionary of the memory used and the cache hit, miss, and eviction counts since the DMS was created or reset_statistics() was called."""
+        lookups = self.hits + self.misses
+
+        return {'memory_used': self.memory_used,
+                'max_memory': self.max_memory,
+                'n_entries': len(self.data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits/lookups if lookups else None,
+                }
+
+    def reset_statistics(self):
+        """Resets the cache hit, miss, and eviction counts."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def add_data(self, value, *args, metadata=None):
+        """Adds value to self.data[arg[0]][...][arg[N-1]], along with optional JSON serializable metadata describing it. Requeues self.data[arg[0]] after updating."""
 
         # def _add_data(keys, val):
         #     val = {keys.pop(): val}
@@ -112,28 +174,148 @@ class DataManagementSystem():
         #         tmp_dict = value
         #     finally:
         #         self.data[args[0]] = tmp_dict
-        self.data[args[0]] = value
+        with self._lock:
+            self.memory_used -= self._entry_memory.pop(args[0], 0)
+
+            self.data[args[0]] = value
+            self._entry_memory[args[0]] = _compute_memory(value)
+            self.memory_used += self._entry_memory[args[0]]
+
+            if metadata is not None:
+                self.metadata[args[0]] = metadata
+            else:
+                self.metadata.pop(args[0], None)
+
+            if self.save_data:
+                self._store.put(args[0], value, metadata)
 
-        self.requeue(args[0])
-        self.manage_memory()
+            self.requeue(args[0])
+            self.manage_memory()
 
     def get_data(self, *args):
         """Retrieves NumPy ndarray from self.data according to provided sequence of keys."""
-        tmp = self.data
-
-        for key in args:
-            if isinstance(tmp, np.ndarray):
-                print('>>> Warning: Already reached end of data tree. Too many arguments provided.')
-                print('keys provided: {0}'.format(args))
-                print('current key: {0}'.format(key))
-                break
+        with self._lock:
+            if isinstance(self.data.get(args[0]), _StoredEntry):
+                self._load_stored(args[0])
+
+            tmp = self.data
+
+            for key in args:
+                if isinstance(tmp, np.ndarray):
+                    print('>>> Warning: Already reached end of data tree. Too many arguments provided.')
+                    print('keys provided: {0}'.format(args))
+                    print('current key: {0}'.format(key))
+                    break
+                else:
+                    try:
+                        tmp = tmp[key]
+                    except KeyError:
+                        self.misses += 1
+                        logging.info('DMS: Data not yet in DMS, loading...')
+                        raise(KeyError('KeyError when retrieving: {0}'.format(key)))
+
+            self.hits += 1
+            self.requeue(args[0])
+            logging.info('DMS: Data located in DMS, retrieving...')
+            return tmp
+
+    def _load_stored(self, key):
+        """Replaces the placeholder for an entry that has not been loaded from the store yet with its data; drops the entry if it cannot be loaded."""
+        try:
+            self.data[key] = self._store.load(key)
+        except KeyError:
+            self.invalidate(key)
+
+    def invalidate(self, key):
+        """Removes the depth 1 entry self.data[key], if present, from the DMS and the store."""
+        with self._lock:
+            if key in self.data:
+                del self.data[key]
+                self.memory_used -= self._entry_memory.pop(key, 0)
+                self.metadata.pop(key, None)
+
+                if self.save_data:
+                    self._store.delete(key)
+
+                logging.info('DMS: Invalidated {0}.'.format(key))
+
+    def validate_sources(self, sources, fast_hash=False):
+        """Invalidates entries whose source files have changed since they were added. sources is a dictionary mapping keys to lists of glob patterns of the files each entry is read from; directories matched stand for the files in them. Returns a dictionary mapping each key to the current fingerprint of its sources, to be passed as metadata when (re)adding the entry."""
+        fingerprints = {}
+        computed = {}
+
+        for key, patterns in sources.items():
+            patterns = tuple(patterns)
+
+            if patterns not in computed:
+                computed[patterns] = fingerprint_files(patterns, fast_hash=fast_hash)
+
+            fingerprints[key] = {'sources': computed[patterns]}
+
+            if key in self.data and self.metadata.get(key) != fingerprints[key]:
+                logging.info('DMS: Source files of {0} have changed.'.format(key))
+                self.invalidate(key)
+
+        return fingerprints
+
+
+class _StoredEntry():
+    """Placeholder for an entry in the store that has not been loaded yet."""
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+
+def _compute_memory(value):
+    """Computes the memory footprint of an ndarray or a (nested) dictionary of ndarrays."""
+    if isinstance(value, (np.ndarray, _StoredEntry)):
+        return value.nbytes
+
+    return sum(_compute_memory(v) for v in value.values())
+
+
+def fingerprint_files(patterns, fast_hash=False):
+    """Returns a JSON serializable fingerprint of the files matching the glob patterns: their paths, sizes, and modification times and, if fast_hash, a hash of their first and last 64 KiB."""
+    paths = set()
+
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            if os.path.isdir(path):
+                with os.scandir(path) as it:
+                    paths.update(entry.path for entry in it if entry.is_file())
             else:
-                try:
-                    tmp = tmp[key]
-                except KeyError:
-                    logging.info('DMS: Data not yet in DMS, loading...')
-                    raise(KeyError('KeyError when retrieving: {0}'.format(key)))
-
-        self.requeue(args[0])
-        logging.info('DMS: Data located in DMS, retrieving...')
-        return tmp
+                paths.add(path)
+
+    fingerprint = []
+
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+
+        record = [path, stat.st_size, stat.st_mtime_ns]
+
+        if fast_hash:
+            record.append(_sample_hash(path, stat.st_size))
+
+        fingerprint.append(record)
+
+    return fingerprint
+
+
+def _sample_hash(path, size, n_bytes=65536):
+    """Hashes the first and last n_bytes of the file at path."""
+    h = hashlib.blake2b(digest_size=16)
+
+    try:
+        with open(path, 'rb') as f:
+            h.update(f.read(n_bytes))
+
+            if size > 2*n_bytes:
+                f.seek(-n_bytes, os.SEEK_END)
+
+            h.update(f.read(n_bytes))
+    except OSError:
+        return None
+
+    return h.hexdigest()
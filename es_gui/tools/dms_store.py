@@ -0,0 +1,234 @@
+from __future__ import absolute_import
+
+from collections import OrderedDict
+import atexit
+import hashlib
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import uuid
+
+import numpy as np
+
+
+class EntryStore():
+    """
+    Persists the entries of a DataManagementSystem on disk, one .npy file per ndarray, with a small JSON index of the entries. Entries are written and deleted by a background thread so that adding data to the DMS does not wait on the disk; flush() waits for the pending writes. Reading the index does not read any arrays, and arrays can be loaded as memory maps instead of being copied into RAM.
+
+    Each version of an entry is written to new files, so files that may be memory-mapped are never overwritten. The files of replaced and deleted entries are removed after the index no longer refers to them; files that cannot be removed yet, e.g., because they are still mapped on Windows, are retried after later writes, and files left behind by an interrupted session are removed on the first write.
+
+    :param store_dir: The directory to store the entries and index in; created on the first write.
+    :param mmap_mode: The mode for memory-mapping arrays when loading them, as in numpy.load(); None loads them into memory. The default, 'c', maps them copy-on-write so changes to a loaded array are not written to disk.
+    """
+    index_name = 'index.json'
+
+    def __init__(self, store_dir, mmap_mode='c'):
+        self.store_dir = store_dir
+        self.mmap_mode = mmap_mode
+
+        self.index = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = None
+
+        # Files no longer referred to by the index, to be removed once the index on disk is updated.
+        self._stale = []
+        self._index_read = False
+        self._swept = False
+
+    @property
+    def index_path(self):
+        return os.path.join(self.store_dir, self.index_name)
+
+    @staticmethod
+    def _entry_name(key):
+        """Returns the file name stem for the entry with the given key."""
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def read_index(self):
+        """Reads the index from disk and returns an OrderedDict of the stored keys and their (size in bytes, metadata) tuples, in the order they were stored."""
+        try:
+            with open(self.index_path, 'r') as f:
+                records = json.load(f)
+        except FileNotFoundError:
+            records = []
+        except (ValueError, OSError) as e:
+            logging.error('DMS: Could not read the index {fname}; starting with an empty store. ({error})'.format(fname=self.index_path, error=e))
+            records = []
+
+        with self._lock:
+            self.index = OrderedDict((record['key'], record) for record in records)
+            self._index_read = True
+
+            return OrderedDict((key, (record['nbytes'], record.get('metadata'))) for key, record in self.index.items())
+
+    def _write_index(self):
+        with self._lock:
+            records = list(self.index.values())
+
+        tmp_path = '{0}.{1}.tmp'.format(self.index_path, os.getpid())
+
+        with open(tmp_path, 'w') as f:
+            json.dump(records, f)
+
+        os.replace(tmp_path, self.index_path)
+
+    def put(self, key, value, metadata=None):
+        """Schedules writing value, an ndarray or a (nested) dictionary of ndarrays, under key along with metadata, a JSON serializable object describing it."""
+        self._submit(('put', key, (value, metadata)))
+
+    def delete(self, key):
+        """Schedules deleting the entry stored under key."""
+        self._submit(('delete', key, None))
+
+    def _submit(self, task):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_behind, name='DMS write-behind', daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+
+        self._queue.put(task)
+
+    def flush(self):
+        """Waits until all scheduled writes and deletions are on disk."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def _write_behind(self):
+        """Applies scheduled writes and deletions in order, writing the index whenever the queue is emptied."""
+        while True:
+            action, key, value = self._queue.get()
+
+            try:
+                os.makedirs(self.store_dir, exist_ok=True)
+
+                if action == 'put':
+                    self._write_entry(key, *value)
+                else:
+                    self._delete_entry(key)
+
+                if self._queue.unfinished_tasks == 1:
+                    self._write_index()
+                    self._remove_stale()
+            except (OSError, ValueError) as e:
+                logging.warning('DMS: Could not update the store in {dir}. ({error})'.format(dir=self.store_dir, error=e))
+            finally:
+                self._queue.task_done()
+
+    def _write_entry(self, key, value, metadata=None):
+        name = '{0}.{1}'.format(self._entry_name(key), uuid.uuid4().hex[:12])
+        files = []
+
+        def _write(value, stem):
+            if isinstance(value, dict):
+                return [[k, _write(v, '{0}_{1}'.format(stem, ix))] for ix, (k, v) in enumerate(value.items())]
+
+            fname = stem + '.npy'
+            tmp_path = os.path.join(self.store_dir, fname + '.tmp')
+
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.asarray(value), allow_pickle=False)
+
+            os.replace(tmp_path, os.path.join(self.store_dir, fname))
+            files.append(fname)
+
+            return fname
+
+        layout = _write(value, name)
+
+        with self._lock:
+            record = self.index.get(key)
+            self.index[key] = {'key': key, 'layout': layout, 'files': files, 'nbytes': _nbytes(value), 'metadata': metadata}
+
+            if record is not None:
+                self._stale.extend(record['files'])
+
+    def _delete_entry(self, key):
+        with self._lock:
+            record = self.index.pop(key, None)
+
+            if record is not None:
+                self._stale.extend(record['files'])
+
+    def _remove_stale(self):
+        """Removes the files that the index no longer refers to, keeping those that cannot be removed yet to retry later."""
+        if not self._swept:
+            self._collect_orphans()
+
+        with self._lock:
+            stale, self._stale = self._stale, []
+
+        remaining = []
+
+        for fname in stale:
+            try:
+                os.remove(os.path.join(self.store_dir, fname))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                remaining.append(fname)
+
+        with self._lock:
+            self._stale.extend(remaining)
+
+    def _collect_orphans(self):
+        """Marks the entry files in the store directory that the index does not refer to, e.g., left by an interrupted session, for removal."""
+        with self._lock:
+            if not self._index_read:
+                return
+
+            referenced = set(self._stale)
+
+            for record in self.index.values():
+                referenced.update(record['files'])
+
+        try:
+            names = os.listdir(self.store_dir)
+        except OSError:
+            return
+
+        orphans = [name for name in names if name not in referenced and name.endswith(('.npy', '.npy.tmp'))]
+
+        with self._lock:
+            self._stale.extend(orphans)
+            self._swept = True
+
+    def load(self, key):
+        """Loads the entry stored under key. Raises KeyError if there is no such entry or its files cannot be read."""
+        with self._lock:
+            record = self.index.get(key)
+
+        if record is None:
+            raise KeyError(key)
+
+        def _load(layout):
+            if isinstance(layout, list):
+                return {k: _load(v) for k, v in layout}
+
+            return np.load(os.path.join(self.store_dir, layout), mmap_mode=self.mmap_mode, allow_pickle=False)
+
+        try:
+            return _load(record['layout'])
+        except (OSError, ValueError) as e:
+            logging.warning('DMS: Could not load {key} from the store. ({error})'.format(key=key, error=e))
+            raise KeyError(key)
+
+    def clear(self):
+        """Deletes the store directory and everything in it."""
+        self.flush()
+
+        with self._lock:
+            self.index = OrderedDict()
+
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+
+
+def _nbytes(value):
+    """Computes the memory footprint of an ndarray or a (nested) dictionary of ndarrays."""
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+
+    return int(np.asarray(value).nbytes)
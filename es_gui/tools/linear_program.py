@@ -0,0 +1,257 @@
+from __future__ import division, print_function, absolute_import
+
+from collections import OrderedDict
+import logging
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+from pyomo.environ import Constraint, Objective, maximize, value
+from pyomo.repn.standard_repn import generate_standard_repn
+
+try:
+    import highspy
+except ImportError:
+    # Fall back to SciPy's interface to HiGHS; warm starts are unavailable.
+    highspy = None
+
+
+class LinearProgram:
+    """
+    A linear program in matrix form: optimize c'x + constant subject to A_ub x <= b_ub, A_eq x == b_eq, and lb <= x <= ub. Solved in-process with HiGHS, through highspy if it is installed (which enables warm starts) or the HiGHS solvers shipped with SciPy otherwise.
+
+    :param c: The objective coefficient vector.
+    :param A_ub: Sparse matrix of inequality constraint coefficients.
+    :param b_ub: Vector of inequality constraint upper bounds.
+    :param A_eq: Sparse matrix of equality constraint coefficients.
+    :param b_eq: Vector of equality constraint right-hand sides.
+    :param lb: Vector of variable lower bounds; -np.inf for unbounded.
+    :param ub: Vector of variable upper bounds; np.inf for unbounded.
+    :param sense: 'minimize' or 'maximize'.
+    :param constant: A constant term added to the objective function value.
+    :param columns: OrderedDict mapping variable names to slices of the decision vector.
+    """
+    def __init__(self, c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, lb=None, ub=None,
+                 sense='minimize', constant=0.0, columns=None):
+        self.c = np.asarray(c, dtype=float)
+        n = len(self.c)
+
+        self.A_ub = sp.csr_matrix(A_ub) if A_ub is not None else sp.csr_matrix((0, n))
+        self.b_ub = np.asarray(b_ub, dtype=float) if b_ub is not None else np.zeros(0)
+        self.A_eq = sp.csr_matrix(A_eq) if A_eq is not None else sp.csr_matrix((0, n))
+        self.b_eq = np.asarray(b_eq, dtype=float) if b_eq is not None else np.zeros(0)
+
+        self.lb = np.asarray(lb, dtype=float) if lb is not None else np.zeros(n)
+        self.ub = np.asarray(ub, dtype=float) if ub is not None else np.full(n, np.inf)
+
+        if sense not in {'minimize', 'maximize'}:
+            raise ValueError('sense must be either "minimize" or "maximize".')
+
+        self.sense = sense
+        self.constant = constant
+        self.columns = columns if columns is not None else OrderedDict()
+        self.variables = []
+
+        self.x = None
+        self.objective_value = None
+        self.status = None
+        self.message = ''
+        self.iterations = 0
+        self.basis = None
+
+    @classmethod
+    def from_pyomo_model(cls, model):
+        """Compiles the active objective and linear constraints of a Pyomo model into a LinearProgram. The Pyomo variables are kept in the variables attribute, in column order, for loading the solution back."""
+        var_ids = {}
+        variables = []
+
+        def _columns(repn):
+            cols = []
+
+            for v in repn.linear_vars:
+                try:
+                    cols.append(var_ids[id(v)])
+                except KeyError:
+                    var_ids[id(v)] = len(variables)
+                    cols.append(len(variables))
+                    variables.append(v)
+
+            return cols
+
+        objectives = list(model.component_data_objects(Objective, active=True, descend_into=True))
+
+        if len(objectives) != 1:
+            raise ValueError('LinearProgram: Expected exactly one active objective, found {0}.'.format(len(objectives)))
+
+        obj = objectives[0]
+        repn = generate_standard_repn(obj.expr, compute_values=True)
+
+        if not repn.is_linear():
+            raise ValueError('LinearProgram: The objective function is not linear.')
+
+        obj_cols = _columns(repn)
+        obj_coefs = list(repn.linear_coefs)
+        constant = value(repn.constant)
+
+        ub_rows, ub_cols, ub_vals, b_ub = [], [], [], []
+        eq_rows, eq_cols, eq_vals, b_eq = [], [], [], []
+
+        for con in model.component_data_objects(Constraint, active=True, descend_into=True):
+            repn = generate_standard_repn(con.body, compute_values=True)
+
+            if not repn.is_linear():
+                raise ValueError('LinearProgram: Constraint {0} is not linear.'.format(con.name))
+
+            cols = _columns(repn)
+            coefs = list(repn.linear_coefs)
+            offset = value(repn.constant)
+
+            if con.equality:
+                eq_rows.extend([len(b_eq)]*len(cols))
+                eq_cols.extend(cols)
+                eq_vals.extend(coefs)
+                b_eq.append(value(con.upper) - offset)
+                continue
+
+            if con.has_ub():
+                ub_rows.extend([len(b_ub)]*len(cols))
+                ub_cols.extend(cols)
+                ub_vals.extend(coefs)
+                b_ub.append(value(con.upper) - offset)
+
+            if con.has_lb():
+                ub_rows.extend([len(b_ub)]*len(cols))
+                ub_cols.extend(cols)
+                ub_vals.extend([-a for a in coefs])
+                b_ub.append(offset - value(con.lower))
+
+        n = len(variables)
+
+        c = np.zeros(n)
+        np.add.at(c, np.array(obj_cols, dtype=int), np.array(obj_coefs, dtype=float))
+
+        lb = np.array([-np.inf if v.lb is None else v.lb for v in variables], dtype=float)
+        ub = np.array([np.inf if v.ub is None else v.ub for v in variables], dtype=float)
+
+        A_ub = sp.csr_matrix((ub_vals, (ub_rows, ub_cols)), shape=(len(b_ub), n))
+        A_eq = sp.csr_matrix((eq_vals, (eq_rows, eq_cols)), shape=(len(b_eq), n))
+
+        lp = cls(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, lb=lb, ub=ub,
+                 sense='maximize' if obj.sense == maximize else 'minimize', constant=constant)
+        lp.variables = variables
+
+        return lp
+
+    def load_pyomo_solution(self):
+        """Assigns the solution values to the Pyomo variables the LinearProgram was compiled from."""
+        x = np.clip(self.x, self.lb, self.ub)
+
+        for v, val in zip(self.variables, x):
+            v.set_value(float(val))
+
+    @property
+    def n_variables(self):
+        """The number of decision variables."""
+        return len(self.c)
+
+    @property
+    def n_constraints(self):
+        """The number of equality and inequality constraint rows."""
+        return self.A_ub.shape[0] + self.A_eq.shape[0]
+
+    @property
+    def n_nonzeros(self):
+        """The number of nonzero coefficients in the constraint matrices."""
+        return self.A_ub.nnz + self.A_eq.nnz
+
+    @property
+    def optimal(self):
+        """True if the most recent solve terminated with an optimal solution."""
+        return self.status == 0
+
+    def solve(self, warm_start=False):
+        """Solves the linear program and stores the solution vector and objective function value. If warm_start, the solve starts from the basis attribute, e.g., one carried over from a previous solve of a linear program with the same structure."""
+        c = -self.c if self.sense == 'maximize' else self.c
+
+        if highspy is not None:
+            x = self._solve_highspy(c, warm_start)
+        else:
+            if warm_start:
+                logging.debug('LinearProgram: highspy is not installed, solving without a warm start.')
+
+            x = self._solve_scipy(c)
+
+        if self.optimal:
+            self.x = x
+            self.objective_value = float(np.dot(self.c, x)) + self.constant
+        else:
+            logging.debug('LinearProgram: {0}'.format(self.message))
+            self.x = None
+            self.objective_value = None
+
+        return self.optimal
+
+    def _solve_scipy(self, c):
+        """Solves the linear program with scipy.optimize.linprog."""
+        res = linprog(c,
+                      A_ub=self.A_ub if self.A_ub.shape[0] else None,
+                      b_ub=self.b_ub if self.A_ub.shape[0] else None,
+                      A_eq=self.A_eq if self.A_eq.shape[0] else None,
+                      b_eq=self.b_eq if self.A_eq.shape[0] else None,
+                      bounds=np.column_stack([self.lb, self.ub]) if self.n_variables else None,
+                      method='highs')
+
+        self.status = res.status
+        self.message = res.message
+        self.iterations = getattr(res, 'nit', 0)
+
+        return res.x
+
+    def _solve_highspy(self, c, warm_start):
+        """Solves the linear program with highspy, optionally starting from self.basis."""
+        h = highspy.Highs()
+        h.setOptionValue('output_flag', False)
+
+        A = sp.vstack([self.A_ub, self.A_eq]).tocsc()
+        n_ub = self.A_ub.shape[0]
+
+        lp = highspy.HighsLp()
+        lp.num_col_ = self.n_variables
+        lp.num_row_ = A.shape[0]
+        lp.col_cost_ = c
+        lp.col_lower_ = self.lb
+        lp.col_upper_ = self.ub
+        lp.row_lower_ = np.concatenate([np.full(n_ub, -highspy.kHighsInf), self.b_eq])
+        lp.row_upper_ = np.concatenate([self.b_ub, self.b_eq])
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = A.indptr
+        lp.a_matrix_.index_ = A.indices
+        lp.a_matrix_.value_ = A.data
+
+        h.passModel(lp)
+
+        if warm_start and self.basis is not None:
+            h.setBasis(self.basis)
+
+        h.run()
+
+        model_status = h.getModelStatus()
+
+        self.status = 0 if model_status == highspy.HighsModelStatus.kOptimal else -1
+        self.message = h.modelStatusToString(model_status)
+        self.iterations = h.getInfo().simplex_iteration_count
+
+        if self.optimal:
+            self.basis = h.getBasis()
+
+        return np.array(h.getSolution().col_value)
+
+    def inherit_basis(self, other):
+        """Carries the basis of another solved LinearProgram over for warm starting if the two have the same dimensions."""
+        if other is not None and other.basis is not None \
+                and (other.n_variables, other.A_ub.shape[0], other.A_eq.shape[0]) == (self.n_variables, self.A_ub.shape[0], self.A_eq.shape[0]):
+            self.basis = other.basis
+
+    def get_values(self, name):
+        """Returns the solution values of the variable block with the given name as an ndarray."""
+        return self.x[self.columns[name]]
@@ -1,9 +1,23 @@
 from abc import ABCMeta, abstractmethod, abstractproperty
+from collections import OrderedDict
+from contextlib import contextmanager
+from numbers import Number
+import csv
+import json
 import logging
+import time
 
 from six import with_metaclass
 from pyomo.environ import *
 
+from es_gui.tools.linear_program import LinearProgram
+
+# Solvers that are called in-process on a matrix form of the model instead of through Pyomo's SolverFactory.
+IN_PROCESS_SOLVERS = {'highs'}
+
+# Phases of building and solving a model that are timed, in order.
+PHASES = ('cache_lookup', 'load_data', 'instantiate_model', 'populate_model', 'solver_io', 'solve', 'process_results')
+
 
 class Optimizer(with_metaclass(ABCMeta)):
     """Abstract base class for Pyomo ConcreteModel optimization framework."""
@@ -13,6 +27,10 @@ class Optimizer(with_metaclass(ABCMeta)):
         self._solver = solver
 
         self._results = None
+        self._linear_program = None
+
+        self._timings = OrderedDict()
+        self._model_statistics = {}
 
     @property
     def model(self):
@@ -24,11 +42,71 @@ class Optimizer(with_metaclass(ABCMeta)):
         """The name of the solver for Pyomo to use."""
         return self._solver
 
+    @property
+    def linear_program(self):
+        """The LinearProgram most recently solved in-process, if any."""
+        return self._linear_program
+
     @property
     def results(self):
         """A results DataFrame containing series of indices, decision variables, and/or model parameters or derived quantities."""
         return self._results
 
+    @property
+    def timings(self):
+        """OrderedDict of the wall and CPU time [s] spent in each phase of building and solving the model, {phase: {'wall': float, 'cpu': float}}. Accumulates until reset_timings() is called."""
+        if getattr(self, '_timings', None) is None:
+            self._timings = OrderedDict()
+
+        return self._timings
+
+    @property
+    def model_statistics(self):
+        """Dictionary of the number of variables, constraints, and nonzeros of the most recently solved model and the solver iterations; None for quantities the solver did not report."""
+        return getattr(self, '_model_statistics', {})
+
+    def reset_timings(self):
+        """Starts a new record of phase timings and model statistics."""
+        self._timings = OrderedDict()
+        self._model_statistics = {}
+
+    @contextmanager
+    def timed(self, phase):
+        """Context manager adding the wall and CPU time spent in the block to the given phase."""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+
+        try:
+            yield
+        finally:
+            self._add_timing(phase, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def _add_timing(self, phase, wall, cpu):
+        timing = self.timings.setdefault(phase, {'wall': 0.0, 'cpu': 0.0})
+        timing['wall'] += wall
+        timing['cpu'] += cpu
+
+    def _set_model_statistics(self, n_variables=None, n_constraints=None, n_nonzeros=None, iterations=None):
+        self._model_statistics = {'n_variables': n_variables, 'n_constraints': n_constraints,
+                                  'n_nonzeros': n_nonzeros, 'iterations': iterations}
+
+    def get_timing_report(self):
+        """Returns the phase timings, their total, and the model statistics as a flat OrderedDict, e.g., for export with write_timing_reports()."""
+        report = OrderedDict()
+
+        for phase in PHASES:
+            timing = self.timings.get(phase, {'wall': 0.0, 'cpu': 0.0})
+            report[phase + '_wall'] = timing['wall']
+            report[phase + '_cpu'] = timing['cpu']
+
+        report['total_wall'] = sum(timing['wall'] for timing in self.timings.values())
+        report['total_cpu'] = sum(timing['cpu'] for timing in self.timings.values())
+
+        for key in ['n_variables', 'n_constraints', 'n_nonzeros', 'iterations']:
+            report[key] = self.model_statistics.get(key)
+
+        return report
+
     @abstractmethod
     def _set_model_param(self):
         """A method for assigning model parameters and their default values to the model."""
@@ -51,17 +129,70 @@ class Optimizer(with_metaclass(ABCMeta)):
 
     def solve_model(self):
         """Solves the model using the specified solver."""
+        assert self._call_solver(tee=False)
+
+        with self.timed('process_results'):
+            self._process_results()
+
+    def _call_solver(self, tee=False, warmstart=False):
+        """Solves the model using the specified solver and loads the solution; returns True if the solution is optimal. If warmstart, the solver starts from the previous solution when it is capable of doing so."""
+        if self.solver in IN_PROCESS_SOLVERS:
+            with self.timed('solver_io'):
+                lp = LinearProgram.from_pyomo_model(self.model)
+
+            if warmstart:
+                lp.inherit_basis(self._linear_program)
+
+            self._linear_program = lp
+
+            with self.timed('solve'):
+                lp.solve(warm_start=warmstart)
+
+            with self.timed('solver_io'):
+                if lp.optimal:
+                    lp.load_pyomo_solution()
+
+            self._set_model_statistics(lp.n_variables, lp.n_constraints, lp.n_nonzeros, lp.iterations)
+
+            return lp.optimal
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+
         if self.solver == 'neos':
             opt = SolverFactory('cbc')
             solver_manager = SolverManagerFactory('neos')
             results = solver_manager.solve(self.model, opt=opt)
         else:
             solver = SolverFactory(self.solver)
-            results = solver.solve(self.model, tee=False, keepfiles=False)
 
-        assert (results.solver.termination_condition.key == 'optimal')
+            if warmstart and solver.warm_start_capable():
+                results = solver.solve(self.model, tee=tee, keepfiles=False, warmstart=True)
+            else:
+                results = solver.solve(self.model, tee=tee, keepfiles=False)
+
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+
+        # The solver runs in a separate process: attribute the time it reports to the solve and the rest, e.g., writing the problem and reading the solution, to solver I/O. The CPU time of this process is all solver I/O.
+        solve_wall = _result_value(results.solver, 'wallclock_time')
 
-        self._process_results()
+        if solve_wall is None:
+            solve_wall = _result_value(results.solver, 'time')
+
+        if solve_wall is None:
+            solve_wall = wall
+        else:
+            solve_wall = min(solve_wall, wall)
+
+        self._add_timing('solver_io', wall - solve_wall, cpu)
+        self._add_timing('solve', solve_wall, 0.0)
+
+        self._set_model_statistics(n_variables=_result_value(results.problem, 'number_of_variables') or self.model.nvariables(),
+                                   n_constraints=_result_value(results.problem, 'number_of_constraints') or self.model.nconstraints(),
+                                   n_nonzeros=_result_value(results.problem, 'number_of_nonzeros'))
+
+        return results.solver.termination_condition.key == 'optimal'
 
     @abstractmethod
     def _process_results(self):
@@ -75,24 +206,20 @@ class Optimizer(with_metaclass(ABCMeta)):
 
     def run(self):
         """Instantiates, creates, and solves the optimizer model based on supplied information. Use if no steps are needed between constructing the model and solving it."""
-        self.instantiate_model()
-        self.populate_model()
+        with self.timed('instantiate_model'):
+            self.instantiate_model()
 
-        if self.solver == 'neos':
-            opt = SolverFactory('cbc')
-            solver_manager = SolverManagerFactory('neos')
-            results = solver_manager.solve(self.model, opt=opt)
-        else:
-            solver = SolverFactory(self.solver)
-            results = solver.solve(self.model, tee=True, keepfiles=False)
+        with self.timed('populate_model'):
+            self.populate_model()
 
         try:
-            assert (results.solver.termination_condition.key == 'optimal')
+            assert self._call_solver(tee=True)
         except AssertionError as e:
             logging.error('Optimizer: An optimal solution could not be obtained. (Infeasible problem?)')
             raise(e)
         else:
-            self._process_results()
+            with self.timed('process_results'):
+                self._process_results()
 
         return self.get_results()
 
@@ -100,4 +227,34 @@ class Optimizer(with_metaclass(ABCMeta)):
         """Sets model parameters in kwargs to their respective values."""
         for kw_key, kw_value in kwargs.items():
             logging.info('Optimizer: Setting {param} to {value}'.format(param=kw_key, value=kw_value))
-            setattr(self.model, kw_key, kw_value)
\ No newline at end of file
+            setattr(self.model, kw_key, kw_value)
+
+
+def _result_value(container, name):
+    """Returns the named numeric field of a Pyomo SolverResults container or None if the solver did not report it."""
+    try:
+        result = getattr(container, name)
+    except (AttributeError, IndexError, KeyError):
+        return None
+
+    if isinstance(result, Number) and not isinstance(result, bool):
+        return result
+
+    return None
+
+
+def write_timing_reports(reports, path):
+    """Writes a list of timing reports (dicts with the same keys, e.g., from Optimizer.get_timing_report()) to path as CSV if it ends in '.csv' or JSON otherwise."""
+    if path.lower().endswith('.csv'):
+        fieldnames = []
+
+        for report in reports:
+            fieldnames.extend(key for key in report if key not in fieldnames)
+
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(reports)
+    else:
+        with open(path, 'w') as f:
+            json.dump(reports, f, indent=2)
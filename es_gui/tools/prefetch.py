@@ -0,0 +1,59 @@
+from __future__ import absolute_import
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+
+class Prefetcher():
+    """
+    Loads upcoming items of a sequence on a background thread while the current one is being processed, e.g., loading the data for the next months into a DMS while a month is being solved. At most lookahead items beyond the current one are loaded ahead, which keeps the memory used for prefetched data bounded.
+
+    Call advance(ix) before processing the item at index ix: it waits until the item has been prefetched, if it was scheduled, and schedules the following items. Errors raised when prefetching are logged and otherwise ignored so that they surface when the item is processed.
+
+    :param load: A function called with an item to load it.
+    :param items: The sequence of items, in the order they will be processed.
+    :param lookahead: The number of items to load ahead of the current one; 0 disables prefetching.
+    """
+    def __init__(self, load, items, lookahead=1):
+        self.load = load
+        self.items = list(items)
+        self.lookahead = max(0, int(lookahead))
+
+        self._executor = ThreadPoolExecutor(max_workers=1) if self.lookahead else None
+        self._futures = {}
+        self._next = 0  # Index of the next item to schedule.
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def advance(self, ix):
+        """Waits for the item at index ix to be prefetched, if it was scheduled, and schedules the items up to lookahead positions beyond it."""
+        future = self._futures.pop(ix, None)
+
+        if future is not None:
+            try:
+                future.result()
+            except Exception as e:
+                logging.warning('Prefetcher: Could not prefetch {item}. ({error})'.format(item=self.items[ix], error=e))
+
+        if self._executor is None:
+            return
+
+        self._next = max(self._next, ix + 1)
+
+        while self._next < len(self.items) and self._next <= ix + self.lookahead:
+            self._futures[self._next] = self._executor.submit(self.load, self.items[self._next])
+            self._next += 1
+
+    def close(self):
+        """Cancels the items not yet being prefetched and waits for the one in progress."""
+        for future in self._futures.values():
+            future.cancel()
+
+        self._futures = {}
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
@@ -0,0 +1,218 @@
+from __future__ import absolute_import
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# The extension of the pickled entries of earlier versions, which are no longer read.
+LEGACY_EXTENSION = '.p'
+
+
+class ResultCache():
+    """
+    A persistent, content-addressed cache of solved optimizer results on disk. Each entry is stored in its own .npz file named by a hash of everything the results depend on: the input arrays, the model parameters, the formulation, and the version of the code that produced them. Entries are dicts of DataFrames of numeric columns and JSON serializable values, stored as arrays and JSON and read without unpickling, so reading an entry cannot run code even if the cache directory is shared between sessions and users. Reading an entry marks it as recently used; when the entries collectively exceed max_size, the least recently used ones are deleted.
+
+    :param cache_dir: The directory to store the cache entries in; created if it does not exist.
+    :param max_size: The maximum number of bytes the cache entries may collectively occupy.
+    """
+    extension = '.npz'
+
+    def __init__(self, cache_dir, max_size=200000000):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+        # Estimate of the bytes the entries occupy: computed by evict() and increased by put(), so that the directory is only scanned when it may exceed max_size.
+        self._size = None
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(*args):
+        """Returns a hex digest identifying the given components, which may be (nested) dicts, lists, tuples, ndarrays, and scalars."""
+        h = hashlib.sha256()
+
+        for arg in args:
+            _update_hash(h, arg)
+
+        return h.hexdigest()
+
+    @staticmethod
+    def code_version(*modules):
+        """Returns a hex digest of the source code of the given modules, for invalidating results produced by other versions of the code."""
+        h = hashlib.sha256()
+
+        for module in modules:
+            with open(inspect.getsourcefile(module), 'rb') as f:
+                h.update(f.read())
+
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def get(self, key):
+        """Returns the entry stored under key or None if there is no such entry or it cannot be read."""
+        path = self._path(key)
+
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                entry = _read_entry(npz)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logging.warning('ResultCache: Could not read {fname}. ({error})'.format(fname=path, error=e))
+            return None
+        except (ValueError, KeyError, EOFError, zipfile.BadZipFile) as e:
+            logging.warning('ResultCache: Could not load {fname}, removing it from the cache. ({error})'.format(fname=path, error=e))
+            self._remove(path)
+            return None
+
+        try:
+            # Mark the entry as recently used.
+            os.utime(path)
+        except OSError:
+            pass
+
+        logging.info('ResultCache: Loaded results from the cache.')
+        return entry
+
+    def put(self, key, entry):
+        """Stores entry, a dict of DataFrames of numeric columns and JSON serializable values, under key and evicts least recently used entries if the maximum size is exceeded."""
+        path = self._path(key)
+        tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **_entry_arrays(entry))
+
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning('ResultCache: Could not write to the cache. ({error})'.format(error=e))
+            self._remove(tmp_path)
+            return
+
+        if self._size is not None:
+            self._size += size
+
+        if self._size is None or self._size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        """Deletes the least recently used entries until the cache occupies at most max_size bytes. Entries pickled by earlier versions are deleted."""
+        entries = []
+
+        with os.scandir(self.cache_dir) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(self.extension):
+                    try:
+                        stat = dir_entry.stat()
+                    except OSError:
+                        continue
+
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+                elif dir_entry.name.endswith(LEGACY_EXTENSION):
+                    self._remove(dir_entry.path)
+
+        size = sum(entry[1] for entry in entries)
+
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+
+            self._remove(path)
+            size -= entry_size
+            logging.debug('ResultCache: Evicted {fname}.'.format(fname=path))
+
+        self._size = size
+
+    def clear(self):
+        """Deletes all cache entries."""
+        for fname in os.listdir(self.cache_dir):
+            if fname.endswith((self.extension, LEGACY_EXTENSION)):
+                self._remove(os.path.join(self.cache_dir, fname))
+
+        self._size = 0
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _entry_arrays(entry):
+    """Returns the arrays to store entry as: a column of each DataFrame and a JSON description of the entry, including its other values."""
+    arrays = {}
+    description = {'frames': {}, 'values': {}}
+
+    for ix, (name, value) in enumerate(entry.items()):
+        if isinstance(value, pd.DataFrame):
+            columns = []
+
+            for jx, column in enumerate(value.columns):
+                array_name = 'frame{0}_{1}'.format(ix, jx)
+                arrays[array_name] = value[column].to_numpy()
+                columns.append([column, array_name])
+
+            arrays['frame{0}_index'.format(ix)] = value.index.to_numpy()
+            description['frames'][name] = {'columns': columns, 'index': 'frame{0}_index'.format(ix)}
+        else:
+            description['values'][name] = value.item() if isinstance(value, np.generic) else value
+
+    for name, array in arrays.items():
+        if array.dtype == object:
+            raise(TypeError('Cannot store {0} in the cache: only numeric columns are supported.'.format(name)))
+
+    arrays['entry'] = np.array(json.dumps(description))
+
+    return arrays
+
+
+def _read_entry(npz):
+    """Reconstructs the entry stored in the NpzFile npz by _entry_arrays()."""
+    description = json.loads(str(npz['entry']))
+    entry = dict(description['values'])
+
+    for name, frame in description['frames'].items():
+        entry[name] = pd.DataFrame(OrderedDict((column, npz[array_name]) for column, array_name in frame['columns']), index=npz[frame['index']])
+
+    return entry
+
+
+def _update_hash(h, obj):
+    """Feeds a canonical byte representation of obj to the hash object h."""
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+
+    if isinstance(obj, dict):
+        h.update(b'd')
+
+        for k in sorted(obj, key=repr):
+            _update_hash(h, k)
+            _update_hash(h, obj[k])
+    elif isinstance(obj, (list, tuple)) and not all(isinstance(x, (int, float, np.number)) for x in obj):
+        h.update(b'l')
+
+        for x in obj:
+            _update_hash(h, x)
+
+        h.update(b'e')
+    elif isinstance(obj, (list, tuple, np.ndarray)) or hasattr(obj, '__array__'):
+        arr = np.ascontiguousarray(obj)
+
+        if arr.dtype == object:
+            _update_hash(h, arr.tolist())
+        else:
+            h.update('a{0}{1}'.format(arr.dtype.str, arr.shape).encode())
+            h.update(arr.tobytes())
+    else:
+        h.update('s{0!r}'.format(obj).encode())
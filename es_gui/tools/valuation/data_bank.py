@@ -0,0 +1,257 @@
+"""
+A columnar store of the ISO market data read from the raw files downloaded to the data bank.
+
+The raw data is organized as downloaded: monthly or daily CSV files, or yearly workbooks, that have to be parsed on every run. Ingesting a month converts it into one .npy file per (ISO, product, node, year, month), plus one per (ISO, product, year, month) for system-wide products such as regulation prices, so that reading a month loads only that month. Next to each file is a fingerprint of the raw files it was ingested from; a month whose raw files have changed since is ignored until it is ingested again.
+
+ValuationDMS ingests each month the first time it reads it from the raw files. Usage, to ingest a year of data for the given nodes ahead of time:
+
+    python -m es_gui.tools.valuation.data_bank data PJM 2019 --nodes 51217 51288
+"""
+from __future__ import absolute_import
+
+from collections import OrderedDict
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+
+from es_gui.tools.dms import fingerprint_files
+from es_gui.tools.valuation.utilities import *
+
+# The directory of the columnar store in the data bank.
+COLUMNAR_DIR = '_columnar'
+
+# The products stored for each ISO, in the order returned by read_raw_month(), and whether each is specific to a node.
+PRODUCTS = OrderedDict([
+    ('PJM', (('LMP', True), ('MR', False), ('RA', False), ('RD', False), ('RegCCP', False), ('RegPCP', False))),
+    ('ERCOT', (('SPP', True), ('REGDN', False), ('REGUP', False))),
+    ('MISO', (('LMP', True), ('MCP', False))),
+    ('ISONE', (('LMP', True), ('RegCCP', False), ('RegPCP', False))),
+    ('NYISO', (('LBMP', True), ('RegCAP', False))),
+    ('SPP', (('LMP', True), ('MCPRU', False), ('MCPRD', False))),
+    ('CAISO', (('LMP', True), ('ASPRU', False), ('ASPRD', False), ('ASPRMU', False), ('ASPRMD', False),
+               ('RMU_MM', False), ('RMD_MM', False), ('RMU_PACC', False), ('RMD_PACC', False))),
+])
+
+
+def ercot_files(iso_path, year):
+    """Returns the paths of the ERCOT DAM SPP workbook and DAM CCP file for the given year."""
+    spp_fpath = os.path.join(iso_path, 'SPP', str(year))
+    ccp_fpath = os.path.join(iso_path, 'CCP', str(year))
+
+    spp_fname = [fname for fname in os.listdir(spp_fpath) if fname.lower().endswith('.xlsx')][-1]
+    ccp_fname = [fname for fname in os.listdir(ccp_fpath) if fname.lower().endswith('.csv')][-1]
+
+    return os.path.join(spp_fpath, spp_fname), os.path.join(ccp_fpath, ccp_fname)
+
+
+def source_patterns(iso_path, iso, year, month, node):
+    """Returns an OrderedDict mapping each product of the ISO to a list of glob patterns of the raw files the given month of it is read from. Directories matched stand for the files in them."""
+    year = str(year)
+    month = str(month)
+    node = str(node)
+    prefix = '{0}{1:02d}_*'.format(year, int(month))
+    month_dir = month.zfill(2)
+
+    if iso == 'PJM':
+        lmp = [os.path.join(iso_path, 'LMP', node, year, prefix)]
+        mileage = [os.path.join(iso_path, 'MILEAGE', year, prefix)]
+        reg = [os.path.join(iso_path, 'REG', year, prefix)]
+        patterns = [lmp, mileage, mileage, mileage, reg, reg]
+    elif iso == 'ERCOT':
+        spp_fname, ccp_fname = ercot_files(iso_path, year)
+        patterns = [[spp_fname], [ccp_fname], [ccp_fname]]
+    elif iso == 'MISO':
+        patterns = [[os.path.join(iso_path, 'LMP', year, month_dir)], [os.path.join(iso_path, 'MCP', year, month_dir)]]
+    elif iso == 'ISONE':
+        rcp = [os.path.join(iso_path, 'RCP', year, prefix)]
+        patterns = [[os.path.join(iso_path, 'LMP', node, year, prefix)], rcp, rcp]
+    elif iso == 'NYISO':
+        # The LBMP files are organized by zone or generator, which is looked up when reading them.
+        patterns = [[os.path.join(iso_path, 'LBMP', 'DAM', '*', year, month_dir)], [os.path.join(iso_path, 'ASP', 'DAM', year, month_dir)]]
+    elif iso == 'SPP':
+        # The LMP files are organized by bus or location, which is looked up when reading them.
+        mcp = [os.path.join(iso_path, 'MCP', 'DAM', year, month_dir)]
+        patterns = [[os.path.join(iso_path, 'LMP', 'DAM', '*', year, month_dir)], mcp, mcp]
+    elif iso == 'CAISO':
+        asp = [os.path.join(iso_path, 'ASP', year, prefix)]
+        mileage = [os.path.join(iso_path, 'MILEAGE', year, prefix)]
+        patterns = [[os.path.join(iso_path, 'LMP', node, year, prefix)]] + [asp]*4 + [mileage]*4
+    else:
+        raise ValueError('Invalid ISO provided: {0}'.format(iso))
+
+    return OrderedDict(zip((product for product, _ in PRODUCTS[iso]), patterns))
+
+
+def read_raw_month(iso_path, iso, year, month, node):
+    """Reads the given month of every product of the ISO for the node from the raw files and returns a tuple of ndarrays in the order of PRODUCTS[iso]."""
+    year = str(year)
+    month = str(month)
+
+    if iso == 'PJM':
+        return read_pjm_data(iso_path, year, month, node)
+    elif iso == 'ERCOT':
+        spp_fname, ccp_fname = ercot_files(iso_path, year)
+        regdn, regup = read_ercot_da_ccp(ccp_fname, month)
+
+        return read_ercot_da_spp(spp_fname, month, node), regdn, regup
+    elif iso == 'MISO':
+        return read_miso_data(iso_path, year, month, node)
+    elif iso == 'ISONE':
+        return read_isone_data(iso_path, year, month, node)
+    elif iso == 'NYISO':
+        lbmp_da, _, rcap_da, _, _ = read_nyiso_data(iso_path, year, month, node, typedat="both", RT_DAM="DAM")
+
+        return lbmp_da, rcap_da
+    elif iso == 'SPP':
+        return read_spp_data(iso_path, year, month, node, typedat="both")
+    elif iso == 'CAISO':
+        return read_caiso_data(iso_path, year, month, node)
+    else:
+        raise ValueError('Invalid ISO provided: {0}'.format(iso))
+
+
+def read_raw_month_nodes(iso_path, iso, year, month, nodes):
+    """Reads the given month of every product of the ISO for each of the nodes from the raw files and returns an OrderedDict of the nodes and their tuples of ndarrays in the order of PRODUCTS[iso]. MISO daily files are read once for all of the nodes."""
+    if iso == 'MISO':
+        lmp, mcp = read_miso_data_nodes(iso_path, str(year), str(month), nodes)
+
+        return OrderedDict((node, (lmp[node], mcp)) for node in nodes)
+
+    return OrderedDict((node, read_raw_month(iso_path, iso, year, month, node)) for node in nodes)
+
+
+class ColumnarDataBank():
+    """
+    The columnar store of ingested ISO market data. Each .npy file holds the hourly values of a month of one product, with the fingerprint of the month's raw files in a .json file of the same name.
+
+    :param root: The directory of the columnar store.
+    :param fast_hash: True if fingerprints should include a hash of the beginning and end of each raw file; must match between ingesting and reading.
+    """
+    def __init__(self, root, fast_hash=False):
+        self.root = root
+        self.fast_hash = fast_hash
+
+    def path(self, iso, product, year, month, node=None):
+        """Returns the path of the .npy file for the ISO, product, year, month, and node; node is None for system-wide products."""
+        fname = '{0:02d}.npy'.format(int(month))
+
+        if node is None:
+            return os.path.join(self.root, iso, product, str(year), fname)
+
+        return os.path.join(self.root, iso, product, str(node), str(year), fname)
+
+    def _product_paths(self, iso, year, month, node):
+        return [self.path(iso, product, year, month, node if nodal else None) for product, nodal in PRODUCTS[iso]]
+
+    def fingerprints(self, iso_path, iso, year, month, node):
+        """Returns the fingerprints of the raw files of each product for the given month, with paths relative to iso_path."""
+        fingerprints = []
+
+        for patterns in source_patterns(iso_path, iso, year, month, node).values():
+            fingerprint = fingerprint_files(patterns, fast_hash=self.fast_hash)
+            fingerprints.append(relative_fingerprint(fingerprint, iso_path))
+
+        return fingerprints
+
+    def read_month(self, iso, year, month, node, fingerprints):
+        """Returns the given month of every product of the ISO for the node as a tuple of ndarrays in the order of PRODUCTS[iso], or None if any of them has not been ingested from raw files with the given fingerprints."""
+        arrays = []
+
+        for path, fingerprint in zip(self._product_paths(iso, year, month, node), fingerprints):
+            try:
+                with open(_fingerprint_path(path), 'r') as f:
+                    if json.load(f) != fingerprint:
+                        return None
+
+                arrays.append(np.load(path, allow_pickle=False))
+            except (OSError, ValueError):
+                return None
+
+        return tuple(arrays)
+
+    def write_month(self, iso, year, month, node, arrays, fingerprints):
+        """Stores the given month of every product of the ISO for the node, given as a sequence of ndarrays in the order of PRODUCTS[iso] and the fingerprints of their raw files."""
+        for path, array, fingerprint in zip(self._product_paths(iso, year, month, node), arrays, fingerprints):
+            _write_month_file(path, np.asarray(array), fingerprint)
+
+    def ingest(self, iso_path, iso, year, node, months=range(1, 13)):
+        """Reads the given months of every product of the ISO for the node from the raw files under iso_path and stores them. Months already ingested from unchanged raw files are skipped. Returns the number of months ingested."""
+        return self.ingest_nodes(iso_path, iso, year, [node], months=months)
+
+    def ingest_nodes(self, iso_path, iso, year, nodes, months=range(1, 13)):
+        """Ingests the given months for each of the nodes as in ingest(), reading the raw files of each month once for all of the nodes that need it where the ISO's file layout allows. Returns the number of node-months ingested."""
+        n_ingested = 0
+
+        for month in months:
+            stale = OrderedDict()
+
+            for node in nodes:
+                fingerprints = self.fingerprints(iso_path, iso, year, month, node)
+
+                if not any(fingerprints):
+                    logging.info('ColumnarDataBank: No raw files for {iso} {year}-{month} for {node}, skipping.'.format(iso=iso, year=year, month=month, node=node))
+                    continue
+
+                if self.read_month(iso, year, month, node, fingerprints) is None:
+                    stale[node] = fingerprints
+
+            if not stale:
+                continue
+
+            for node, arrays in read_raw_month_nodes(iso_path, iso, year, month, list(stale)).items():
+                self.write_month(iso, year, month, node, arrays, stale[node])
+                n_ingested += 1
+
+                logging.info('ColumnarDataBank: Ingested {iso} {year}-{month} for {node}.'.format(iso=iso, year=year, month=month, node=node))
+
+        return n_ingested
+
+
+def relative_fingerprint(fingerprint, iso_path):
+    """Makes the paths in a fingerprint from fingerprint_files() relative to iso_path so that it does not depend on where the data bank is."""
+    return [[os.path.relpath(record[0], iso_path).replace(os.sep, '/')] + record[1:] for record in fingerprint]
+
+
+def _fingerprint_path(path):
+    """Returns the path of the fingerprint file for the .npy file at path."""
+    return os.path.splitext(path)[0] + '.json'
+
+
+def _write_month_file(path, array, fingerprint):
+    """Writes array to the .npy file at path and then the fingerprint of its raw files, so that a month is only read if both were written."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array, allow_pickle=False)
+
+    os.replace(tmp_path, path)
+
+    fingerprint_path = _fingerprint_path(path)
+    tmp_path = '{0}.{1}.tmp'.format(fingerprint_path, os.getpid())
+
+    with open(tmp_path, 'w') as f:
+        json.dump(fingerprint, f)
+
+    os.replace(tmp_path, fingerprint_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ingests raw ISO market data into the columnar store.')
+    parser.add_argument('home_path', help='the data bank directory, e.g., data')
+    parser.add_argument('iso', choices=list(PRODUCTS))
+    parser.add_argument('year')
+    parser.add_argument('--nodes', nargs='+', required=True, help='the nodes to ingest, as used for the ISO in the valuation wizard')
+    parser.add_argument('--months', nargs='+', type=int, default=list(range(1, 13)))
+    parser.add_argument('--fast-hash', action='store_true', help='include a hash of the raw files in their fingerprints')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    data_bank = ColumnarDataBank(os.path.join(args.home_path, COLUMNAR_DIR), fast_hash=args.fast_hash)
+
+    data_bank.ingest_nodes(os.path.join(args.home_path, args.iso), args.iso, args.year, args.nodes, months=args.months)
@@ -0,0 +1,215 @@
+from __future__ import division, absolute_import
+from collections import OrderedDict
+import logging
+
+import numpy as np
+from pyomo.environ import value
+
+from es_gui.tools.valuation.matrix_constraints import _as_array
+
+
+class ArbitrageDynamicProgram:
+    """
+    Solves the arbitrage only valuation formulation (constraints.ExpressionsBlock with market_type 'arbitrage') by backward dynamic programming over a discretized state of charge, without an LP solver.
+
+    The state of charge grid is uniform, anchored at the initial state of charge, and includes the state of charge limits. Its step is at most a power_divisions-th of the power rating and an (n_levels - 1)-th of the state of charge range. It divides the power rating and, where possible, the energy stored by charging at the power rating, so that charging and discharging at the power rating are represented exactly. Only the transitions between levels within one period of charging or discharging of each other are computed, and for each the cheapest feasible charge/discharge pair is used, including simultaneous charging and discharging to dissipate energy when prices are negative.
+
+    Tolerance: the schedule found is always feasible for the LP formulation, so its revenue is a lower bound on the LP optimum; the gap is due to discretization. Measured against the LP optimum for a month of hourly prices, with the default grid and energy capacities of 1 to 33 hours at the power rating: with a Self_discharge_efficiency of 1 the gap was at most 0.2%, and none when the Round_trip_efficiency times the number of grid steps per power rating is an integer (e.g., 0.85 or 0.9). With self-discharge, the energy held decays off the grid every period and the gap grows with the energy capacity: with a Self_discharge_efficiency of 0.99 or 0.995 it was up to 0.7% for one hour of storage, 2.3% for four hours, and 5.4% for 33 hours. ValuationOptimizer therefore only uses it without self-discharge and solves the LP otherwise.
+
+    :param price_electricity: Array-like of electricity prices [$/MWh].
+    :param power_rating: The power rating [MW].
+    :param energy_capacity: The energy capacity [MWh].
+    :param soc_min: The minimum state of charge, as a fraction of energy_capacity.
+    :param soc_max: The maximum state of charge, as a fraction of energy_capacity.
+    :param soc_init: The initial and final state of charge, as a fraction of energy_capacity.
+    :param round_trip_efficiency: Fraction of input energy that gets stored.
+    :param self_discharge_efficiency: Fraction of energy maintained over one time period.
+    :param R: The discount/interest rate [hour^(-1)].
+    :param n_levels: The minimum number of state of charge levels in the grid, approximately.
+    :param power_divisions: The minimum number of grid steps per power rating, approximately.
+    """
+    def __init__(self, price_electricity, power_rating, energy_capacity, soc_min, soc_max, soc_init,
+                 round_trip_efficiency, self_discharge_efficiency=1.0, R=0.0, n_levels=101, power_divisions=20):
+        self.price_electricity = np.asarray(price_electricity, dtype=float).ravel()
+        self.power_rating = power_rating
+        self.energy_capacity = energy_capacity
+        self.soc_min = soc_min
+        self.soc_max = soc_max
+        self.soc_init = soc_init
+        self.round_trip_efficiency = round_trip_efficiency
+        self.self_discharge_efficiency = self_discharge_efficiency
+        self.R = R
+        self.n_levels = n_levels
+        self.power_divisions = power_divisions
+
+        self.columns = OrderedDict((name, None) for name in ['s', 'q_r', 'q_d'])
+        self.solution = OrderedDict()
+        self.objective_value = None
+        self.status = None
+        self.message = ''
+
+    @classmethod
+    def from_model(cls, model, n_levels=101):
+        """Creates the ArbitrageDynamicProgram for model; model provides the time series data and parameters as attributes, as for MatrixExpressionsBlock."""
+        m = model
+        T = len(m.time)
+
+        return cls(_as_array(m.price_electricity, T),
+                   power_rating=value(m.Power_rating),
+                   energy_capacity=value(m.Energy_capacity),
+                   soc_min=value(m.State_of_charge_min),
+                   soc_max=value(m.State_of_charge_max),
+                   soc_init=value(m.State_of_charge_init),
+                   round_trip_efficiency=value(m.Round_trip_efficiency),
+                   self_discharge_efficiency=value(m.Self_discharge_efficiency),
+                   R=value(m.R),
+                   n_levels=n_levels)
+
+    @property
+    def optimal(self):
+        """True if the most recent solve found a feasible schedule."""
+        return self.status == 0
+
+    def soc_levels(self):
+        """Returns the grid of state of charge levels [MWh] as an ndarray and the index of the initial state of charge in it."""
+        lo = max(self.soc_min*self.energy_capacity, 0)
+        hi = self.soc_max*self.energy_capacity
+        init = self.soc_init*self.energy_capacity
+
+        if not lo <= init <= hi:
+            return np.zeros(0), None
+
+        step = (hi - lo)/max(self.n_levels - 1, 1)
+
+        if step <= 0:
+            return np.array([init]), 0
+
+        if self.power_rating > 0:
+            step = min(step, self.power_rating/max(self.power_divisions, 1))
+
+        if self.power_rating > step:
+            # Make the step divide the power rating and, where possible, the energy stored by charging at the power rating.
+            step = self.power_rating/self._power_rating_divisions(int(np.round(self.power_rating/step)))
+
+        n_down = int(np.floor((init - lo)/step + 1e-9))
+        n_up = int(np.floor((hi - init)/step + 1e-9))
+
+        levels = init + step*np.arange(-n_down, n_up + 1)
+        ix_init = n_down
+
+        if levels[0] - lo > 1e-9*step:
+            levels = np.concatenate([[lo], levels])
+            ix_init += 1
+
+        if hi - levels[-1] > 1e-9*step:
+            levels = np.concatenate([levels, [hi]])
+
+        return levels, ix_init
+
+    def _power_rating_divisions(self, n_min):
+        """Returns the number of grid steps per power rating: the smallest number from n_min to 2*n_min for which the round trip efficiency times it is an integer, or the closest to one."""
+        n = np.arange(n_min, 2*n_min + 1)
+        remainder = np.abs(self.round_trip_efficiency*n - np.round(self.round_trip_efficiency*n))
+
+        return int(n[np.argmax(remainder < 1e-6)] if (remainder < 1e-6).any() else n[np.argmin(remainder)])
+
+    def solve(self, warm_start=False):
+        """Solves for the schedule maximizing net revenue and stores it in the solution attribute. warm_start is accepted for interface compatibility with LinearProgram and has no effect."""
+        prices = self.price_electricity*np.exp(-np.arange(len(self.price_electricity))*self.R)
+        T = len(prices)
+        P = self.power_rating
+        rte = self.round_trip_efficiency
+        sde = self.self_discharge_efficiency
+
+        levels, ix_init = self.soc_levels()
+
+        if ix_init is None:
+            self.status = 2
+            self.message = 'The initial state of charge is outside of the state of charge limits.'
+            logging.debug('ArbitrageDynamicProgram: {0}'.format(self.message))
+            return self.optimal
+
+        # Only the levels within one period of charging or discharging at the power rating can be reached from each level, so the transitions are computed for that band: targets[i, k] is the k-th level reachable from level i.
+        L = len(levels)
+        tol = 1e-9*max(P, 1.0)
+        first = np.searchsorted(levels, sde*levels - P - tol, side='left')
+        last = np.searchsorted(levels, sde*levels + rte*P + tol, side='right') - 1
+        width = max(int((last - first).max()) + 1, 1)
+
+        targets = first[:, None] + np.arange(width)
+        feasible = targets <= last[:, None]
+        targets = np.minimum(targets, L - 1)
+
+        # Net change in state of charge for each transition from level i to level targets[i, k].
+        delta = levels[targets] - sde*levels[:, None]
+        feasible &= (delta >= -P - tol) & (delta <= rte*P + tol)
+
+        q_r_pos, q_d_pos, q_r_neg, q_d_neg = self._transition_energy(delta, feasible)
+
+        # Net energy bought for each transition (q_r - q_d) when prices are positive or negative, respectively. Infeasible transitions are set to +inf and -inf so that their revenue, -price*net, is -inf.
+        net_pos = np.where(feasible, q_r_pos - q_d_pos, np.inf)
+        net_neg = np.where(feasible, q_r_neg - q_d_neg, -np.inf)
+        penalty = np.where(feasible, 0.0, -np.inf)
+
+        value_next = np.full(L, -np.inf)
+        value_next[ix_init] = 0.0
+        policy = np.empty((T, L), dtype=np.int16 if width < 2**15 else np.int32)
+        rows = np.arange(L)
+
+        for t in range(T - 1, -1, -1):
+            if prices[t] > 0:
+                candidates = value_next[targets] - prices[t]*net_pos
+            elif prices[t] < 0:
+                candidates = value_next[targets] - prices[t]*net_neg
+            else:
+                candidates = value_next[targets] + penalty
+
+            policy[t] = np.argmax(candidates, axis=1)
+            value_next = candidates[rows, policy[t]]
+
+        if not np.isfinite(value_next[ix_init]):
+            self.status = 2
+            self.message = 'No feasible schedule returns to the initial state of charge.'
+            logging.debug('ArbitrageDynamicProgram: {0}'.format(self.message))
+            return self.optimal
+
+        # Recover the schedule going forward from the initial state of charge.
+        path = np.empty(T + 1, dtype=int)
+        choice = np.empty(T, dtype=int)
+        path[0] = ix_init
+
+        for t in range(T):
+            choice[t] = policy[t, path[t]]
+            path[t + 1] = targets[path[t], choice[t]]
+
+        negative = prices < 0
+        i, k = path[:-1], choice
+
+        self.solution['s'] = levels[path]
+        self.solution['q_r'] = np.where(negative, q_r_neg[i, k], q_r_pos[i, k])
+        self.solution['q_d'] = np.where(negative, q_d_neg[i, k], q_d_pos[i, k])
+
+        self.objective_value = float(value_next[ix_init])
+        self.status = 0
+        self.message = 'Optimal schedule found for the discretized state of charge.'
+
+        return self.optimal
+
+    def _transition_energy(self, delta, feasible):
+        """Returns the energy charged and discharged to achieve each change in state of charge when prices are nonnegative (minimizing losses) and negative (maximizing energy bought)."""
+        P = self.power_rating
+        rte = self.round_trip_efficiency
+        delta = np.where(feasible, delta, 0.0)
+
+        q_r_pos = np.maximum(delta, 0)/rte if rte > 0 else np.zeros_like(delta)
+        q_d_pos = np.maximum(-delta, 0)
+
+        # Charge as much as possible while rte*q_r - q_d == delta and q_r + q_d <= Power_rating.
+        q_r_neg = np.maximum((P + delta)/(1 + rte), 0)
+        q_d_neg = np.maximum(rte*q_r_neg - delta, 0)
+
+        return q_r_pos, q_d_pos, q_r_neg, q_d_neg
+
+    def get_values(self, name):
+        """Returns the solution values of the variable with the given name as an ndarray."""
+        return self.solution[name]
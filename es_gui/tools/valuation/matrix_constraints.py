@@ -0,0 +1,193 @@
+from __future__ import division, absolute_import
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+from pyomo.environ import value
+
+from es_gui.tools.linear_program import LinearProgram
+
+
+ONE_PRODUCT_MARKETS = {'pjm_pfp', 'miso_pfp', 'isone_pfp', 'nyiso_pfp'}
+TWO_PRODUCT_MARKETS = {'ercot_arbreg', 'spp_pfp', 'caiso_pfp'}
+
+
+class MatrixExpressionsBlock:
+    """Assembles the objective and constraints of a valuation formulation directly in sparse matrix form. Mirrors the formulations in constraints.ExpressionsBlock."""
+
+    def __init__(self, market_type):
+        self._market_type = market_type
+
+    @property
+    def market_type(self):
+        """The market formulation to create the linear program for."""
+        return self._market_type
+
+    @market_type.setter
+    def market_type(self, value):
+        self._market_type = value
+
+    def build(self, model):
+        """Generates the LinearProgram for model; model provides the time series data and parameters as attributes."""
+        if self.market_type == 'arbitrage':
+            products = []
+        elif self.market_type in ONE_PRODUCT_MARKETS:
+            products = ['q_reg']
+        elif self.market_type in TWO_PRODUCT_MARKETS:
+            products = ['q_ru', 'q_rd']
+        else:
+            raise ValueError('Invalid market type specified!')
+
+        m = model
+        T = len(m.time)
+
+        # Decision vector layout: [s (T+1), q_r (T), q_d (T), regulation products (T each)].
+        columns = OrderedDict()
+        columns['s'] = slice(0, T+1)
+        offset = T+1
+
+        for name in ['q_r', 'q_d'] + products:
+            columns[name] = slice(offset, offset+T)
+            offset += T
+
+        n = offset
+        col = {name: np.arange(ix.start, ix.stop) for name, ix in columns.items()}
+
+        price_electricity = _as_array(m.price_electricity, T)
+        discount = np.exp(-np.arange(T)*value(m.R))
+
+        # Objective function.
+        c = np.zeros(n)
+        c[columns['q_r']] = -price_electricity*discount
+        c[columns['q_d']] = price_electricity*discount
+        constant = 0.0
+
+        reg_objective = getattr(self, '_objective_{0}'.format(self.market_type), None)
+
+        if reg_objective is not None:
+            constant = reg_objective(m, T, c, columns, price_electricity, discount)
+
+        # State of charge definition: sd*s[t] + rte*q_r[t] - q_d[t] + (regulation terms) - s[t+1] == 0.
+        sd = value(m.Self_discharge_efficiency)
+        rte = value(m.Round_trip_efficiency)
+        rows = np.arange(T)
+
+        eq_blocks = [(rows, col['s'][:-1], np.full(T, sd)),
+                     (rows, col['s'][1:], np.full(T, -1.0)),
+                     (rows, col['q_r'], np.full(T, rte)),
+                     (rows, col['q_d'], np.full(T, -1.0)),
+                     ]
+
+        if products:
+            fraction_reg_up = _as_array(m.fraction_reg_up, T)
+            fraction_reg_down = _as_array(m.fraction_reg_down, T)
+
+        if products == ['q_reg']:
+            eq_blocks.append((rows, col['q_reg'], rte*fraction_reg_down - fraction_reg_up))
+        elif products:
+            eq_blocks.append((rows, col['q_rd'], rte*fraction_reg_down))
+            eq_blocks.append((rows, col['q_ru'], -fraction_reg_up))
+
+        # Initial and final state of charge.
+        soc_init = value(m.State_of_charge_init)*value(m.Energy_capacity)
+        eq_blocks.append((np.array([T, T+1]), np.array([0, T]), np.ones(2)))
+
+        A_eq = _assemble(eq_blocks, T+2, n)
+        b_eq = np.concatenate([np.zeros(T), [soc_init, soc_init]])
+
+        # Power rating: q_r[t] + q_d[t] + (regulation products) <= Power_rating.
+        ub_blocks = [(rows, col[name], np.ones(T)) for name in ['q_r', 'q_d'] + products]
+        b_ub = [np.full(T, value(m.Power_rating))]
+        n_ub = T
+
+        # Variable bounds.
+        lb = np.zeros(n)
+        ub = np.full(n, np.inf)
+
+        soc_min = value(m.State_of_charge_min)*value(m.Energy_capacity)
+        soc_max = value(m.State_of_charge_max)*value(m.Energy_capacity)
+
+        if not products:
+            # State of charge limits apply over the entire soc_time horizon.
+            lb[columns['s']] = max(soc_min, 0)
+            ub[columns['s']] = soc_max
+        else:
+            # State of charge limits with reserves for the regulation bid(s), applied to s[t+1].
+            reserve_min_var, reserve_max_var = ('q_reg', 'q_reg') if products == ['q_reg'] else ('q_ru', 'q_rd')
+
+            ub_blocks.append((n_ub + rows, col['s'][1:], np.full(T, -1.0)))
+            ub_blocks.append((n_ub + rows, col[reserve_min_var], np.full(T, value(m.Reserve_reg_min))))
+            b_ub.append(np.full(T, -soc_min))
+            n_ub += T
+
+            ub_blocks.append((n_ub + rows, col['s'][1:], np.ones(T)))
+            ub_blocks.append((n_ub + rows, col[reserve_max_var], np.full(T, rte*value(m.Reserve_reg_max))))
+            b_ub.append(np.full(T, soc_max))
+            n_ub += T
+
+        A_ub = _assemble(ub_blocks, n_ub, n)
+
+        return LinearProgram(c, A_ub=A_ub, b_ub=np.concatenate(b_ub), A_eq=A_eq, b_eq=b_eq, lb=lb, ub=ub,
+                             sense='maximize', constant=constant, columns=columns)
+
+    @staticmethod
+    def _objective_pjm_pfp(m, T, c, columns, price_electricity, discount):
+        c[columns['q_reg']] = _as_array(m.perf_score, T)*(_as_array(m.mi_mult, T)*_as_array(m.price_reg_service, T)
+                                                           + _as_array(m.price_regulation, T))*discount
+        return 0.0
+
+    @staticmethod
+    def _objective_miso_pfp(m, T, c, columns, price_electricity, discount):
+        c[columns['q_reg']] = (1 + value(m.Make_whole))*_as_array(m.perf_score, T)*_as_array(m.price_regulation, T)*discount
+        return 0.0
+
+    @staticmethod
+    def _objective_isone_pfp(m, T, c, columns, price_electricity, discount):
+        c[columns['q_reg']] = _as_array(m.price_regulation, T)*discount
+        return 0.0
+
+    @staticmethod
+    def _objective_nyiso_pfp(m, T, c, columns, price_electricity, discount):
+        c[columns['q_reg']] = (price_electricity*_as_array(m.fraction_reg_up, T)
+                               - price_electricity*_as_array(m.fraction_reg_down, T)
+                               + _as_array(m.price_regulation, T)*(1 - 1.1*(1 - _as_array(m.perf_score, T))))*discount
+        return 0.0
+
+    @staticmethod
+    def _objective_ercot_arbreg(m, T, c, columns, price_electricity, discount):
+        c[columns['q_ru']] = (_as_array(m.price_reg_up, T) + price_electricity*_as_array(m.fraction_reg_up, T))*discount
+        c[columns['q_rd']] = (_as_array(m.price_reg_down, T) - price_electricity*_as_array(m.fraction_reg_down, T))*discount
+        return 0.0
+
+    _objective_spp_pfp = _objective_ercot_arbreg
+
+    @staticmethod
+    def _objective_caiso_pfp(m, T, c, columns, price_electricity, discount):
+        MatrixExpressionsBlock._objective_ercot_arbreg(m, T, c, columns, price_electricity, discount)
+
+        # Mileage payments do not depend on the decision variables.
+        mileage = (_as_array(m.perf_score_ru, T)*_as_array(m.mi_mult_ru, T)*_as_array(m.price_reg_serv_up, T)
+                   + _as_array(m.perf_score_rd, T)*_as_array(m.mi_mult_rd, T)*_as_array(m.price_reg_serv_down, T))
+        return float(np.sum(mileage*discount))
+
+
+def _as_array(data, T):
+    """Converts an array-like of model data to a float ndarray of its first T values; raises IndexError if it is too short."""
+    arr = np.asarray(data, dtype=float).ravel()
+
+    if len(arr) < T:
+        raise IndexError('Array-like of length {0} is shorter than the time horizon of length {1}.'.format(len(arr), T))
+
+    return arr[:T]
+
+
+def _assemble(blocks, n_rows, n_cols):
+    """Assembles a CSR matrix from a list of (row indices, column indices, values) blocks."""
+    if not blocks:
+        return sp.csr_matrix((n_rows, n_cols))
+
+    rows = np.concatenate([b[0] for b in blocks])
+    cols = np.concatenate([b[1] for b in blocks])
+    vals = np.concatenate([b[2] for b in blocks])
+
+    return sp.csr_matrix((vals, (rows, cols)), shape=(n_rows, n_cols))
@@ -5,6 +5,10 @@ import numpy as np
 import os
 import calendar
 import logging
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from xlrd.biffh import XLRDError
 
@@ -13,6 +17,8 @@ def read_ercot_da_spp(fname, month, settlement_point):
     """
     Reads the day-ahead market historical settlement point prices file at fname and returns the NumPy ndarray corresponding to the hourly price at settlement_point.
 
+    The workbook is parsed once into a cache of every month and settlement point, see read_ercot_spp_cache(), so later reads do not open the workbook.
+
     :param fname: string giving location of DAM SPPs file
     :type fname: str
     :param month: which month to read data for; (int) [1, 12] OR (str) ['1', '12']
@@ -24,35 +30,128 @@ def read_ercot_da_spp(fname, month, settlement_point):
     """
     spp_da = np.array([])
 
-    # if month is provided as an int, map it to the correct calendar month
-    if isinstance(month, int):
-        month_abbr = calendar.month_abbr(month)
-    elif isinstance(month, str):
-        month_ix = int(month)        
-        month_abbr = calendar.month_abbr[month_ix]
-
-    # Retrieve the correct worksheet for the month.
-    wkbk = pd.ExcelFile(fname)
-    wkbk_sheetnames = [name[:3] for name in wkbk.sheet_names]
+    # Retrieve the cached worksheet for the month.
+    spp_months = read_ercot_spp_cache(fname)
 
     try:
-        wkst_ix = wkbk_sheetnames.index(month_abbr)
-    except ValueError:
+        settlement_points = spp_months[int(month)]
+    except KeyError:
         # The worksheet for the requested month does not exist.
         logging.warning('read_ercot_da_spp: Could not load data (the specified month of data could not be found in the given file), returning empty array. (got {fname}, {month}, {settlement_point})'.format(fname=fname, month=month, settlement_point=settlement_point))
         return spp_da
     else:
-        df = wkbk.parse(wkst_ix)
+        spp_da = settlement_points.get(settlement_point, spp_da).copy()
+
+    return spp_da
 
-        # filter DataFrame by settlement_point and extract series
-        df0 = df.loc[df['Settlement Point'] == settlement_point]
-        df1 = df0['Settlement Point Price']
 
-        # convert to NumPy array and remove NaN
-        spp_da = df1.astype('float').values
-        spp_da = spp_da[~np.isnan(spp_da)]
+# Cache of the parsed ERCOT SPP workbooks in this session, keyed by workbook path.
+_ercot_spp_cache = {}
+_ercot_spp_cache_lock = threading.Lock()
 
-    return spp_da
+
+def ercot_spp_cache_path(fname):
+    """Returns the path of the cache of the ERCOT DAM SPP workbook at fname, a hidden file next to it."""
+    fpath, wkbk_name = os.path.split(fname)
+
+    return os.path.join(fpath, '.{0}.npz'.format(wkbk_name))
+
+
+def read_ercot_spp_cache(fname):
+    """
+    Returns the settlement point prices in the ERCOT DAM SPP workbook at fname as a dictionary of months, [1, 12], of dictionaries of settlement points and their NumPy ndarrays of hourly prices, with NaNs removed.
+
+    The workbook is parsed once, every worksheet at a time, and stored in an indexed binary cache file next to it; the cache is rebuilt when the size or modification time of the workbook changes. Parsing the workbook is by far the slowest part of reading ERCOT data.
+
+    :param fname: string giving location of DAM SPPs file
+    :type fname: str
+    :return: dictionary of months of dictionaries of settlement point prices
+    :rtype: dict
+    """
+    stat = os.stat(fname)
+    fingerprint = [stat.st_size, stat.st_mtime_ns]
+
+    with _ercot_spp_cache_lock:
+        cached = _ercot_spp_cache.get(fname)
+
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        cache_fname = ercot_spp_cache_path(fname)
+        spp_months = _read_ercot_spp_cache_file(cache_fname, fingerprint)
+
+        if spp_months is None:
+            logging.info('read_ercot_da_spp: Building the settlement point price cache of {fname}.'.format(fname=fname))
+            spp_months = _parse_ercot_spp_workbook(fname)
+            _write_ercot_spp_cache_file(cache_fname, fingerprint, spp_months)
+
+        _ercot_spp_cache[fname] = (fingerprint, spp_months)
+
+    return spp_months
+
+
+def _parse_ercot_spp_workbook(fname):
+    """Parses every monthly worksheet of the ERCOT DAM SPP workbook at fname into a dictionary of months of dictionaries of settlement point prices."""
+    month_abbrs = list(calendar.month_abbr)
+    spp_months = {}
+
+    with pd.ExcelFile(fname) as wkbk:
+        for wkst_ix, sheet_name in enumerate(wkbk.sheet_names):
+            try:
+                month = month_abbrs.index(sheet_name[:3])
+            except ValueError:
+                continue
+
+            df = wkbk.parse(wkst_ix)
+            spp_months[month] = {}
+
+            # group by settlement point, keeping the order of the rows
+            for settlement_point, df1 in df.groupby('Settlement Point', sort=False)['Settlement Point Price']:
+                spp_da = df1.astype('float').values
+                spp_months[month][settlement_point] = spp_da[~np.isnan(spp_da)]
+
+    return spp_months
+
+
+def _read_ercot_spp_cache_file(cache_fname, fingerprint):
+    """Reads the ERCOT SPP cache file at cache_fname, returning None if it does not exist, cannot be read, or was built from a workbook with a different fingerprint."""
+    try:
+        with np.load(cache_fname, allow_pickle=False) as cache:
+            if json.loads(str(cache['fingerprint'])) != fingerprint:
+                return None
+
+            spp_months = {}
+
+            for month in cache['months']:
+                points = cache['points_{0}'.format(month)]
+                offsets = cache['offsets_{0}'.format(month)]
+                values = cache['values_{0}'.format(month)]
+
+                spp_months[int(month)] = {str(point): values[offsets[ix]:offsets[ix+1]] for ix, point in enumerate(points)}
+    except (OSError, KeyError, ValueError):
+        return None
+
+    return spp_months
+
+
+def _write_ercot_spp_cache_file(cache_fname, fingerprint, spp_months):
+    """Writes the ERCOT SPP cache file at cache_fname: for each month, the settlement point names, the offsets of their prices, and the prices, concatenated."""
+    arrays = {'fingerprint': np.array(json.dumps(fingerprint)), 'months': np.array(sorted(spp_months), dtype=int)}
+
+    for month, settlement_points in spp_months.items():
+        arrays['points_{0}'.format(month)] = np.array(list(settlement_points), dtype=str)
+        arrays['offsets_{0}'.format(month)] = np.cumsum([0] + [len(spp_da) for spp_da in settlement_points.values()])
+        arrays['values_{0}'.format(month)] = np.concatenate([np.zeros(0)] + list(settlement_points.values()))
+
+    tmp_fname = '{0}.{1}.tmp'.format(cache_fname, os.getpid())
+
+    try:
+        with open(tmp_fname, 'wb') as f:
+            np.savez(f, **arrays)
+
+        os.replace(tmp_fname, cache_fname)
+    except OSError as e:
+        logging.warning('read_ercot_da_spp: Could not write the settlement point price cache {fname}. ({error})'.format(fname=cache_fname, error=e))
 
 
 def read_ercot_da_ccp(fname, month):
@@ -470,10 +569,37 @@ def read_miso_data(fpath, year, month, nodeid):
     :return: arrays of data specified
     :rtype: NumPy ndarrays
     """
-    LMP = np.array([])
-    RegMCP = np.array([])
+    LMP, RegMCP = read_miso_data_nodes(fpath, year, month, [nodeid])
+
+    return LMP[nodeid], RegMCP
+
 
+def read_miso_data_nodes(fpath, year, month, nodeids=None):
+    """Reads the daily MISO data files, parsing each file once, and returns the NumPy ndarrays for the LMP of each of the given nodes and for MCP.
+
+    Each daily LMP file contains every node, so reading many nodes at once takes about as long as reading one. The LMP of a node that is missing from any of the daily files is an empty array.
+
+    :param fpath: root of the MISO data folder
+    :type fpath: str
+    :param year: year of data
+    :type year: int or str
+    :param month: month of data
+    :type month: int or str
+    :param nodeids: pricing node IDs; all nodes in the first daily LMP file if None
+    :type nodeids: list of str or None
+    :return: LMP, RegMCP: dictionary of LMP arrays keyed by node ID and array of MCP
+    :rtype: OrderedDict, NumPy ndarray
+    """
     _, n_days_month = calendar.monthrange(int(year), int(month))
+    n_hours = 24*n_days_month
+
+    nodes = None if nodeids is None else list(nodeids)
+    LMP = None  # Preallocated (node, hour) buffer, created once the nodes are known.
+    present = None  # Whether each node has been found in every daily LMP file read.
+    n_days_lmp = 0
+
+    RegMCP = np.empty(n_hours)
+    n_mcp = 0
 
     for day in range(1, n_days_month+1):
         # Read daily files.
@@ -493,34 +619,30 @@ def read_miso_data(fpath, year, month, nodeid):
             logging.warning('read_miso_data: LMP file missing, returning empty array.')
             break
 
-        # Filter rows by node_name.
+        # Find LMP values of every node, keeping the first row of each.
         col1 = df.axes[1][0]
         col3 = df.axes[1][2]
-        pnode_ix1 = df.index[df[col1] == nodeid]
-        df1 = df.iloc[pnode_ix1, :]
-        
-        # Find LMP values.
-        pnode_ix2 = df1.index[df1[col3] == "LMP"]
-        df2 = df.iloc[pnode_ix2, :]
-        
-        # Filter Total LMP columns.
-        df3 = df2[df2.axes[1][3:27]]
+        df1 = df.loc[df[col3] == "LMP"].drop_duplicates(subset=col1).set_index(col1)
 
-        if len(df3) == 0:
-            LMP = np.array([])
-            logging.warning('read_miso_data: A daily LMP file is missing required data, returning empty array.')
-            break
+        if nodes is None:
+            nodes = list(df1.index)
 
-        # Convert to NumPy ndarray, ravel, and remove NaNs.
-        LMP_day = np.ravel(df3.astype('float').values)
-        LMP_day = LMP_day[~np.isnan(LMP_day)] 
-        LMP = np.append(LMP, LMP_day)
+        if LMP is None:
+            LMP = np.full((len(nodes), n_hours), np.nan)
+            present = np.ones(len(nodes), dtype=bool)
+
+        # Filter Total LMP columns of the requested nodes; nodes missing from the file get rows of NaN.
+        df2 = df1[df1.axes[1][2:26]].reindex(nodes)
+        present &= np.asarray(df2.index.isin(df1.index))
+
+        LMP[:, 24*(day-1):24*day] = df2.astype('float').values
+        n_days_lmp += 1
 
         # MCP file.
         try:
             df = pd.read_csv(mcp_fname, skiprows=4, nrows=7, low_memory=False)
         except FileNotFoundError:
-            RegMCP = np.array([])
+            n_mcp = 0
             logging.warning('read_miso_data: MCP file missing, returning empty array.')
             break
         
@@ -532,10 +654,27 @@ def read_miso_data(fpath, year, month, nodeid):
     
         # convert to NumPy ndarray, ravel, and remove NaNs
         RegMCP_day = np.ravel(df2.astype('float').values)
-        RegMCP_day = RegMCP_day[~np.isnan(RegMCP_day)] 
-        RegMCP = np.append(RegMCP, RegMCP_day)
-    
-    return LMP, RegMCP
+        RegMCP_day = RegMCP_day[~np.isnan(RegMCP_day)]
+
+        if n_mcp + len(RegMCP_day) > len(RegMCP):
+            RegMCP = np.resize(RegMCP, 2*(n_mcp + len(RegMCP_day)))
+
+        RegMCP[n_mcp:n_mcp + len(RegMCP_day)] = RegMCP_day
+        n_mcp += len(RegMCP_day)
+
+    LMP_nodes = OrderedDict()
+
+    for ix, node in enumerate(nodes or []):
+        if LMP is None or not present[ix]:
+            LMP_nodes[node] = np.array([])
+            logging.warning('read_miso_data: A daily LMP file is missing required data for {node}, returning empty array.'.format(node=node))
+            continue
+
+        # Remove NaNs.
+        LMP_node = LMP[ix, :24*n_days_lmp]
+        LMP_nodes[node] = LMP_node[~np.isnan(LMP_node)]
+
+    return LMP_nodes, RegMCP[:n_mcp].copy()
 
 
 
@@ -544,6 +683,60 @@ def read_miso_data(fpath, year, month, nodeid):
 # NYISO
 #######################################################################################################################
 
+# The number of daily files read concurrently by the month readers.
+DAILY_READ_WORKERS = min(8, os.cpu_count() or 1)
+
+# Columns of the NYISO and SPP daily files used by the month readers.
+_NYISO_ASP_COLUMNS = frozenset(['PTID', 'NYCA Regulation Capacity ($/MWHr)', 'NYCA Regulation Movement ($/MW)', ' NYCA Regulation Movement ($/MW)', 'East Regulation ($/MWHr)', 'Regulation ($/MWHr)'])
+_NYISO_LBMP_COLUMNS = ['PTID', 'LBMP ($/MWHr)']
+_NYISO_LBMP_DTYPES = {'LBMP ($/MWHr)': 'float64'}
+_SPP_LMP_COLUMNS = ['Pnode', 'LMP']
+_SPP_LMP_DTYPES = {'Pnode': 'str', 'LMP': 'float64'}
+_SPP_MCP_COLUMNS = ['Reserve Zone', 'RegUP', 'RegDN']
+_SPP_MCP_DTYPES = {'RegUP': 'float64', 'RegDN': 'float64'}
+
+# Node lookup tables read in this session, keyed by path.
+_node_tables = {}
+_node_tables_lock = threading.Lock()
+
+
+def read_daily_csvs(fnames, n_workers=None, **kwargs):
+    """
+    Reads the daily CSV files in fnames concurrently with pandas.read_csv() and returns the list of DataFrames in the same order, with None for each file that does not exist.
+
+    :param fnames: paths of the files to read
+    :type fnames: list of str
+    :param n_workers: number of files to read at a time; DAILY_READ_WORKERS if None
+    :type n_workers: int
+    :param kwargs: keyword arguments for pandas.read_csv()
+    :return: list of DataFrames or None
+    :rtype: list
+    """
+    def _read(fname):
+        try:
+            return pd.read_csv(fname, **kwargs)
+        except FileNotFoundError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=n_workers or DAILY_READ_WORKERS) as executor:
+        return list(executor.map(_read, fnames))
+
+
+def read_node_table(fname, **kwargs):
+    """Reads the node lookup table at fname, e.g., nodes_nyiso.csv, with pandas.read_csv() and keyword arguments kwargs. The table is cached until the file is modified; the returned DataFrame must not be modified."""
+    fname = os.path.normpath(fname)
+    mtime = os.stat(fname).st_mtime_ns
+
+    with _node_tables_lock:
+        cached = _node_tables.get(fname)
+
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, pd.read_csv(fname, index_col=False, **kwargs))
+            _node_tables[fname] = cached
+
+    return cached[1]
+
+
 def read_nyiso_data(fpath, year, month, nodeid, typedat="both", RT_DAM="both"):
     """"
     Reads the historical LBMP, regulation capacity, and regulation movement prices for the year 'year',
@@ -583,34 +776,34 @@ def read_nyiso_data(fpath, year, month, nodeid, typedat="both", RT_DAM="both"):
     # path_nodes_file = 'C:/Users/fwilche/Documents/data_bank/NYISO/'
     path_nodes_file = '../../es_gui/apps/data_manager/_static/'
     pathf_nodeszones = os.path.join(fpath, path_nodes_file, 'nodes_nyiso.csv')
-    df_nodeszones = pd.read_csv(pathf_nodeszones, index_col=False)
+    df_nodeszones = read_node_table(pathf_nodeszones)
     df_nodeszones_x = df_nodeszones.loc[df_nodeszones['Node ID'] == nodeid, :]
 
     if df_nodeszones_x.empty:
-        print("The node does NOT exists in NYISO")
+        logging.warning('read_nyiso_data: The node does not exist in NYISO, returning empty arrays. (got {nodeid})'.format(nodeid=nodeid))
         # raise ValueError('Not a valid bus number!!!')
         return daLBMP, rtLBMP, daCAP, rtCAP, rtMOV
     else:
         if df_nodeszones_x.iloc[0,0] == df_nodeszones_x.iloc[0,2]:
-            print("It's a zone node")
             zoneid = nodeid
             zone_gen = "zone"
         else:
-            print("It's a gen node")
             zoneid = df_nodeszones_x.iloc[0,2]
             zone_gen = "gen"
-    print("Identified zone:")
-    print(zoneid)
+    logging.debug('read_nyiso_data: {nodeid} is a {zone_gen} node in zone {zoneid}.'.format(nodeid=nodeid, zone_gen=zone_gen, zoneid=zoneid))
     ############################################################################################
 
     ndaysmonth = calendar.monthrange(year, month)
     ndaysmonth = int(ndaysmonth[1])
 
+    fnames_LBMP_DA = []
+    fnames_ASP_DA = []
+    fnames_LBMP_RT = []
+    fnames_ASP_RT = []
 
     for ix in range(ndaysmonth):
         day_x = ix+1
         date_str = str(year)+ str(month).zfill(2)+str(day_x).zfill(2)
-        # print(date_str)
 
         fnameLBMP_DA = date_str + "damlbmp_" + zone_gen + ".csv"
         fnameASP_DA = date_str + "damasp.csv"
@@ -618,19 +811,35 @@ def read_nyiso_data(fpath, year, month, nodeid, typedat="both", RT_DAM="both"):
         fnameLBMP_RT = date_str + "realtime_" + zone_gen + ".csv"
         fnameASP_RT = date_str + "rtasp.csv"
 
-        fname_path_LBMP_DA = os.path.join(fpath, 'LBMP', 'DAM', zone_gen, str(year), str(month).zfill(2),fnameLBMP_DA)
-        fname_path_ASP_DA = os.path.join(fpath, 'ASP', 'DAM', str(year), str(month).zfill(2),fnameASP_DA)
+        fnames_LBMP_DA.append(os.path.join(fpath, 'LBMP', 'DAM', zone_gen, str(year), str(month).zfill(2),fnameLBMP_DA))
+        fnames_ASP_DA.append(os.path.join(fpath, 'ASP', 'DAM', str(year), str(month).zfill(2),fnameASP_DA))
 
-        fname_path_LBMP_RT = os.path.join(fpath, 'LBMP', 'RT', zone_gen, str(year), str(month).zfill(2),fnameLBMP_RT)
-        fname_path_ASP_RT = os.path.join(fpath, 'ASP', 'RT', str(year), str(month).zfill(2),fnameASP_RT)
+        fnames_LBMP_RT.append(os.path.join(fpath, 'LBMP', 'RT', zone_gen, str(year), str(month).zfill(2),fnameLBMP_RT))
+        fnames_ASP_RT.append(os.path.join(fpath, 'ASP', 'RT', str(year), str(month).zfill(2),fnameASP_RT))
+
+    # Read the daily files that are needed concurrently, parsing only the columns used below.
+    read_asp = typedat == "asp" or typedat == "both"
+    read_lbmp = typedat == "lbmp" or typedat == "both"
+    read_rt = RT_DAM == "RT" or RT_DAM == "both"
+    read_da = RT_DAM == "DAM" or RT_DAM == "both"
+
+    no_files = [None]*ndaysmonth
+
+    dfs_ASP_RT = read_daily_csvs(fnames_ASP_RT, usecols=_NYISO_ASP_COLUMNS.__contains__, index_col=False) if read_asp and read_rt else no_files
+    dfs_ASP_DA = read_daily_csvs(fnames_ASP_DA, usecols=_NYISO_ASP_COLUMNS.__contains__, index_col=False) if read_asp and read_da else no_files
+    dfs_LBMP_RT = read_daily_csvs(fnames_LBMP_RT, usecols=_NYISO_LBMP_COLUMNS, dtype=_NYISO_LBMP_DTYPES, index_col=False) if read_lbmp and read_rt else no_files
+    dfs_LBMP_DA = read_daily_csvs(fnames_LBMP_DA, usecols=_NYISO_LBMP_COLUMNS, dtype=_NYISO_LBMP_DTYPES, index_col=False) if read_lbmp and read_da else no_files
+
+    for ix in range(ndaysmonth):
+        day_x = ix+1
 
         if typedat == "asp" or typedat == "both":
             # 20170201damasp.csv
             # 20180501rtasp.csv
             if RT_DAM == "RT" or RT_DAM == "both":
-                try:
-                    df_file = pd.read_csv(fname_path_ASP_RT, index_col=False)
-                except FileNotFoundError:
+                df_file = dfs_ASP_RT[ix]
+
+                if df_file is None:
                     rtCAP = np.empty([0])
                     rtMOV = np.empty([0])
                     logging.warning('read_nyiso_data: RT ASP file missing, returning empty array.')
@@ -653,9 +862,9 @@ def read_nyiso_data(fpath, year, month, nodeid, typedat="both", RT_DAM="both"):
 
 
             if RT_DAM == "DAM" or RT_DAM == "both":
-                try:
-                    df_file = pd.read_csv(fname_path_ASP_DA, index_col=False)
-                except FileNotFoundError:
+                df_file = dfs_ASP_DA[ix]
+
+                if df_file is None:
                     daCAP = np.empty([0])
                     logging.warning('read_nyiso_data: DA ASP file missing, returning empty array.')
                     break
@@ -676,9 +885,9 @@ def read_nyiso_data(fpath, year, month, nodeid, typedat="both", RT_DAM="both"):
             # 20170201damlbmp_zone.csv
             # 20170201realtime_gen.csv
             if RT_DAM == "RT" or RT_DAM == "both":
-                try:
-                    df_rtLBMP = pd.read_csv(fname_path_LBMP_RT, index_col=False)
-                except FileNotFoundError:
+                df_rtLBMP = dfs_LBMP_RT[ix]
+
+                if df_rtLBMP is None:
                     rtLBMP = np.empty([0])
                     logging.warning('read_nyiso_data: RT LMP file missing, returning empty array.')
                     break
@@ -689,9 +898,9 @@ def read_nyiso_data(fpath, year, month, nodeid, typedat="both", RT_DAM="both"):
                     return np.empty([0]), np.empty([0]), np.empty([0]), np.empty([0]), np.empty([0])
 
             if RT_DAM == "DAM" or RT_DAM == "both":
-                try:
-                    df_daLBMP = pd.read_csv(fname_path_LBMP_DA, index_col=False)
-                except FileNotFoundError:
+                df_daLBMP = dfs_LBMP_DA[ix]
+
+                if df_daLBMP is None:
                     daLBMP = np.empty([0])
                     logging.warning('read_nyiso_data: DA LMP file missing, returning empty array.')
                     break
@@ -907,11 +1116,11 @@ def read_spp_data(fpath, year, month, node, typedat="both"):
     # TODO: path_nodes_file is a folder to adjust when integrating it to QuESt
     path_nodes_file = '../../es_gui/apps/data_manager/_static/'
     pathf_nodeszones = os.path.join(fpath, path_nodes_file, 'nodes_spp.csv')
-    df_nodes = pd.read_csv(pathf_nodeszones, index_col=False, encoding="cp1252")
+    df_nodes = read_node_table(pathf_nodeszones, encoding="cp1252")
     df_nodes_x = df_nodes.loc[df_nodes['Node ID'] == node, :]
 
     if df_nodes_x.empty:
-        print("The node does NOT exists in SPP")
+        logging.warning('read_spp_data: The node does not exist in SPP, returning empty arrays. (got {node})'.format(node=node))
         # raise ValueError('Not a valid bus number!!!')
         return daLMP, daMCPRU, daMCPRD
     else:
@@ -932,21 +1141,31 @@ def read_spp_data(fpath, year, month, node, typedat="both"):
     ndaysmonth = calendar.monthrange(year, month)
     ndaysmonth = int(ndaysmonth[1])
 
+    fnames_LMP_DA = []
+    fnames_MCP_DA = []
+
     for ix in range(ndaysmonth):
         day_x = ix+1
 
         fnameLMP_DA = "DA-LMP-{0:s}-{1:d}{2:02d}{3:02d}0100.csv".format(bus_loc[1], year, month, day_x)
         fnameMCP_DA = "DA-MCP-{0:d}{1:02d}{2:02d}0100.csv".format(year, month, day_x)
 
-        fname_path_LMP_DA = os.path.join(fpath, 'LMP', 'DAM', bus_loc[0], str(year), str(month).zfill(2),fnameLMP_DA)
-        fname_path_MCP_DA = os.path.join(fpath, 'MCP', 'DAM', str(year), str(month).zfill(2),fnameMCP_DA)
+        fnames_LMP_DA.append(os.path.join(fpath, 'LMP', 'DAM', bus_loc[0], str(year), str(month).zfill(2),fnameLMP_DA))
+        fnames_MCP_DA.append(os.path.join(fpath, 'MCP', 'DAM', str(year), str(month).zfill(2),fnameMCP_DA))
+
+    # Read the daily files that are needed concurrently, parsing only the columns used below.
+    no_files = [None]*ndaysmonth
 
+    dfs_LMP_DA = read_daily_csvs(fnames_LMP_DA, usecols=_SPP_LMP_COLUMNS, dtype=_SPP_LMP_DTYPES, index_col=False) if typedat == "lmp" or typedat == "both" else no_files
+    dfs_MCP_DA = read_daily_csvs(fnames_MCP_DA, usecols=_SPP_MCP_COLUMNS, dtype=_SPP_MCP_DTYPES, index_col=False) if typedat == "mcp" or typedat == "both" else no_files
+
+    for ix in range(ndaysmonth):
         if typedat == "lmp" or typedat == "both":
             # DA-LMP-B-201707010100.csv
             # DA-LMP-SL-201707010100.csv
-            try:
-                df_daLMP = pd.read_csv(fname_path_LMP_DA, index_col=False)
-            except FileNotFoundError:
+            df_daLMP = dfs_LMP_DA[ix]
+
+            if df_daLMP is None:
                 daLMP = np.empty([0])
                 logging.warning('read_spp_data: LMP file missing, returning empty array.')
                 break
@@ -958,9 +1177,9 @@ def read_spp_data(fpath, year, month, node, typedat="both"):
 
         if typedat == "mcp" or typedat == "both":
             # DA-MCP-201707010100.csv
-            try:
-                df_daMCP = pd.read_csv(fname_path_MCP_DA, index_col=False)
-            except FileNotFoundError:
+            df_daMCP = dfs_MCP_DA[ix]
+
+            if df_daMCP is None:
                 daMCPRU = np.empty([0])
                 daMCPRD = np.empty([0])
                 logging.warning('read_spp_data: MCP file missing, returning empty arrays.')
@@ -1,24 +1,32 @@
 from __future__ import absolute_import
+from collections import OrderedDict
 import logging
 import os
 import json
 
+import numpy as np
 import pandas as pd
 
 from es_gui.tools.dms import DataManagementSystem
 from es_gui.tools.valuation.utilities import *
+from es_gui.tools.valuation.data_bank import ColumnarDataBank, COLUMNAR_DIR, PRODUCTS, ercot_files, read_raw_month, relative_fingerprint, source_patterns
 
 
 class ValuationDMS(DataManagementSystem):
     """
     A class for managing data for the energy storage valuation optimization functions. Class methods for each type of file to be loaded are included, extending from the get_data() method of the superclass. Each of these methods uses get_data() to retrieve the relevant data and loads the file and adds it to the DMS if the data is not loaded. An optional class method for calling each of the individual data methods can be included to, e.g., form the necessary arguments and return the desired variables.
 
+    Each entry is stored with a fingerprint of the data files it was read from. When the files have changed, e.g., because the month was downloaded again, the entry is invalidated and read again.
+
     :param home_path: A string indicating the relative path to where data is saved.
+    :param fast_hash: True if the fingerprints should include a hash of the beginning and end of each file in addition to its size and modification time.
     """
-    def __init__(self, home_path, **kwargs):
+    def __init__(self, home_path, fast_hash=False, **kwargs):
         DataManagementSystem.__init__(self, **kwargs)
 
         self.home_path = home_path
+        self.fast_hash = fast_hash
+        self.data_bank = ColumnarDataBank(os.path.join(self.home_path, COLUMNAR_DIR), fast_hash=fast_hash)
 
         # with open(os.path.abspath(os.path.join(self.home_path, '..', 'es_gui', 'apps', 'valuation', 'definitions', 'nodes.json')), 'r') as fp:
         #     self.NODES = json.load(fp)
@@ -43,9 +51,98 @@ class ValuationDMS(DataManagementSystem):
         # else:
         #     return node_name
 
+    def _get_month_data(self, iso, year, month, nodeid, keys):
+        """Retrieves the given month of every product of the ISO for the node, stored under the corresponding keys, in the order of data_bank.PRODUCTS[iso]. Data not loaded yet, or whose source files have changed, is read from the columnar data bank if it has been ingested or the raw files otherwise, in which case it is ingested for later runs, and added to the DMS."""
+        path = os.path.join(self.home_path, iso)
+        patterns = source_patterns(path, iso, year, month, nodeid).values()
+
+        fingerprints = self.validate_sources(OrderedDict(zip(keys, patterns)), self.fast_hash)
+
+        try:
+            # attempt to access data if it is already loaded
+            return tuple(self.get_data(key) for key in keys)
+        except KeyError:
+            # load the data and add it to the DMS
+            sources = [relative_fingerprint(fingerprints[key]['sources'], path) for key in keys]
+            arrays = self.data_bank.read_month(iso, year, month, nodeid, sources)
+
+            if arrays is None:
+                arrays = read_raw_month(path, iso, year, month, nodeid)
+
+                if any(sources):
+                    try:
+                        self.data_bank.write_month(iso, year, month, nodeid, arrays, sources)
+                    except (OSError, ValueError) as e:
+                        logging.warning('DMS: Could not add {iso} {year}-{month} to the columnar data bank. ({error})'.format(iso=iso, year=year, month=month, error=e))
+            else:
+                logging.info('DMS: Loaded {iso} {year}-{month} from the columnar data bank.'.format(iso=iso, year=year, month=month))
+
+            for array, key in zip(arrays, keys):
+                self.add_data(array, key, metadata=fingerprints[key])
+
+            return tuple(arrays)
+
+    def get_window_data(self, iso, nodeid, start, end, products=None):
+        """
+        Retrieves every hour from start up to, but not including, end of the given products of the ISO for the node, across month boundaries. Each month in the window is retrieved once with the get_<iso>_data() method, so months already loaded are reused, and copied into a preallocated array spanning the window. Hours missing from a month's data are left as NaN.
+
+        :param iso: The ISO, one of data_bank.PRODUCTS.
+        :param nodeid: The node ID, or settlement point for ERCOT.
+        :param start: The first hour of the window, as anything pandas.Timestamp accepts; rounded down to the hour.
+        :param end: The end of the window, exclusive; rounded down to the hour.
+        :param products: A list of product names of the ISO as in data_bank.PRODUCTS, e.g., ['LMP', 'MCP'] for MISO; all of them if None.
+        :return: An OrderedDict of the products and their hourly ndarrays for the window.
+        """
+        product_names = [product for product, _ in PRODUCTS[iso]]
+        products = product_names if products is None else list(products)
+
+        for product in products:
+            if product not in product_names:
+                raise(ValueError('Invalid product for {iso}: {product}'.format(iso=iso, product=product)))
+
+        start = pd.Timestamp(start).floor('h')
+        end = pd.Timestamp(end).floor('h')
+        n_hours = max(int((end - start)/pd.Timedelta(hours=1)), 0)
+
+        get_month_data = {'ERCOT': self.get_ercot_data,
+                          'PJM': self.get_pjm_data,
+                          'MISO': self.get_miso_data,
+                          'ISONE': self.get_isone_data,
+                          'NYISO': self.get_nyiso_data,
+                          'SPP': self.get_spp_data,
+                          'CAISO': self.get_caiso_data,
+                          }[iso]
+
+        window = OrderedDict((product, np.full(n_hours, np.nan)) for product in products)
+        month_start = start.replace(day=1, hour=0)
+
+        while month_start < end:
+            month_end = month_start + pd.DateOffset(months=1)
+
+            # Hours of the month within the window, relative to the start of the month and of the window.
+            first = int((max(start, month_start) - month_start)/pd.Timedelta(hours=1))
+            last = int((min(end, month_end) - month_start)/pd.Timedelta(hours=1))
+            offset = int((month_start - start)/pd.Timedelta(hours=1))
+
+            month_data = OrderedDict(zip(product_names, get_month_data(month_start.year, month_start.month, str(nodeid))))
+
+            for product in products:
+                array = np.asarray(month_data[product], dtype=float)[first:last]
+
+                if len(array) < last - first:
+                    logging.warning('DMS: {iso} {product} data for {year}-{month} covers {n} of {n_window} hours in the window.'.format(iso=iso, product=product, year=month_start.year, month=month_start.month, n=len(array), n_window=last - first))
+
+                window[product][offset + first:offset + first + len(array)] = array
+
+            month_start = month_end
+
+        return window
+
     def get_ercot_spp_data(self, id_key):
         """Retrieves DAM-SPP data for ERCOT."""
         logging.info('DMS: Loading ERCOT DA-SPP')
+        fingerprints = self.validate_sources({id_key: [id_key.split(self.delimiter)[0]]}, self.fast_hash)
+
         try:
             # attempt to access data if it is already loaded
             spp_da = self.get_data(id_key)
@@ -54,25 +151,31 @@ class ValuationDMS(DataManagementSystem):
 
             # deconstruct id_key to obtain args for read function
             spp_da = read_ercot_da_spp(*id_key.split(self.delimiter))
-            self.add_data(spp_da, id_key)
+            self.add_data(spp_da, id_key, metadata=fingerprints[id_key])
         finally:
             return spp_da
 
     def get_ercot_ccp_data(self, id_key):
         """Retrieves DAM-CCP data for ERCOT."""
         logging.info('DMS: Loading ERCOT DA-CCP')
+        regup_key = id_key + self.delimiter + 'REGUP'
+        regdn_key = id_key + self.delimiter + 'REGDN'
+
+        source = [id_key.split(self.delimiter)[0]]
+        fingerprints = self.validate_sources({regup_key: source, regdn_key: source}, self.fast_hash)
+
         try:
             # attempt to access data if it is already loaded
-            REGUP = self.get_data(id_key + self.delimiter + 'REGUP')
-            REGDN = self.get_data(id_key + self.delimiter + 'REGDN')
+            REGUP = self.get_data(regup_key)
+            REGDN = self.get_data(regdn_key)
         except KeyError:
             # load the data and add it to the DMS
 
             # deconstruct id_key to obtain args for read function
             REGDN, REGUP = read_ercot_da_ccp(*id_key.split(self.delimiter)[:2])
 
-            self.add_data(REGUP, id_key + self.delimiter + 'REGUP')
-            self.add_data(REGDN, id_key + self.delimiter + 'REGDN')
+            self.add_data(REGUP, regup_key, metadata=fingerprints[regup_key])
+            self.add_data(REGDN, regdn_key, metadata=fingerprints[regdn_key])
         finally:
             return REGDN, REGUP
 
@@ -83,35 +186,15 @@ class ValuationDMS(DataManagementSystem):
         if isinstance(month, int):
             month = str(month)
 
-        spp_fpath = os.path.join(path, 'SPP', str(year))
-        
-        try:
-            for filename in os.listdir(spp_fpath):
-                if filename.lower().endswith('.xlsx'):
-                    fname = filename
-        except ValueError as e:
-            raise(e)
-
-        spp_fname = os.path.join(spp_fpath, fname)
-
-        ccp_fpath = os.path.join(path, 'CCP', str(year))
-
-        try:
-            for filename in os.listdir(ccp_fpath):
-                if filename.lower().endswith('.csv'):
-                    fname = filename
-        except ValueError as e:
-            raise(e)
-
-        ccp_fname = os.path.join(ccp_fpath, fname)
+        spp_fname, ccp_fname = ercot_files(path, year)
 
         # construct identifier keys
         spp_id = self.delimiter.join([spp_fname, month, settlement_point])
         ccp_id = self.delimiter.join([ccp_fname, month])
 
         # retrieve data
-        spp_da = self.get_ercot_spp_data(spp_id)
-        rd, ru = self.get_ercot_ccp_data(ccp_id)
+        spp_da, rd, ru = self._get_month_data('ERCOT', year, month, settlement_point,
+                                              [spp_id, ccp_id + self.delimiter + 'REGDN', ccp_id + self.delimiter + 'REGUP'])
 
         return spp_da, rd, ru
 
@@ -185,24 +268,7 @@ class ValuationDMS(DataManagementSystem):
         rccp_key = self.delimiter.join([path, year, month, 'RegCCP'])
         rpcp_key = self.delimiter.join([path, year, month, 'RegPCP'])
 
-        try:
-            # attempt to access data if it is already loaded
-            lmp_da = self.get_data(lmp_key)
-            MR = self.get_data(mr_key)
-            RA = self.get_data(ra_key)
-            RD = self.get_data(rd_key)
-            RegCCP = self.get_data(rccp_key)
-            RegPCP = self.get_data(rpcp_key)
-        except KeyError:
-            # load the data and add it to the DMS
-            lmp_da, MR, RA, RD, RegCCP, RegPCP = read_pjm_data(path, year, month, nodeid)
-
-            self.add_data(lmp_da, lmp_key)
-            self.add_data(MR, mr_key)
-            self.add_data(RA, ra_key)
-            self.add_data(RD, rd_key)
-            self.add_data(RegCCP, rccp_key)
-            self.add_data(RegPCP, rpcp_key)
+        lmp_da, MR, RA, RD, RegCCP, RegPCP = self._get_month_data('PJM', year, month, nodeid, [lmp_key, mr_key, ra_key, rd_key, rccp_key, rpcp_key])
 
         return lmp_da, MR, RA, RD, RegCCP, RegPCP
     
@@ -241,16 +307,7 @@ class ValuationDMS(DataManagementSystem):
         lmp_key = self.delimiter.join([path, year, month, nodeid, 'LMP'])
         regmcp_key = self.delimiter.join([path, year, month, 'MCP'])
 
-        try:
-            # attempt to access data if it is already loaded
-            lmp_da = self.get_data(lmp_key)
-            RegMCP = self.get_data(regmcp_key)
-        except KeyError:
-            # load the data and add it to the DMS
-            lmp_da, RegMCP = read_miso_data(path, year, month, nodeid)
-
-            self.add_data(lmp_da, lmp_key)
-            self.add_data(RegMCP, regmcp_key)
+        lmp_da, RegMCP = self._get_month_data('MISO', year, month, nodeid, [lmp_key, regmcp_key])
 
         return lmp_da, RegMCP
 
@@ -321,18 +378,7 @@ class ValuationDMS(DataManagementSystem):
         rccp_key = self.delimiter.join([path, year, month, 'RegCCP'])
         rpcp_key = self.delimiter.join([path, year, month, 'RegPCP'])
 
-        try:
-            # attempt to access data if it is already loaded
-            lmp_da = self.get_data(lmp_key)
-            rccp = self.get_data(rccp_key)
-            rpcp = self.get_data(rpcp_key)
-        except KeyError:
-            # load the data and add it to the DMS
-            lmp_da, rccp, rpcp = read_isone_data(path, year, month, nodeid)
-
-            self.add_data(lmp_da, lmp_key)
-            self.add_data(rccp, rccp_key)
-            self.add_data(rpcp, rpcp_key)
+        lmp_da, rccp, rpcp = self._get_month_data('ISONE', year, month, nodeid, [lmp_key, rccp_key, rpcp_key])
 
         return lmp_da, rccp, rpcp
 
@@ -348,16 +394,7 @@ class ValuationDMS(DataManagementSystem):
         lbmp_key = self.delimiter.join([path, year, month, nodeid, 'LBMP'])
         rcap_key = self.delimiter.join([path, year, month, 'RegCAP'])
 
-        try:
-            # attempt to access data if it is already loaded
-            lbmp_da = self.get_data(lbmp_key)
-            rcap_da = self.get_data(rcap_key)
-        except KeyError:
-            # load the data and add it to the DMS
-            lbmp_da, lbmp_rt, rcap_da, rcap_rt, rmov_da = read_nyiso_data(path, year, month, nodeid, typedat="both", RT_DAM="DAM")
-
-            self.add_data(lbmp_da, lbmp_key)
-            self.add_data(rcap_da, rcap_key)
+        lbmp_da, rcap_da = self._get_month_data('NYISO', year, month, nodeid, [lbmp_key, rcap_key])
 
         return lbmp_da, rcap_da
 
@@ -372,19 +409,7 @@ class ValuationDMS(DataManagementSystem):
         mcpru_key = self.delimiter.join([path, year, month, 'MCPRU'])
         mcprd_key = self.delimiter.join([path, year, month, 'MCPRD'])
 
-        try:
-            # attempt to access data if it is already loaded
-            lmp_da = self.get_data(lmp_key)
-            mcpru_da = self.get_data(mcpru_key)
-            mcprd_da = self.get_data(mcprd_key)
-        except KeyError:
-            # load the data and add it to the DMS
-            # lmp_da, MR, RA, RD, RegCCP, RegPCP = read_pjm_data(path, year, month, nodeid)
-            lmp_da, mcpru_da, mcprd_da = read_spp_data(path, year, month, nodeid, typedat="both")
-
-            self.add_data(lmp_da, lmp_key)
-            self.add_data(mcpru_da, mcpru_key)
-            self.add_data(mcprd_da, mcprd_key)
+        lmp_da, mcpru_da, mcprd_da = self._get_month_data('SPP', year, month, nodeid, [lmp_key, mcpru_key, mcprd_key])
 
         return lmp_da, mcpru_da, mcprd_da
 
@@ -405,31 +430,8 @@ class ValuationDMS(DataManagementSystem):
         rmu_pacc_key = self.delimiter.join([path, year, month, 'RMU_PACC'])
         rmd_pacc_key = self.delimiter.join([path, year, month, 'RMD_PACC'])
 
-        try:
-            # attempt to access data if it is already loaded
-            lmp_da = self.get_data(lmp_key)
-            aspru_da = self.get_data(aspru_key)
-            asprd_da = self.get_data(asprd_key)
-            asprmu_da = self.get_data(asprmu_key)
-            asprmd_da = self.get_data(asprmd_key)
-            rmu_mm = self.get_data(rmu_mm_key)
-            rmd_mm = self.get_data(rmd_mm_key)
-            rmu_pacc = self.get_data(rmu_pacc_key)
-            rmd_pacc = self.get_data(rmd_pacc_key)
-        except KeyError:
-            # load the data and add it to the DMS
-            # lmp_da, MR, RA, RD, RegCCP, RegPCP = read_pjm_data(path, year, month, nodeid)
-            lmp_da, aspru_da, asprd_da, asprmu_da, asprmd_da, rmu_mm, rmd_mm, rmu_pacc, rmd_pacc = read_caiso_data(path, year, month, nodeid)
-
-            self.add_data(lmp_da, lmp_key)
-            self.add_data(aspru_da, aspru_key)
-            self.add_data(asprd_da, asprd_key)
-            self.add_data(asprmu_da, asprmu_key)
-            self.add_data(asprmd_da, asprmd_key)
-            self.add_data(rmu_mm, rmu_mm_key)
-            self.add_data(rmd_mm, rmd_mm_key)
-            self.add_data(rmu_pacc, rmu_pacc_key)
-            self.add_data(rmd_pacc, rmd_pacc_key)
+        lmp_da, aspru_da, asprd_da, asprmu_da, asprmd_da, rmu_mm, rmd_mm, rmu_pacc, rmd_pacc = self._get_month_data('CAISO', year, month, nodeid,
+                                                                                                               [lmp_key, aspru_key, asprd_key, asprmu_key, asprmd_key, rmu_mm_key, rmd_mm_key, rmu_pacc_key, rmd_pacc_key])
 
         return lmp_da, aspru_da, asprd_da, asprmu_da, asprmd_da, rmu_mm, rmd_mm, rmu_pacc, rmd_pacc
 
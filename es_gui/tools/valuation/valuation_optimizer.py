@@ -8,11 +8,28 @@ import numpy as np
 
 from es_gui.tools import optimizer
 from es_gui.tools.valuation.constraints import ExpressionsBlock
+from es_gui.tools.valuation.matrix_constraints import MatrixExpressionsBlock
+from es_gui.tools.valuation.dynamic_program import ArbitrageDynamicProgram
 
 
 class ValuationOptimizer(optimizer.Optimizer):
     """A framework wrapper class for creating Pyomo ConcreteModels for energy storage valuation."""
 
+    # Scalar device parameters built into the Pyomo model as mutable Params; these can be changed with update_model_parameters() without rebuilding the model.
+    MUTABLE_PARAMS = {'Power_rating', 'R', 'Energy_capacity', 'Self_discharge_efficiency', 'Round_trip_efficiency',
+                      'Reserve_reg_min', 'Reserve_reg_max', 'State_of_charge_min', 'State_of_charge_max',
+                      'State_of_charge_init', 'Make_whole'}
+
+    # Parameters given as fractions that are interpreted as percentages if greater than 1.0.
+    PERCENTAGE_PARAMS = {'Self_discharge_efficiency', 'Round_trip_efficiency', 'Reserve_reg_min', 'Reserve_reg_max',
+                         'State_of_charge_min', 'State_of_charge_max', 'State_of_charge_init'}
+
+    # Time series data the model is built from.
+    TIME_SERIES_INPUTS = ('price_electricity', 'price_reg_up', 'price_reg_down', 'price_reg_serv_up', 'price_reg_serv_down',
+                          'price_regulation', 'price_reg_service', 'cost_charge', 'cost_discharge',
+                          'mileage_mult', 'mileage_mult_ru', 'mileage_mult_rd', 'perf_score', 'perf_score_ru', 'perf_score_rd',
+                          'fraction_reg_up', 'fraction_reg_down')
+
     def __init__(self, price_electricity=None,
                  price_reg_up=None, price_reg_down=None,
                  price_reg_serv_up=None, price_reg_serv_down=None,
@@ -22,15 +39,19 @@ class ValuationOptimizer(optimizer.Optimizer):
                  perf_score=None, perf_score_ru=None, perf_score_rd=None,
                  fraction_reg_up=None, fraction_reg_down=None,
                  market_type='arbitrage',
-                 solver='glpk'):
+                 solver='glpk', model_engine='pyomo'):
 
         # TODO: deprecate Perf_score and mileage_ratio
 
         self._model = ConcreteModel()
         self._market_type = market_type
         self._solver = solver
+        self._model_engine = model_engine
 
         self._expressions_block = None
+        self._linear_program = None
+        self.reset_timings()
+        self._dynamic_program = None
 
         self._price_electricity = price_electricity
 
@@ -230,6 +251,44 @@ class ValuationOptimizer(optimizer.Optimizer):
     def expressions_block(self, value):
         self._expressions_block = value
 
+    @property
+    def model_engine(self):
+        """The engine used to construct the model, defaults to 'pyomo'. 'matrix' assembles the linear program directly from the NumPy arrays and solves it in-process. 'dp' solves the 'arbitrage' market_type with ArbitrageDynamicProgram if the Self_discharge_efficiency is 1, and other cases as 'matrix' does."""
+        return self._model_engine
+
+    @model_engine.setter
+    def model_engine(self, value):
+        if value in {'pyomo', 'matrix', 'dp'}:
+            self._model_engine = value
+        else:
+            raise ValueError('model_engine must be one of "pyomo", "matrix", or "dp".')
+
+    @property
+    def dynamic_program(self):
+        """ArbitrageDynamicProgram object constructed by the 'dp' model engine."""
+        return self._dynamic_program
+
+    def _solves_in_process(self):
+        """Returns True if the model engine solves the model in-process instead of with a Pyomo solver."""
+        return self.model_engine in {'matrix', 'dp'}
+
+    def _uses_dynamic_program(self):
+        """Returns True if the model is solved with ArbitrageDynamicProgram: with the 'dp' model engine for the 'arbitrage' market_type without self-discharge."""
+        if self.model_engine != 'dp' or self.market_type != 'arbitrage':
+            return False
+
+        # With self-discharge, the discretization gap of ArbitrageDynamicProgram grows to several percent; the 'matrix' linear program is solved instead.
+        self_discharge_efficiency = value(getattr(self.model, 'Self_discharge_efficiency', 1.0))
+
+        if self_discharge_efficiency > 1.0:
+            self_discharge_efficiency = self_discharge_efficiency/100
+
+        return self_discharge_efficiency >= 1.0
+
+    def _in_process_program(self):
+        """Returns the LinearProgram or ArbitrageDynamicProgram solved in-process."""
+        return self.dynamic_program if self._uses_dynamic_program() else self.linear_program
+
     @property
     def market_type(self):
         """The name of the market formulation to be modeled, defaults to 'arbitrage'."""
@@ -263,6 +322,22 @@ class ValuationOptimizer(optimizer.Optimizer):
     def gross_revenue(self, value):
         self._gross_revenue = value
 
+    def __getstate__(self):
+        """Drops the model and its formulation when pickling or copying, e.g., to return a solved ValuationOptimizer from a worker process; the results are kept."""
+        state = self.__dict__.copy()
+
+        for attr in ['_model', '_expressions_block', '_linear_program', '_dynamic_program']:
+            state[attr] = None
+
+        return state
+
+    def detached_copy(self):
+        """Returns a copy holding the results, parameters, and timings but not the model or its formulation, so that re-solving the model for other parameters does not change it."""
+        op = self.__class__.__new__(self.__class__)
+        op.__dict__.update(self.__getstate__())
+
+        return op
+
     def _set_model_param(self):
         """Sets the model params for the Pyomo ConcreteModel."""
         m = self.model
@@ -537,10 +612,18 @@ class ValuationOptimizer(optimizer.Optimizer):
 
     def populate_model(self):
         """Populates the Pyomo ConcreteModel based on the specified market_type."""
+        if self._uses_dynamic_program():
+            self._populate_dynamic_program()
+            return
+        elif self._solves_in_process():
+            self._populate_linear_program()
+            return
+
         self.model.objective_expr = 0.0
 
         self._set_model_param()
         self._set_model_var()
+        self._set_mutable_params()
 
         self.expressions_block = ExpressionsBlock(self.market_type)
 
@@ -556,149 +639,229 @@ class ValuationOptimizer(optimizer.Optimizer):
         #     # Detect constant objective function value.
         #     raise(IncompatibleDataException('The objective function was ill-formed, resulting in a constant objective function.'))
 
+    def _set_mutable_params(self):
+        """Converts the scalar device parameters of the Pyomo ConcreteModel to mutable Params."""
+        m = self.model
+
+        for param in self.MUTABLE_PARAMS:
+            if hasattr(m, param) and not isinstance(getattr(m, param), Param):
+                param_value = getattr(m, param)
+                delattr(m, param)
+                setattr(m, param, Param(initialize=param_value, mutable=True))
+
+    def can_update_model_parameters(self, *args):
+        """Returns True if all of the named parameters can be changed in the populated model with update_model_parameters()."""
+        if self._solves_in_process():
+            return self._in_process_program() is not None
+
+        return all(isinstance(getattr(self.model, param, None), Param) for param in args)
+
+    def update_model_parameters(self, **kwargs):
+        """Changes parameters in the already populated model so that it can be re-solved with resolve() instead of being rebuilt."""
+        if not self.can_update_model_parameters(*kwargs.keys()):
+            raise BadParameterException('ValuationOptimizer: Only the parameters {0} can be updated in a populated model.'.format(sorted(self.MUTABLE_PARAMS)))
+
+        m = self.model
+
+        for kw_key, kw_value in kwargs.items():
+            if kw_key in self.PERCENTAGE_PARAMS and kw_value > 1.0:
+                logging.warning('ValuationOptimizer: {0} provided is greater than 1.0, interpreting as percentage...'.format(kw_key))
+                kw_value = kw_value/100
+
+            logging.info('ValuationOptimizer: Updating {param} to {value}'.format(param=kw_key, value=kw_value))
+
+            if self._solves_in_process():
+                setattr(m, kw_key, kw_value)
+            else:
+                getattr(m, kw_key).set_value(kw_value)
+
+        if self._solves_in_process():
+            self.populate_model()
+
+    def resolve(self):
+        """Re-solves the model after update_model_parameters(), warm-starting from the previous solution where the solver supports it."""
+        if self._solves_in_process():
+            self._solve_in_process(warm_start=True)
+        else:
+            try:
+                assert self._call_solver(warmstart=True)
+            except AssertionError as e:
+                logging.error('Optimizer: An optimal solution could not be obtained. (Infeasible problem?)')
+                raise(e)
+
+        with self.timed('process_results'):
+            self._process_results()
+
+        return self.get_results()
+
+    def _populate_linear_program(self):
+        """Assembles the objective and constraints in sparse matrix form based on the specified market_type."""
+        self._set_model_param()
+
+        try:
+            lp = MatrixExpressionsBlock(self.market_type).build(self.model)
+        except IndexError:
+            # Array-like object(s) do(es) not match the length of the price_electricity array-like.
+            raise(IncompatibleDataException('At least one of the array-like parameter objects is not the expected length. (It should match the length of the price_electricity object.)'))
+
+        # Keep the previous basis, if any, for warm starting.
+        lp.inherit_basis(self.linear_program)
+        self._linear_program = lp
+
+    def _populate_dynamic_program(self):
+        """Sets up the ArbitrageDynamicProgram for the 'arbitrage' market_type."""
+        self._set_model_param()
+
+        try:
+            self._dynamic_program = ArbitrageDynamicProgram.from_model(self.model)
+        except IndexError:
+            raise(IncompatibleDataException('At least one of the array-like parameter objects is not the expected length. (It should match the length of the price_electricity object.)'))
+
+    def _solve_in_process(self, warm_start=False):
+        """Solves the LinearProgram or ArbitrageDynamicProgram constructed by the 'matrix' or 'dp' model engine in-process."""
+        program = self._in_process_program()
+
+        try:
+            with self.timed('solve'):
+                optimal = program.solve(warm_start=warm_start)
+
+            self._set_model_statistics(*[getattr(program, attr, None) for attr in ['n_variables', 'n_constraints', 'n_nonzeros', 'iterations']])
+
+            assert optimal
+        except AssertionError as e:
+            logging.error('Optimizer: An optimal solution could not be obtained. (Infeasible problem?)')
+            raise(e)
+
+    def solve_model(self):
+        """Solves the model using the specified solver; the 'matrix' and 'dp' model engines always solve in-process."""
+        if self._solves_in_process():
+            self._solve_in_process()
+
+            with self.timed('process_results'):
+                self._process_results()
+        else:
+            optimizer.Optimizer.solve_model(self)
+
+    def run(self):
+        """Instantiates, creates, and solves the optimizer model based on supplied information."""
+        if self._solves_in_process():
+            with self.timed('instantiate_model'):
+                self.instantiate_model()
+
+            with self.timed('populate_model'):
+                self.populate_model()
+
+            self.solve_model()
+
+            return self.get_results()
+        else:
+            return optimizer.Optimizer.run(self)
+
 
     def _process_results(self):
         """Processes optimization results for further evaluation."""
+        if self._solves_in_process():
+            self._process_in_process_results()
+            return
+
         m = self.model
+        n_time = len(m.time)
 
-        t = m.time
-        q_r = [m.q_r[n].value for n in m.time]
-        q_d = [m.q_d[n].value for n in m.time]
-        q_ru = [m.q_ru[n].value for n in m.time]
-        q_rd = [m.q_rd[n].value for n in m.time]
-        q_reg = [m.q_reg[n].value for n in m.time]
-        soc = [m.s[n].value for n in m.time]
-        price_electricity = [m.price_electricity[n] for n in m.time]
+        run_results = {'time': np.arange(n_time)}
 
-        run_results = {'time': t, 'q_r': q_r, 'q_d': q_d, 'q_ru': q_ru, 'q_rd': q_rd, 'q_reg': q_reg,
-                       'state of charge': soc, 'price of electricity': price_electricity}
+        for var in ['q_r', 'q_d', 'q_ru', 'q_rd', 'q_reg']:
+            run_results[var] = _var_values(getattr(m, var), n_time)
 
-        if self.market_type == 'pjm_pfp':
-            rev_arb = np.cumsum(np.array([m.price_electricity[t]*(m.q_d[t].value - m.q_r[t].value) for t in m.time]))
-            rev_reg = np.cumsum(np.array([m.q_reg[t].value*m.perf_score[t]*(m.mi_mult[t]*m.price_reg_service[t] + m.price_regulation[t]) for t in m.time]))
+        run_results['state of charge'] = _var_values(m.s, n_time)
+        run_results['price of electricity'] = np.asarray(m.price_electricity, dtype=float)[:n_time]
 
-            revenue = rev_arb + rev_reg
+        self._set_results(run_results)
 
-            run_results['rev_arb'] = rev_arb
-            run_results['rev_reg'] = rev_reg
-            run_results['revenue'] = revenue
-        elif self.market_type == 'miso_pfp':
-            rev_arb = np.cumsum(np.array([m.price_electricity[t]*(m.q_d[t].value - m.q_r[t].value) for t in m.time]))
-            rev_reg = np.cumsum(np.array([(1 + m.Make_whole)*m.perf_score[t]*m.price_regulation[t]*m.q_reg[t].value for t in m.time]))
+    def _process_in_process_results(self):
+        """Processes the solution of the LinearProgram or ArbitrageDynamicProgram constructed by the 'matrix' or 'dp' model engine."""
+        m = self.model
+        lp = self._in_process_program()
+        n_time = len(m.time)
 
-            revenue = rev_arb + rev_reg
+        run_results = {'time': np.arange(n_time)}
 
-            run_results['rev_arb'] = rev_arb
-            run_results['rev_reg'] = rev_reg
-            run_results['revenue'] = revenue
-        elif self.market_type == 'isone_pfp':
-            rev_arb = np.cumsum(np.array([m.price_electricity[t]*(m.q_d[t].value - m.q_r[t].value) for t in m.time]))
-            rev_reg = np.cumsum(np.array([m.price_regulation[t]*m.q_reg[t].value for t in m.time]))
+        for var in ['q_r', 'q_d', 'q_ru', 'q_rd', 'q_reg']:
+            if var in lp.columns:
+                run_results[var] = lp.get_values(var)
+            else:
+                run_results[var] = np.zeros(n_time)
 
-            revenue = rev_arb + rev_reg
+        run_results['state of charge'] = lp.get_values('s')[:n_time]
+        run_results['price of electricity'] = np.asarray(m.price_electricity, dtype=float)[:n_time]
 
-            run_results['rev_arb'] = rev_arb
-            run_results['rev_reg'] = rev_reg
-            run_results['revenue'] = revenue
-        #######################################################################################################################
-        elif self.market_type == 'nyiso_pfp':
-            rev_arb = np.cumsum(np.array([m.price_electricity[t]*(m.q_d[t].value - m.q_r[t].value) for t in m.time]))
-            rev_reg = np.cumsum(np.array([m.q_reg[t].value* m.price_regulation[t] * (1 - 1.1*(1 - m.perf_score[t]))
-                                          + m.price_electricity[t]*(m.q_reg[t].value * m.fraction_reg_up[t]
-                                          - m.q_reg[t].value * m.fraction_reg_down[t])
-                                          for t in m.time]))
-
-            revenue = rev_arb + rev_reg
-
-            run_results['rev_arb'] = rev_arb
-            run_results['rev_reg'] = rev_reg
-            run_results['revenue'] = revenue
-        #######################################################################################################################
-        #######################################################################################################################
-        elif self.market_type == 'spp_pfp':
-            # TODO: copied from 'ercot_arbreg' -make sure is correct for this market
-            # rev_arb = np.cumsum(np.array([m.price_electricity[t]*(m.q_d[t].value - m.q_r[t].value
-            #                                                       + m.q_ru[t].value*m.fraction_reg_up[t]
-            #                                                       - m.q_rd[t].value*m.fraction_reg_down[t])
-            #                               for t in m.time]))
-            # rev_reg = np.cumsum(np.array([m.ru[t]*m.q_ru[t].value + m.rd[t]*m.q_rd[t].value for t in m.time]))
-            rev_arb = np.cumsum(np.array([m.price_electricity[t]*(m.q_d[t].value - m.q_r[t].value) for t in m.time]))
-            rev_reg = np.cumsum(np.array([m.price_reg_up[t] * m.q_ru[t].value + m.price_reg_down[t] * m.q_rd[t].value
-                                          + m.price_electricity[t]*(m.q_ru[t].value * m.fraction_reg_up[t]
-                                          - m.q_rd[t].value * m.fraction_reg_down[t])
-                                          for t in m.time]))
-
-            revenue = rev_arb + rev_reg
-
-            run_results['rev_arb'] = rev_arb
-            run_results['rev_reg'] = rev_reg
-            run_results['revenue'] = revenue
-        #######################################################################################################################
-        elif self.market_type == 'caiso_pfp':
-            # rev_arb = np.cumsum(np.array([m.price_electricity[t]*(m.q_d[t].value - m.q_r[t].value
-            #                                                       + m.q_ru[t].value*m.fraction_reg_up[t]
-            #                                                       - m.q_rd[t].value*m.fraction_reg_down[t])
-            #                               for t in m.time]))
-            # rev_reg = np.cumsum(np.array([m.price_reg_up[t] * m.q_ru[t].value + m.price_reg_down[t] * m.q_rd[t].value
-            #                               + m.perf_score_ru[t] * m.mi_mult_ru[t] * m.price_reg_serv_up[t]
-            #                               + m.perf_score_rd[t] * m.mi_mult_rd[t] * m.price_reg_serv_down[t]
-            #                               for t in m.time]))
-            rev_arb = np.cumsum(np.array([m.price_electricity[t]*(m.q_d[t].value - m.q_r[t].value) for t in m.time]))
-            rev_reg = np.cumsum(np.array([m.price_reg_up[t] * m.q_ru[t].value + m.price_reg_down[t] * m.q_rd[t].value
-                                          + m.perf_score_ru[t] * m.mi_mult_ru[t] * m.price_reg_serv_up[t]
-                                          + m.perf_score_rd[t] * m.mi_mult_rd[t] * m.price_reg_serv_down[t]
-                                          + m.price_electricity[t]*(m.q_ru[t].value * m.fraction_reg_up[t]
-                                          - m.q_rd[t].value * m.fraction_reg_down[t])
-                                          for t in m.time]))
-
-            revenue = rev_arb + rev_reg
-
-            run_results['rev_arb'] = rev_arb
-            run_results['rev_reg'] = rev_reg
-            run_results['revenue'] = revenue
-        #######################################################################################################################
-        elif self.market_type == 'ercot_arbreg':
-            # rev_arb = np.cumsum(np.array([m.price_electricity[t]*(m.q_d[t].value - m.q_r[t].value
-            #                                                       + m.q_ru[t].value*m.fraction_reg_up[t]
-            #                                                       - m.q_rd[t].value*m.fraction_reg_down[t])
-            #                               for t in m.time]))
-            # # rev_reg = np.cumsum(np.array([m.ru[t] * m.q_ru[t].value + m.rd[t] * m.q_rd[t].value for t in m.time]))
-            # rev_reg = np.cumsum(np.array([m.price_reg_up[t] * m.q_ru[t].value + m.price_reg_down[t] * m.q_rd[t].value for t in m.time]))
-            rev_arb = np.cumsum(np.array([m.price_electricity[t]*(m.q_d[t].value - m.q_r[t].value) for t in m.time]))
-            rev_reg = np.cumsum(np.array([m.price_reg_up[t] * m.q_ru[t].value + m.price_reg_down[t] * m.q_rd[t].value
-                                          + m.price_electricity[t]*(m.q_ru[t].value * m.fraction_reg_up[t]
-                                          - m.q_rd[t].value * m.fraction_reg_down[t])
-                                          for t in m.time]))
-
-            revenue = rev_arb + rev_reg
-
-            run_results['rev_arb'] = rev_arb
-            run_results['rev_reg'] = rev_reg
-            run_results['revenue'] = revenue
-        else:
-            rev_arb = np.cumsum(np.array([m.price_electricity[t] * (m.q_d[t].value - m.q_r[t].value)
-                                          for t in m.time]))
-            rev_reg = np.cumsum(np.array([0 for t in m.time]))
+        self._set_results(run_results)
+
+    def _set_results(self, run_results):
+        """Computes the revenue from the decision variable arrays in run_results and stores the results DataFrame and gross revenue."""
+        rev_arb, rev_reg = self._compute_revenue(run_results)
 
-            revenue = rev_arb + rev_reg
+        revenue = rev_arb + rev_reg
 
-            run_results['rev_arb'] = rev_arb
-            run_results['rev_reg'] = rev_reg
-            run_results['revenue'] = revenue
+        run_results['rev_arb'] = rev_arb
+        run_results['rev_reg'] = rev_reg
+        run_results['revenue'] = revenue
 
         try:
             self.gross_revenue = revenue[-1]
         except IndexError:
             # Revenue is of length-0, likely due to no price_electricity array-like being given before solving.
             self.gross_revenue = 0
-        
+
         self.results = pd.DataFrame(run_results)
 
+    def _compute_revenue(self, run_results):
+        """Computes the cumulative arbitrage and regulation revenue arrays from the decision variable arrays in run_results."""
+        m = self.model
+        n_time = len(run_results['time'])
+
+        def _param(data):
+            return np.asarray(data, dtype=float)[:n_time]
+
+        q_r = run_results['q_r']
+        q_d = run_results['q_d']
+        q_ru = run_results['q_ru']
+        q_rd = run_results['q_rd']
+        q_reg = run_results['q_reg']
+        price_electricity = run_results['price of electricity']
+
+        rev_arb = np.cumsum(price_electricity*(q_d - q_r))
+
+        if self.market_type == 'pjm_pfp':
+            rev_reg = q_reg*_param(m.perf_score)*(_param(m.mi_mult)*_param(m.price_reg_service) + _param(m.price_regulation))
+        elif self.market_type == 'miso_pfp':
+            rev_reg = (1 + value(m.Make_whole))*_param(m.perf_score)*_param(m.price_regulation)*q_reg
+        elif self.market_type == 'isone_pfp':
+            rev_reg = _param(m.price_regulation)*q_reg
+        elif self.market_type == 'nyiso_pfp':
+            rev_reg = (q_reg*_param(m.price_regulation)*(1 - 1.1*(1 - _param(m.perf_score)))
+                       + price_electricity*(q_reg*_param(m.fraction_reg_up) - q_reg*_param(m.fraction_reg_down)))
+        elif self.market_type in {'ercot_arbreg', 'spp_pfp', 'caiso_pfp'}:
+            rev_reg = (_param(m.price_reg_up)*q_ru + _param(m.price_reg_down)*q_rd
+                       + price_electricity*(q_ru*_param(m.fraction_reg_up) - q_rd*_param(m.fraction_reg_down)))
+
+            if self.market_type == 'caiso_pfp':
+                rev_reg = rev_reg + (_param(m.perf_score_ru)*_param(m.mi_mult_ru)*_param(m.price_reg_serv_up)
+                                     + _param(m.perf_score_rd)*_param(m.mi_mult_rd)*_param(m.price_reg_serv_down))
+        else:
+            rev_reg = np.zeros(n_time)
+
+        return rev_arb, np.cumsum(rev_reg)
+
     def get_results(self):
         """Returns the decision variables and derived quantities in a DataFrame, plus the net revenue."""
         return self.results, self.gross_revenue
 
 
+def _var_values(var, n_time):
+    """Returns the values of the first n_time members of an indexed Pyomo Var as a float ndarray; unset values are NaN."""
+    return np.array(list(var.extract_values().values())[:n_time], dtype=float)
+
+
 class BadParameterException(Exception):
     pass
 